@@ -0,0 +1,203 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#   http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks of the client's fetch paths against the local Tempo simulator (see ``simulator.py``).
+
+Every scenario fetches the same worklogs and reports throughput, request latency percentiles, the peak of
+memory allocated by Python and the CPU time spent per 10k records:
+
+    python benchmarks/run.py --worklogs 100000 --page-size 1000 --latency 0.005
+    python benchmarks/run.py --scenarios sync parallel --json results.json
+
+Compare the JSON output of two commits to spot regressions.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulator import TempoSimulator  # noqa: E402
+from tempoapiclient import client_v4  # noqa: E402
+from tempoapiclient.ratelimit import RetryPolicy  # noqa: E402
+from tempoapiclient.transport import RequestsTransport, Transport  # noqa: E402
+
+DATE_FROM, DATE_TO = "2019-01-01", "2019-12-31"
+
+
+class TimingTransport(Transport):
+    """
+    Transport passing requests to another transport and recording the duration of each of them.
+    """
+
+    def __init__(self, transport):
+        self.transport = transport
+        self.headers = transport.headers
+        self.durations = []
+        self._lock = threading.Lock()
+
+    def request(self, method, url, headers=None, data=None, json=None, files=None, timeout=None, verify=None,
+                proxies=None):
+        start = time.perf_counter()
+        response = self.transport.request(method, url, headers=headers, data=data, json=json, files=files,
+                                          timeout=timeout, verify=verify, proxies=proxies)
+        with self._lock:
+            self.durations.append(time.perf_counter() - start)
+        return response
+
+    def close(self):
+        self.transport.close()
+
+
+def _sync_client(base_url, args, durations):
+    transport = TimingTransport(RequestsTransport())
+    transport.durations = durations
+    return client_v4.Tempo(auth_token="token", base_url=base_url, limit=args.page_size, transport=transport,
+                           retry=RetryPolicy(), codec=args.codec, adaptive_limit=args.adaptive_limit)
+
+
+def run_sync(base_url, args, durations):
+    tempo = _sync_client(base_url, args, durations)
+    return len(tempo.get_worklogs(DATE_FROM, DATE_TO, as_records=args.records))
+
+
+def run_stream(base_url, args, durations):
+    tempo = _sync_client(base_url, args, durations)
+    return sum(1 for _ in tempo.iter_worklogs(DATE_FROM, DATE_TO, as_records=args.records))
+
+
+def run_parallel(base_url, args, durations):
+    tempo = _sync_client(base_url, args, durations)
+    return len(tempo.get_worklogs(DATE_FROM, DATE_TO, parallel_pages=args.parallel_pages,
+                                  as_records=args.records))
+
+
+def run_search(base_url, args, durations):
+    tempo = _sync_client(base_url, args, durations)
+    return len(tempo.search_worklogs(DATE_FROM, DATE_TO, parallel_pages=args.parallel_pages,
+                                     as_records=args.records))
+
+
+def run_async(base_url, args, durations):
+    from tempoapiclient.client_v4_async import AsyncTempo
+
+    async def fetch():
+        async with AsyncTempo(auth_token="token", base_url=base_url, limit=args.page_size,
+                              parallel_pages=args.parallel_pages, retry=RetryPolicy(), codec=args.codec,
+                              adaptive_limit=args.adaptive_limit) as tempo:
+            send = tempo._async_session.request
+
+            async def timed_request(*a, **kwargs):
+                start = time.perf_counter()
+                response = await send(*a, **kwargs)
+                durations.append(time.perf_counter() - start)
+                return response
+
+            tempo._async_session.request = timed_request
+            return len(await tempo.get_worklogs(DATE_FROM, DATE_TO, as_records=args.records))
+
+    return asyncio.run(fetch())
+
+
+SCENARIOS = {
+    "sync": run_sync,
+    "stream": run_stream,
+    "parallel": run_parallel,
+    "search": run_search,
+    "async": run_async,
+}
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+
+def measure(scenario, base_url, args):
+    """
+    Runs ``scenario`` ``args.repeat`` times for time and CPU, then once more under ``tracemalloc`` for memory.
+    """
+    walls, cpus, durations = [], [], []
+    records = 0
+    for _ in range(args.repeat):
+        wall, cpu = time.perf_counter(), time.process_time()
+        records = scenario(base_url, args, durations)
+        walls.append(time.perf_counter() - wall)
+        cpus.append(time.process_time() - cpu)
+
+    tracemalloc.start()
+    scenario(base_url, args, [])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    wall, cpu = statistics.median(walls), statistics.median(cpus)
+    return {
+        "records": records,
+        "requests": len(durations) // args.repeat,
+        "seconds": wall,
+        "records_per_second": records / wall if wall else 0.0,
+        "latency_p50_ms": percentile(durations, 0.5) * 1000,
+        "latency_p90_ms": percentile(durations, 0.9) * 1000,
+        "latency_p99_ms": percentile(durations, 0.99) * 1000,
+        "peak_memory_mb": peak / 2 ** 20,
+        "cpu_ms_per_10k_records": cpu * 1000 * 10000 / records if records else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--worklogs", type=int, default=50000, help="number of worklogs served")
+    parser.add_argument("--page-size", type=int, default=1000, help="limit requested by the client")
+    parser.add_argument("--max-page-size", type=int, default=5000, help="largest page served")
+    parser.add_argument("--parallel-pages", type=int, default=8, help="pages in flight (parallel/search/async)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds every response is delayed by")
+    parser.add_argument("--throttle-every", type=int, default=0, help="answer every n-th request with 429")
+    parser.add_argument("--codec", default=None, help="JSON codec of the client (json, orjson, msgspec)")
+    parser.add_argument("--records", action="store_true", help="fetch compact records instead of dicts")
+    parser.add_argument("--adaptive-limit", action="store_true", help="tune the page size per endpoint")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario, the median is reported")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    with TempoSimulator(worklogs=args.worklogs, max_page_size=args.max_page_size, latency=args.latency,
+                        throttle_every=args.throttle_every) as simulator:
+        print("{:<10} {:>8} {:>6} {:>8} {:>10} {:>8} {:>8} {:>8} {:>9} {:>10}".format(
+            "scenario", "records", "reqs", "seconds", "records/s", "p50 ms", "p90 ms", "p99 ms", "peak MB",
+            "CPU ms/10k"))
+        for name in args.scenarios:
+            try:
+                result = measure(SCENARIOS[name], simulator.base_url, args)
+            except ImportError as e:
+                print("{:<10} skipped: {}".format(name, e))
+                continue
+            results[name] = result
+            print("{:<10} {records:>8} {requests:>6} {seconds:>8.3f} {records_per_second:>10.0f} "
+                  "{latency_p50_ms:>8.2f} {latency_p90_ms:>8.2f} {latency_p99_ms:>8.2f} {peak_memory_mb:>9.1f} "
+                  "{cpu_ms_per_10k_records:>10.1f}".format(name, **result))
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"options": vars(args), "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
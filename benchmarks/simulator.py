@@ -0,0 +1,306 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#   http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Local, deterministic stand-in for the Tempo v4 API, serving generated worklogs, plans, teams and accounts with
+Tempo's pagination (``results`` and ``metadata.next``).
+
+The same options always produce the same data, so runs of the benchmarks are comparable. The simulator runs in
+a separate process, so its CPU time and memory do not count towards the client being measured:
+
+    with TempoSimulator(worklogs=100000, max_page_size=1000, latency=0.005) as simulator:
+        tempo = Tempo(auth_token="token", base_url=simulator.base_url)
+
+Run this file to serve the data on a fixed port:
+
+    python benchmarks/simulator.py --port 8080 --worklogs 100000
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+FIRST_DAY = date(2019, 1, 1)
+
+
+class TempoData(object):
+    """
+    Generated resources, ordered by date. Worklogs are spread evenly over ``days`` days from ``FIRST_DAY``.
+    """
+
+    def __init__(self, worklogs=50000, plans=5000, teams=20, accounts=50, users=100, issues=2000, days=365):
+        self.users = ["user-{:04d}".format(n) for n in range(users)]
+        self.worklogs = [self._worklog(n, worklogs, users, issues, days) for n in range(worklogs)]
+        self.plans = [self._plan(n, plans, users, issues, days) for n in range(plans)]
+        self.teams = [{"self": "/teams/{}".format(n + 1), "id": n + 1, "name": "Team {}".format(n + 1),
+                       "summary": None, "lead": {"accountId": self.users[n % users]}} for n in range(teams)]
+        self.accounts = [{"self": "/accounts/{}".format(n + 1), "id": n + 1, "key": "ACC-{}".format(n + 1),
+                          "name": "Account {}".format(n + 1), "status": "OPEN", "global": n % 5 == 0,
+                          "lead": {"accountId": self.users[n % users]}} for n in range(accounts)]
+        self.memberships = {team["id"]: [{"id": team["id"] * 1000 + n, "member": {"accountId": user}}
+                                         for n, user in enumerate(self.users[team["id"] - 1::teams])]
+                            for team in self.teams}
+        self._worklog_dates = [worklog["startDate"] for worklog in self.worklogs]
+        self._plan_dates = [plan["startDate"] for plan in self.plans]
+
+    @staticmethod
+    def _worklog(n, count, users, issues, days):
+        day = (FIRST_DAY + timedelta(days=n * days // count)).isoformat()
+        return {
+            "self": "/worklogs/{}".format(n + 1),
+            "tempoWorklogId": n + 1,
+            "issue": {"id": 10000 + n % issues},
+            "timeSpentSeconds": 900 * (1 + n % 16),
+            "billableSeconds": 900 * (n % 16),
+            "startDate": day,
+            "startTime": "{:02d}:00:00".format(8 + n % 9),
+            "description": "Worklog {}".format(n + 1),
+            "createdAt": day + "T18:00:00Z",
+            "updatedAt": day + "T18:00:00Z",
+            "author": {"accountId": "user-{:04d}".format(n % users)},
+            "attributes": {"values": [{"key": "_Account_", "value": "ACC-{}".format(1 + n % 7)}]},
+        }
+
+    @staticmethod
+    def _plan(n, count, users, issues, days):
+        start = FIRST_DAY + timedelta(days=n * days // count)
+        return {
+            "self": "/plans/{}".format(n + 1),
+            "id": n + 1,
+            "assignee": {"id": "user-{:04d}".format(n % users), "type": "USER"},
+            "planItem": {"id": 10000 + n % issues, "type": "ISSUE"},
+            "startDate": start.isoformat(),
+            "endDate": (start + timedelta(days=n % 5)).isoformat(),
+            "plannedSecondsPerDay": 3600 * (1 + n % 8),
+            "includeNonWorkingDays": False,
+            "rule": "NEVER",
+            "createdAt": start.isoformat() + "T12:00:00Z",
+            "updatedAt": start.isoformat() + "T12:00:00Z",
+        }
+
+    def worklogs_between(self, dateFrom, dateTo):
+        return self.worklogs[bisect_left(self._worklog_dates, dateFrom):bisect_right(self._worklog_dates, dateTo)]
+
+    def plans_between(self, dateFrom, dateTo):
+        return self.plans[bisect_left(self._plan_dates, dateFrom):bisect_right(self._plan_dates, dateTo)]
+
+
+class SimulatorHandler(BaseHTTPRequestHandler):
+    """
+    Answers the Tempo endpoints from the server's ``TempoData``.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def _handle(self, method):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.server.throttled():
+            return self._send(429, b'{"errors": [{"message": "Too many requests"}]}',
+                              {"Retry-After": str(self.server.retry_after)})
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        url = urlsplit(self.path)
+        query = dict(parse_qsl(url.query))
+        if method == "POST":
+            query.update(json.loads(body or b"{}"))
+        path = url.path[len(self.server.prefix):]
+        content = self.server.page(method, path, json.dumps(query, sort_keys=True), self.headers.get("Host"))
+        if content is None:
+            return self._send(404, b'{"errors": [{"message": "Not found"}]}')
+        self._send(200, content)
+
+    def _send(self, status_code, content, headers=None):
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class SimulatorServer(ThreadingHTTPServer):
+    """
+    HTTP server of the simulator. Pages are serialized once and kept, so serving stays cheap compared to the
+    client being measured.
+    """
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address, data, max_page_size=5000, latency=0.0, throttle_every=0, retry_after=0.01,
+                 prefix="/4"):
+        super().__init__(address, SimulatorHandler)
+        self.data = data
+        self.max_page_size = max_page_size
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.prefix = prefix
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+        self.page = lru_cache(maxsize=4096)(self._page)
+
+    def throttled(self):
+        if not self.throttle_every:
+            return False
+        with self._lock:
+            return next(self._counter) % self.throttle_every == 0
+
+    def _results(self, method, path, query):
+        parts = path.strip("/").split("/")
+        data = self.data
+        if parts[0] == "worklogs" and method == "GET":
+            results = data.worklogs_between(query.get("from", "0000"), query.get("to", "9999"))
+            if len(parts) == 3 and parts[1] == "user":
+                results = [worklog for worklog in results if worklog["author"]["accountId"] == parts[2]]
+            elif len(parts) == 3 and parts[1] == "issue":
+                results = [worklog for worklog in results if str(worklog["issue"]["id"]) == parts[2]]
+            elif len(parts) != 1:
+                return None
+            return results
+        if parts == ["worklogs", "search"] and method == "POST":
+            results = data.worklogs_between(query.get("from", "0000"), query.get("to", "9999"))
+            if query.get("authorIds"):
+                authorIds = set(query["authorIds"])
+                results = [worklog for worklog in results if worklog["author"]["accountId"] in authorIds]
+            if query.get("issueIds"):
+                issueIds = set(query["issueIds"])
+                results = [worklog for worklog in results if worklog["issue"]["id"] in issueIds]
+            return results
+        if parts == ["plans", "search"] and method == "POST":
+            results = data.plans_between(query.get("from", "0000"), query.get("to", "9999"))
+            if query.get("accountIds"):
+                accountIds = set(query["accountIds"])
+                results = [plan for plan in results if plan["assignee"]["id"] in accountIds]
+            return results
+        if parts[:2] == ["plans", "user"] and len(parts) == 3 and method == "GET":
+            return [plan for plan in data.plans_between(query.get("from", "0000"), query.get("to", "9999"))
+                    if plan["assignee"]["id"] == parts[2]]
+        if parts == ["teams"] and method == "GET":
+            return data.teams
+        if parts == ["accounts"] and method == "GET":
+            return data.accounts
+        if parts[0] == "teams" and parts[2:] == ["members"] and method == "GET":
+            return data.memberships.get(int(parts[1]))
+        return None
+
+    def _page(self, method, path, query, host):
+        query = json.loads(query)
+        results = self._results(method, path, query)
+        if results is None:
+            return None
+        offset = int(query.get("offset", 0))
+        limit = min(int(query.get("limit", 50)), self.max_page_size)
+        page = results[offset:offset + limit]
+        metadata = {"count": len(page), "offset": offset, "limit": limit}
+        if offset + limit < len(results):
+            next_query = {key: value for key, value in query.items() if not isinstance(value, list)}
+            next_query.update(offset=offset + limit, limit=limit)
+            metadata["next"] = "http://{}{}{}?{}".format(host, self.prefix, path, urlencode(next_query))
+        return json.dumps({"self": path, "metadata": metadata, "results": page}).encode("utf-8")
+
+
+def _serve(options, port, ready):
+    server = SimulatorServer(("127.0.0.1", port), TempoData(**options.pop("data")), **options)
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+class TempoSimulator(object):
+    """
+    Runs a ``SimulatorServer`` in a child process.
+    """
+
+    def __init__(self, worklogs=50000, plans=5000, teams=20, accounts=50, users=100, max_page_size=5000,
+                 latency=0.0, throttle_every=0, retry_after=0.01, port=0):
+        """
+        :param worklogs: number of generated worklogs, spread over the year 2019
+        :param plans: number of generated plans
+        :param teams: number of generated teams
+        :param accounts: number of generated accounts
+        :param users: number of distinct worklog authors and plan assignees
+        :param max_page_size: largest page served, larger ``limit`` values are clamped like Tempo does
+        :param latency: seconds every response is delayed by
+        :param throttle_every: answer every n-th request with ``429 Too Many Requests``, 0 never throttles
+        :param retry_after: ``Retry-After`` seconds sent with throttled responses
+        :param port: port to listen on, 0 picks a free one
+        """
+        self.options = {
+            "data": {"worklogs": worklogs, "plans": plans, "teams": teams, "accounts": accounts, "users": users},
+            "max_page_size": max_page_size,
+            "latency": latency,
+            "throttle_every": throttle_every,
+            "retry_after": retry_after,
+        }
+        self.port = port
+        self.base_url = None
+        self._process = None
+
+    def start(self):
+        context = multiprocessing.get_context("spawn")
+        ready = context.Queue()
+        self._process = context.Process(target=_serve, args=(dict(self.options), self.port, ready), daemon=True)
+        self._process.start()
+        self.base_url = "http://127.0.0.1:{}/4".format(ready.get(timeout=120))
+        return self
+
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--worklogs", type=int, default=50000)
+    parser.add_argument("--plans", type=int, default=5000)
+    parser.add_argument("--max-page-size", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--throttle-every", type=int, default=0)
+    args = parser.parse_args()
+
+    data = TempoData(worklogs=args.worklogs, plans=args.plans)
+    server = SimulatorServer(("127.0.0.1", args.port), data, max_page_size=args.max_page_size,
+                             latency=args.latency, throttle_every=args.throttle_every)
+    print("Serving http://127.0.0.1:{}/4".format(server.server_address[1]))
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -21,5 +21,15 @@ setuptools.setup(
     install_requires=[
         "requests"
     ],
+    extras_require={
+        "async": ["httpx"],
+        "http2": ["httpx[http2]"],
+        "orjson": ["orjson"],
+        "msgspec": ["msgspec"],
+        "arrow": ["pyarrow"],
+        "numpy": ["numpy"],
+        "prometheus": ["prometheus-client"],
+        "opentelemetry": ["opentelemetry-api"],
+    },
     python_requires='>=3.10.14',
 )
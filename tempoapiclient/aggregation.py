@@ -0,0 +1,225 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#   http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Vectorized totals of worklog durations, grouped by user, issue, account, team and calendar periods.
+
+Worklogs are converted to NumPy columns once (see ``columnar.to_numpy``) and grouped with array operations, so
+no Python code runs per worklog after the conversion. Any function taking ``worklogs`` accepts an iterable of
+worklog dicts or ``models.Worklog`` records, or the dict returned by ``columnar.to_numpy`` to reuse one
+conversion for several reports. Requires ``pip install tempo-api-python-client[numpy]``.
+
+    worklogs = columnar.to_numpy(tempo.iter_worklogs(dateFrom="2019-11-01", dateTo="2019-11-30"),
+                                 columns=columnar.DEFAULT_COLUMNS + ("attribute:_Account_",))
+    per_user_day = aggregation.pivot(worklogs, "authorAccountId", "day")
+    per_account_month = aggregation.by_account_month(worklogs)
+"""
+
+from collections import namedtuple
+
+from . import columnar
+from .columnar import Categorical, numpy
+
+VALUES = ("timeSpentSeconds", "billableSeconds")
+
+# keys derived from ``startDate``
+PERIODS = ("day", "week", "month", "year")
+
+ACCOUNT_ATTRIBUTE = "attribute:_Account_"
+
+Pivot = namedtuple("Pivot", ["index", "columns", "values"])
+Pivot.__doc__ = """
+Two-dimensional totals: ``values[i, j]`` is the total of the rows with ``index[i]`` and ``columns[j]``.
+"""
+
+
+def _columns(worklogs, keys, values):
+    if isinstance(worklogs, dict):
+        return worklogs
+    names = [key for key in keys if key not in PERIODS]
+    if any(key in PERIODS for key in keys):
+        names.append("startDate")
+    return columnar.to_numpy(worklogs, columns=tuple(dict.fromkeys(names + list(values))))
+
+
+def truncate_dates(dates, period):
+    """
+    Returns the first day of the ``period`` ("day", "week" starting on Monday, "month" or "year") of each date
+    of the ``datetime64[D]`` array.
+    """
+    if period == "day":
+        return dates
+    if period == "week":
+        # 1970-01-01, day 0, was a Thursday
+        return dates - (dates.astype(numpy.int64) + 3) % 7
+    if period == "month":
+        return dates.astype("datetime64[M]").astype("datetime64[D]")
+    if period == "year":
+        return dates.astype("datetime64[Y]").astype("datetime64[D]")
+    raise ValueError(f"Unknown period '{period}', use one of {', '.join(PERIODS)}")
+
+
+def _key_column(columns, key):
+    return truncate_dates(columns["startDate"], key) if key in PERIODS else columns[key]
+
+
+def _factorize(column):
+    """
+    Returns the sorted distinct values of the column and the index of each row's value among them.
+    Missing values (None) are sorted last.
+    """
+    if not isinstance(column, Categorical):
+        if column.dtype.kind == "M" and len(column) and not numpy.isnat(column).any():
+            # dates span a small range of days, counting them avoids sorting
+            days = column.astype(numpy.int64)
+            first = days.min()
+            labels, codes = _compact(days - first)
+            return (labels + first).astype(column.dtype), codes
+        labels, codes = numpy.unique(column, return_inverse=True)
+        return labels, codes.reshape(-1)
+    categories = numpy.append(column.categories, None)
+    # code -1 (missing) picks the None appended last
+    codes = numpy.where(column.codes < 0, len(categories) - 1, column.codes)
+    used = numpy.unique(codes)
+    order = sorted(range(len(used)), key=lambda i: (categories[used[i]] is None, str(categories[used[i]])))
+    rank = numpy.empty(len(categories), dtype=numpy.int64)
+    rank[used[order]] = numpy.arange(len(used))
+    return categories[used[order]], rank[codes]
+
+
+def _compact(codes, size=None):
+    """
+    Returns the distinct values of the non-negative integer array ``codes`` (all smaller than ``size``) and the
+    index of each element's value among them, in linear time.
+    """
+    present = numpy.bincount(codes, minlength=size or 0) > 0
+    rank = numpy.cumsum(present) - 1
+    return numpy.flatnonzero(present), rank[codes]
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError("Aggregation requires numpy, install it with "
+                          "`pip install tempo-api-python-client[numpy]`")
+
+
+def aggregate(worklogs, by, values=VALUES):
+    """
+    Sums ``values`` per distinct combination of the ``by`` keys.
+    :param worklogs: worklogs, or columns returned by ``columnar.to_numpy``
+    :param by: column names of ``columnar`` (e.g. "authorAccountId", "issueId", "attribute:_Account_") and
+        periods of ``startDate`` ("day", "week", "month", "year")
+    :param values: integer columns to sum
+    :return: dict of arrays with one element per group, sorted by the keys: the keys, the sums and ``count``
+    """
+    _require_numpy()
+    columns = _columns(worklogs, by, values)
+    labels, codes = zip(*[_factorize(_key_column(columns, key)) for key in by])
+    dims = [max(len(key_labels), 1) for key_labels in labels]
+
+    group = numpy.ravel_multi_index(codes, dims)
+    if numpy.prod(dims, dtype=numpy.float64) <= max(4 * len(group), 1 << 20):
+        groups, inverse = _compact(group, int(numpy.prod(dims)))
+    else:
+        groups, inverse = numpy.unique(group, return_inverse=True)
+        inverse = inverse.reshape(-1)
+
+    result = {key: key_labels[key_codes]
+              for key, key_labels, key_codes in zip(by, labels, numpy.unravel_index(groups, dims))}
+    for name in values:
+        # float64 sums of seconds are exact far beyond any realistic total
+        result[name] = numpy.bincount(inverse, weights=columns[name], minlength=len(groups)).astype(numpy.int64)
+    result["count"] = numpy.bincount(inverse, minlength=len(groups))
+    return result
+
+
+def pivot(worklogs, index, columns, value="timeSpentSeconds"):
+    """
+    Returns the totals of ``value`` as a ``Pivot`` matrix, e.g. ``pivot(worklogs, "authorAccountId", "day")``
+    for a user by day timesheet. Keys are the same as for ``aggregate``.
+    """
+    _require_numpy()
+    data = _columns(worklogs, (index, columns), (value,))
+    index_labels, rows = _factorize(_key_column(data, index))
+    column_labels, cols = _factorize(_key_column(data, columns))
+    shape = (len(index_labels), len(column_labels))
+    totals = numpy.bincount(rows * shape[1] + cols, weights=data[value], minlength=shape[0] * shape[1])
+    return Pivot(index_labels, column_labels, totals.astype(numpy.int64).reshape(shape))
+
+
+def by_user_day(worklogs, values=VALUES):
+    """
+    Totals per user and day.
+    """
+    return aggregate(worklogs, ("authorAccountId", "day"), values=values)
+
+
+def by_issue(worklogs, values=VALUES):
+    """
+    Totals per issue.
+    """
+    return aggregate(worklogs, ("issueId",), values=values)
+
+
+def by_account_month(worklogs, values=VALUES, attribute=ACCOUNT_ATTRIBUTE):
+    """
+    Totals per account and month, the account is read from the work attribute column ``attribute``.
+    """
+    return aggregate(worklogs, (attribute, "month"), values=values)
+
+
+def assign_periods(dates, periods):
+    """
+    Returns the index of the period containing each date, or -1 for dates outside of all periods.
+    :param dates: ``datetime64[D]`` array
+    :param periods: list of ``{"from": ..., "to": ...}`` dicts as returned by ``Tempo.get_periods``, in order
+    """
+    starts = numpy.array([period["from"] for period in periods], dtype="datetime64[D]")
+    ends = numpy.array([period["to"] for period in periods], dtype="datetime64[D]")
+    index = numpy.searchsorted(starts, dates, side="right") - 1
+    inside = (index >= 0) & (dates <= ends[numpy.maximum(index, 0)])
+    return numpy.where(inside, index, -1)
+
+
+def by_team_period(tempo, dateFrom, dateTo, teamIds, values=VALUES, parallel_pages=None):
+    """
+    Totals per team and Tempo period (see ``Tempo.get_periods``), fetching the worklogs of each team.
+    :param tempo: ``client_v4.Tempo`` instance
+    :return: dict of arrays ``teamId``, ``periodFrom``, ``periodTo``, the sums and ``count``, one element per
+        team and period
+    """
+    _require_numpy()
+    periods = tempo.get_periods(dateFrom, dateTo)
+    periods = periods.get("periods", []) if isinstance(periods, dict) else periods
+    teams, counts, sums = [], [], {name: [] for name in values}
+    for teamId in teamIds:
+        worklogs = tempo.iter_worklogs(dateFrom, dateTo, teamId=teamId, parallel_pages=parallel_pages)
+        columns = columnar.to_numpy(worklogs, columns=("startDate",) + tuple(values))
+        index = assign_periods(columns["startDate"], periods)
+        inside = index >= 0
+        teams.append(teamId)
+        counts.append(numpy.bincount(index[inside], minlength=len(periods)))
+        for name in values:
+            sums[name].append(numpy.bincount(index[inside], weights=columns[name][inside],
+                                             minlength=len(periods)).astype(numpy.int64))
+
+    result = {
+        "teamId": numpy.repeat(numpy.array(teams, dtype=object), len(periods)),
+        "periodFrom": numpy.tile(numpy.array([period["from"] for period in periods], dtype="datetime64[D]"),
+                                 len(teams)),
+        "periodTo": numpy.tile(numpy.array([period["to"] for period in periods], dtype="datetime64[D]"),
+                               len(teams)),
+    }
+    for name in values:
+        result[name] = numpy.concatenate(sums[name]) if teams else numpy.zeros(0, dtype=numpy.int64)
+    result["count"] = numpy.concatenate(counts) if teams else numpy.zeros(0, dtype=numpy.int64)
+    return result
@@ -0,0 +1,105 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#   http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Running many independent API calls with bounded concurrency, collecting errors per item.
+"""
+
+import asyncio
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ItemResult(namedtuple("ItemResult", ["item", "value", "error"])):
+    """
+    Outcome of one item of a batch: the returned ``value`` or the ``error`` raised for ``item``.
+    """
+
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class BatchResults(namedtuple("BatchResults", ["results", "errors"])):
+    """
+    Outcome of a batch over IDs: ``results`` maps every ID which succeeded to its value, ``errors`` every ID
+    which failed to the error raised for it.
+    """
+
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    @classmethod
+    def from_items(cls, item_results):
+        results, errors = {}, {}
+        for item_result in item_results:
+            if item_result.ok:
+                results[item_result.item] = item_result.value
+            else:
+                errors[item_result.item] = item_result.error
+        return cls(results, errors)
+
+
+def _call(func, item):
+    try:
+        return ItemResult(item, func(item), None)
+    # the client raises SystemExit on HTTP errors, which must not abort the rest of the batch
+    except (Exception, SystemExit) as err:
+        return ItemResult(item, None, err)
+
+
+def run_batch(func, items, max_workers=8):
+    """
+    Calls ``func`` for every item on a bounded thread pool.
+    :param func: callable taking one item
+    :param items: iterable of items
+    :param max_workers: number of calls running at the same time
+    :return: list of ``ItemResult`` in the order of ``items``
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda item: _call(func, item), items))
+
+
+def fan_out(func, ids, max_workers=8):
+    """
+    Calls ``func`` once for every distinct ID on a bounded thread pool.
+    :return: ``BatchResults`` mapping the IDs to their values and errors
+    """
+    return BatchResults.from_items(run_batch(func, dict.fromkeys(ids), max_workers=max_workers))
+
+
+async def _acall(func, item, semaphore):
+    async with semaphore:
+        try:
+            return ItemResult(item, await func(item), None)
+        except (Exception, SystemExit) as err:
+            return ItemResult(item, None, err)
+
+
+async def arun_batch(func, items, max_workers=8):
+    """
+    Asynchronous counterpart of ``run_batch``, ``func`` returns an awaitable.
+    """
+    semaphore = asyncio.Semaphore(max_workers)
+    return list(await asyncio.gather(*[_acall(func, item, semaphore) for item in items]))
+
+
+async def afan_out(func, ids, max_workers=8):
+    """
+    Asynchronous counterpart of ``fan_out``, ``func`` returns an awaitable.
+    """
+    return BatchResults.from_items(await arun_batch(func, dict.fromkeys(ids), max_workers=max_workers))
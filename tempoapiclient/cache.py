@@ -0,0 +1,213 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#   http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+In-memory caching of responses of rarely changing endpoints.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from copy import deepcopy
+
+
+def _normalize(path):
+    return "/" + path.strip("/")
+
+
+def _resource(path):
+    return _normalize(path).split("/")[1]
+
+
+class ResponseCache(object):
+    """
+    Size bounded LRU cache with a time to live per endpoint.
+
+    Endpoints are matched by path prefix, the longest matching prefix in ``ttls`` decides the time to live
+    of a response. Responses of paths without a matching prefix are not cached, unless ``default_ttl`` is set.
+    Cached values are copied on the way in and out, so callers may modify what they get back.
+
+        tempo = Tempo(auth_token="<your_tempo_api_key>", cache=ResponseCache(ttls={"/teams": 60}))
+    """
+
+    DEFAULT_TTLS = {
+        "/accounts": 300,
+        "/account-categories": 3600,
+        "/account-category-types": 3600,
+        "/customers": 300,
+        "/holiday-schemes": 3600,
+        "/teams": 300,
+        "/work-attributes": 3600,
+        "/workload-schemes": 3600,
+    }
+
+    # writes to a resource change the responses of these resources as well
+    RELATED_RESOURCES = {
+        "team-memberships": ("teams",),
+    }
+
+    def __init__(self, maxsize=256, ttls=None, default_ttl=None, clock=time.monotonic):
+        """
+        :param maxsize: maximum number of cached responses, the least recently used are evicted first
+        :param ttls: time to live in seconds per path prefix, defaults to ``DEFAULT_TTLS``
+        :param default_ttl: time to live of responses of other paths, None disables caching them
+        :param clock: function returning the current time in seconds
+        """
+        self._maxsize = maxsize
+        ttls = self.DEFAULT_TTLS if ttls is None else ttls
+        self._ttls = {_normalize(prefix): ttl for prefix, ttl in ttls.items()}
+        self._default_ttl = default_ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._cleared = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def ttl(self, path):
+        """
+        Returns the time to live for responses of ``path``, or None if they are not cached.
+        """
+        path = _normalize(path)
+        matches = [prefix for prefix in self._ttls if path == prefix or path.startswith(prefix + "/")]
+        if not matches:
+            return self._default_ttl
+        return self._ttls[max(matches, key=len)]
+
+    @staticmethod
+    def key(path, params=None):
+        return _normalize(path), tuple(sorted(
+            (name, repr(value)) for name, value in (params or {}).items()))
+
+    def get(self, path, params=None):
+        """
+        Returns ``(True, value)`` for a fresh cached response, ``(False, None)`` otherwise.
+        """
+        if not self.ttl(path):
+            return False, None
+        key = self.key(path, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[1]
+        return True, deepcopy(value)
+
+    def generation(self, path):
+        """
+        Returns a token which changes whenever the responses of the resource ``path`` belongs to are
+        invalidated. Pass it to ``set`` to drop responses which were requested before an invalidation.
+        """
+        with self._lock:
+            return self._cleared, self._generations.get(_resource(path), 0)
+
+    def set(self, path, params, value, generation=None):
+        """
+        Stores the response of ``path`` if the endpoint is cached.
+        :param generation: OPTIONAL: ``generation(path)`` taken before the request, the response is not stored
+            if the resource was invalidated since, as it may predate a write
+        """
+        ttl = self.ttl(path)
+        if not ttl:
+            return
+        key = self.key(path, params)
+        value = deepcopy(value)
+        with self._lock:
+            if generation is not None and generation != (self._cleared, self._generations.get(_resource(path), 0)):
+                return
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, path=None):
+        """
+        Drops all cached responses of the resource ``path`` belongs to (e.g. everything under ``/accounts``
+        for ``/accounts/ACC-1``) and of its ``RELATED_RESOURCES``, or the whole cache when ``path`` is None.
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._cleared += 1
+                return
+            resource = _resource(path)
+            resources = (resource,) + self.RELATED_RESOURCES.get(resource, ())
+            for name in resources:
+                self._generations[name] = self._generations.get(name, 0) + 1
+            for key in [key for key in self._entries if _resource(key[0]) in resources]:
+                del self._entries[key]
+
+
+class ValidatorStore(object):
+    """
+    Size bounded LRU store of response validators (``ETag``, ``Last-Modified``) and parsed payloads per URL,
+    used by ``RestAPIClient`` to send conditional GET requests.
+    Payloads served for a ``304 Not Modified`` are shared between calls and should be treated as read-only.
+    """
+
+    def __init__(self, maxsize=1024):
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def headers(self, url):
+        """
+        Returns the conditional request headers for ``url``, empty if nothing is stored for it.
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is None:
+            return {}
+        headers = {}
+        if entry[0]:
+            headers["If-None-Match"] = entry[0]
+        if entry[1]:
+            headers["If-Modified-Since"] = entry[1]
+        return headers
+
+    def get(self, url):
+        """
+        Returns ``(True, payload)`` if a payload is stored for ``url``, ``(False, None)`` otherwise.
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return False, None
+            self._entries.move_to_end(url)
+            self.hits += 1
+        return True, entry[2]
+
+    def set(self, url, response_headers, payload):
+        """
+        Stores the payload of ``url`` if the response carried a validator.
+        """
+        etag, last_modified = response_headers.get("ETag"), response_headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            self._entries[url] = (etag, last_modified, payload)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
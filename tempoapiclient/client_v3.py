@@ -15,6 +15,7 @@ from __future__ import unicode_literals
 
 from datetime import date, datetime
 
+from .pagination import iter_results, iter_results_parallel
 from .rest_client import RestAPIClient
 
 
@@ -23,10 +24,15 @@ class Tempo(RestAPIClient):
     Basic Client for accessing Tempo Rest API as provided by api.tempo.io.
     """
 
-    def __init__(self, auth_token, base_url="https://api.tempo.io/core/3", limit=1000):
+    def __init__(self, auth_token, base_url="https://api.tempo.io/core/3", limit=1000, parallel_pages=None,
+                 timeout=None, verify_ssl=None, proxies=None, transport_config=None, transport=None,
+                 codec=None, instrumentation=None):
         self._limit = limit   # default limit for pagination (1000 is maximum for Tempo API)
+        self._parallel_pages = parallel_pages   # number of pages fetched at the same time, None fetches serially
         self._base_url = base_url
-        super().__init__(auth_token=auth_token)
+        super().__init__(auth_token=auth_token, timeout=timeout, verify_ssl=verify_ssl, proxies=proxies,
+                         transport_config=transport_config, transport=transport, codec=codec,
+                         instrumentation=instrumentation)
 
     def _resolve_date(self, value):
         if isinstance(value, datetime):
@@ -38,24 +44,61 @@ class Tempo(RestAPIClient):
 
         return parsed
 
-    def get(self, path, data=None, flags=None, params=None, headers=None, not_json_response=None, trailing=None):
+    def _get_first_page(self, path, data=None, flags=None, params=None, headers=None, not_json_response=None,
+                        trailing=None):
         path_absolute = super().url_joiner(self._base_url, path)
-        resp = super().get(path_absolute, data=data, flags=flags, params=params, headers=headers,
+        return super().get(path_absolute, data=data, flags=flags, params=params, headers=headers,
                            not_json_response=not_json_response, trailing=trailing)
 
+    def _get_next_page(self, resp):
+        return super().get(resp.get('metadata').get('next'))
+
+    def _iter_all_results(self, resp, path, data=None, flags=None, params=None, headers=None, trailing=None,
+                          parallel_pages=None):
+        parallel_pages = parallel_pages or self._parallel_pages
+        if not parallel_pages or parallel_pages < 2:
+            return iter_results(resp, self._get_next_page)
+
+        def fetch_page(offset, limit):
+            page_params = dict(params or {}, offset=offset, limit=limit)
+            return self._get_first_page(path, data=data, flags=flags, params=page_params, headers=headers,
+                                        trailing=trailing)
+
+        return iter_results_parallel(resp, fetch_page, parallel_pages)
+
+    def get(self, path, data=None, flags=None, params=None, headers=None, not_json_response=None, trailing=None,
+            parallel_pages=None):
+        """
+        :param parallel_pages: OPTIONAL: number of pages fetched at the same time, defaults to the client setting
+        """
+        resp = self._get_first_page(path, data=data, flags=flags, params=params, headers=headers,
+                                    not_json_response=not_json_response, trailing=trailing)
+
         # single item returned
         if 'results' not in resp:
             return resp
 
-        # multiple items
-        results = resp['results']
+        # multiple items, handle all results paginated
+        return list(self._iter_all_results(resp, path, data=data, flags=flags, params=params, headers=headers,
+                                           trailing=trailing, parallel_pages=parallel_pages))
 
-        # handle all results paginated
-        while 'next' in resp.get('metadata'):
-            resp = super().get(resp.get('metadata').get('next'))
-            results.extend(resp['results'])
+    def iter_get(self, path, data=None, flags=None, params=None, headers=None, not_json_response=None,
+                 trailing=None, parallel_pages=None):
+        """
+        Same as ``get``, but yields the results page by page instead of collecting them into one list.
+        The next page is requested only after the current one was consumed, so memory stays bounded by one page
+        (or by ``parallel_pages`` pages when pages are fetched in parallel).
+        A single item response is yielded as the only element.
+        """
+        resp = self._get_first_page(path, data=data, flags=flags, params=params, headers=headers,
+                                    not_json_response=not_json_response, trailing=trailing)
+
+        if 'results' not in resp:
+            yield resp
+            return
 
-        return results
+        yield from self._iter_all_results(resp, path, data=data, flags=flags, params=params, headers=headers,
+                                          trailing=trailing, parallel_pages=parallel_pages)
 
     def post(self, path, data=None, params=None, headers=None, not_json_response=None, trailing=None):
         path_absolute = super().url_joiner(self._base_url, path)
@@ -99,7 +142,8 @@ class Tempo(RestAPIClient):
         return self.get(url)
 
     # Plans
-    def get_plans(self, dateFrom, dateTo, assigneeType=None, planItemType=None, updatedFrom=None, id=None, userId=None):
+    def get_plans(self, dateFrom, dateTo, assigneeType=None, planItemType=None, updatedFrom=None, id=None, userId=None,
+                  parallel_pages=None):
         """
         Retrieves plans or plan.
         :param dateFrom:
@@ -109,6 +153,7 @@ class Tempo(RestAPIClient):
         :param updatedFrom:
         :param id: Plan id
         :param userId: ```AccountId``` for user in Tempo
+        :param parallel_pages: number of pages fetched at the same time
         """
         params = {
             "from": self._resolve_date(dateFrom).isoformat(),
@@ -128,7 +173,7 @@ class Tempo(RestAPIClient):
             url += f"/{id}"
         elif userId:
             url += f"/plans/user/{userId}"
-        return self.get(url, params=params)
+        return self.get(url, params=params, parallel_pages=parallel_pages)
 
     # Programs
     ## TBD
@@ -325,23 +370,8 @@ class Tempo(RestAPIClient):
 
 # Worklogs
 
-    def get_worklogs(self, dateFrom, dateTo, updatedFrom=None, worklogId=None, jiraWorklogId=None, jiraFilterId=None,
-                     accountKey=None, projectKey=None, teamId=None, accountId=None, issueId=None):
-        """
-        Returns worklogs for particular parameters.
-        :param dateFrom:
-        :param dateTo:
-        :param updatedFrom:
-        :param worklogId:
-        :param jiraWorklogId:
-        :param jiraFilterId:
-        :param accountKey:
-        :param projectKey:
-        :param teamId:
-        :param accountId:
-        :param issue:
-        """
-
+    def _worklogs_query(self, dateFrom, dateTo, updatedFrom=None, worklogId=None, jiraWorklogId=None, jiraFilterId=None,
+                         accountKey=None, projectKey=None, teamId=None, accountId=None, issueId=None):
         params = {
             "from": self._resolve_date(dateFrom).isoformat(),
             "to": self._resolve_date(dateTo).isoformat(),
@@ -370,4 +400,42 @@ class Tempo(RestAPIClient):
         elif issueId:
             url += f"/issue/{issueId}"
 
-        return self.get(url, params=params)
+        return url, params
+
+    def get_worklogs(self, dateFrom, dateTo, updatedFrom=None, worklogId=None, jiraWorklogId=None, jiraFilterId=None,
+                     accountKey=None, projectKey=None, teamId=None, accountId=None, issueId=None,
+                     parallel_pages=None):
+        """
+        Returns worklogs for particular parameters.
+        :param dateFrom:
+        :param dateTo:
+        :param updatedFrom:
+        :param worklogId:
+        :param jiraWorklogId:
+        :param jiraFilterId:
+        :param accountKey:
+        :param projectKey:
+        :param teamId:
+        :param accountId:
+        :param issue:
+        :param parallel_pages: number of pages fetched at the same time
+        """
+
+        url, params = self._worklogs_query(dateFrom, dateTo, updatedFrom=updatedFrom, worklogId=worklogId,
+                                           jiraWorklogId=jiraWorklogId, jiraFilterId=jiraFilterId,
+                                           accountKey=accountKey, projectKey=projectKey, teamId=teamId,
+                                           accountId=accountId, issueId=issueId)
+        return self.get(url, params=params, parallel_pages=parallel_pages)
+
+    def iter_worklogs(self, dateFrom, dateTo, updatedFrom=None, worklogId=None, jiraWorklogId=None, jiraFilterId=None,
+                      accountKey=None, projectKey=None, teamId=None, accountId=None, issueId=None,
+                      parallel_pages=None):
+        """
+        Same as ``get_worklogs``, but yields the worklogs page by page as they arrive.
+        """
+
+        url, params = self._worklogs_query(dateFrom, dateTo, updatedFrom=updatedFrom, worklogId=worklogId,
+                                           jiraWorklogId=jiraWorklogId, jiraFilterId=jiraFilterId,
+                                           accountKey=accountKey, projectKey=projectKey, teamId=teamId,
+                                           accountId=accountId, issueId=issueId)
+        return self.iter_get(url, params=params, parallel_pages=parallel_pages)
@@ -14,8 +14,15 @@
 from __future__ import unicode_literals
 
 from datetime import date, datetime
-
+from urllib.parse import urlsplit
+from .batch import ItemResult, fan_out, run_batch
+from .instrumentation import PageCounter
+from .models import Account, Plan, Team, Worklog
+from .pagination import AdaptivePageSize, iter_results, iter_results_parallel, next_window, with_paging
+from .profiling import current_profiler, profiled, profiling
 from .rest_client import RestAPIClient
+from .sharding import fetch_sharded
+from .transport import TIMEOUT_ERRORS
 
 
 class Tempo(RestAPIClient):
@@ -23,10 +30,21 @@ class Tempo(RestAPIClient):
     Basic Client for accessing Tempo Rest API as provided by api.tempo.io.
     """
 
-    def __init__(self, auth_token, base_url="https://api.tempo.io/4", limit=5000):
-        self._limit = limit   # default limit for pagination (1000 is maximum for Tempo API)
+    def __init__(self, auth_token, base_url="https://api.tempo.io/4", limit=5000, parallel_pages=None, cache=None,
+                 conditional_requests=None, rate_limiter=None, retry=None, timeout=None, verify_ssl=None, proxies=None,
+                 transport_config=None, transport=None, codec=None, coalesce_requests=None, instrumentation=None,
+                 profiler=None, adaptive_limit=None):
+        self._limit = limit   # default limit for pagination (5000 is maximum for Tempo API v4)
+        # pagination.AdaptivePageSize tuning the limit per endpoint, None always uses limit
+        self._adaptive_limit = AdaptivePageSize(initial=limit) if adaptive_limit is True else adaptive_limit or None
+        self._parallel_pages = parallel_pages   # number of pages fetched at the same time, None fetches serially
+        self._cache = cache   # cache.ResponseCache for rarely changing endpoints, None disables caching
+        self._profiler = profiler   # profiling.PaginationProfiler recording every paginated call, None disables it
         self._base_url = base_url
-        super().__init__(auth_token=auth_token)
+        super().__init__(auth_token=auth_token, timeout=timeout, verify_ssl=verify_ssl, proxies=proxies,
+                         conditional_requests=conditional_requests, rate_limiter=rate_limiter, retry=retry,
+                         transport_config=transport_config, transport=transport, codec=codec,
+                         coalesce_requests=coalesce_requests, instrumentation=instrumentation)
 
     def _resolve_date(self, value):
         if isinstance(value, datetime):
@@ -70,44 +88,246 @@ class Tempo(RestAPIClient):
             retval = retval.replace(i, "")
         return retval.strip()
 
-    def get(self, path, data=None, flags=None, params=None, headers=None, not_json_response=None, trailing=None):
+    def _get_first_page(self, path, data=None, flags=None, params=None, headers=None, not_json_response=None,
+                        trailing=None):
         path_absolute = super().url_joiner(self._base_url, path)
-        resp = super().get(path_absolute, data=data, flags=flags, params=params, headers=headers,
+        return super().get(path_absolute, data=data, flags=flags, params=params, headers=headers,
                            not_json_response=not_json_response, trailing=trailing)
 
+    def _get_next_page(self, resp):
+        return super().get(resp.get('metadata').get('next'))
+
+    def _iter_all_results(self, resp, path, data=None, flags=None, params=None, headers=None, trailing=None,
+                          parallel_pages=None, call=None):
+        pages = PageCounter(self._instrumentation, path)
+        parallel_pages = parallel_pages or self._parallel_pages
+        if not parallel_pages or parallel_pages < 2:
+            return pages.records(iter_results(resp, pages.wrap(profiled(call, self._get_next_page))))
+
+        def fetch_page(offset, limit):
+            page_params = dict(params or {}, offset=offset, limit=limit)
+            return self._get_first_page(path, data=data, flags=flags, params=page_params, headers=headers,
+                                        trailing=trailing)
+
+        return pages.records(iter_results_parallel(resp, pages.wrap(profiled(call, fetch_page)), parallel_pages))
+
+    def profile(self, profiler=None):
+        """
+        Context manager profiling the paginated calls started in the current thread or task within it, see
+        ``profiling``:
+
+            with tempo.profile() as profiler:
+                tempo.get_worklogs(dateFrom="2019-01-01", dateTo="2019-12-31")
+            profiler.write_chrome_trace("worklogs.json")
+        """
+        return profiling(profiler)
+
+    def _profiled_call(self, path):
+        profiler = current_profiler() or self._profiler
+        return None if profiler is None else profiler.call(path)
+
+    def _page_limit(self, path):
+        return self._limit if self._adaptive_limit is None else self._adaptive_limit.limit(path)
+
+    def _response_handler(self, response):
+        payload = super()._response_handler(response)
+        if self._adaptive_limit is not None and isinstance(payload, dict) and 'metadata' in payload:
+            self._adaptive_limit.observe(str(response.url), payload, len(response.content),
+                                         response.elapsed.total_seconds())
+        return payload
+
+    def _page_failed(self, method, url, status_code=None):
+        # pages are fetched with GET, or with POST for searches: failed writes say nothing about the page size
+        if method != 'GET' and not urlsplit(url).path.endswith('/search'):
+            return
+        if self._adaptive_limit is not None and (status_code is None or status_code in (408, 502, 503, 504)):
+            self._adaptive_limit.failed(url)
+
+    def _request(self, method='GET', path='/', data=None, json=None, flags=None, params=None, headers=None,
+                 files=None, trailing=None):
+        url = self._build_url(path, flags=flags, params=params, trailing=trailing)
+        try:
+            response = super()._request(method=method, path=path, data=data, json=json, flags=flags,
+                                        params=params, headers=headers, files=files, trailing=trailing)
+        except TIMEOUT_ERRORS:
+            self._page_failed(method, url)
+            raise
+        self._page_failed(method, url, response.status_code)
+        return response
+
+    def _cache_lookup(self, path, params):
+        hit, value = self._cache.get(path, params)
+        # lookups of paths which are not cached at all are not counted as misses
+        if self._instrumentation is not None and (hit or self._cache.ttl(path) is not None):
+            self._instrumentation.cache_lookup(path, hit)
+        return hit, value
+
+    def get(self, path, data=None, flags=None, params=None, headers=None, not_json_response=None, trailing=None,
+            parallel_pages=None, model=None):
+        """
+        :param parallel_pages: OPTIONAL: number of pages fetched at the same time, defaults to the client setting
+        :param model: OPTIONAL: record type (see ``models``) the results are converted to with its ``from_dict``
+        """
+        # records and dicts of the same request are cached separately
+        cache_params = params if model is None else dict(params or {}, model=model.__name__)
+        if self._cache is not None:
+            hit, value = self._cache_lookup(path, cache_params)
+            if hit:
+                return value
+            generation = self._cache.generation(path)
+
+        call = self._profiled_call(path)
+        resp = profiled(call, self._get_first_page)(path, data=data, flags=flags, params=params, headers=headers,
+                                                    not_json_response=not_json_response, trailing=trailing)
+
         # single item returned
         if 'results' not in resp:
-            return resp
+            result = resp if model is None else model.from_dict(resp)
+        else:
+            # multiple items, handle all results paginated
+            records = self._iter_all_results(resp, path, data=data, flags=flags, params=params, headers=headers,
+                                             trailing=trailing, parallel_pages=parallel_pages, call=call)
+            # converted as the pages arrive, so the dicts of only a few pages are alive at a time
+            result = list(records if model is None else map(model.from_dict, records))
+
+        if self._cache is not None:
+            self._cache.set(path, cache_params, result, generation=generation)
+        return result
+
+    def iter_get(self, path, data=None, flags=None, params=None, headers=None, not_json_response=None,
+                 trailing=None, parallel_pages=None, model=None):
+        """
+        Same as ``get``, but yields the results page by page instead of collecting them into one list.
+        The next page is requested only after the current one was consumed, so memory stays bounded by one page
+        (or by ``parallel_pages`` pages when pages are fetched in parallel).
+        A single item response is yielded as the only element.
+        """
+        call = self._profiled_call(path)
+        resp = profiled(call, self._get_first_page)(path, data=data, flags=flags, params=params, headers=headers,
+                                                    not_json_response=not_json_response, trailing=trailing)
+
+        if 'results' not in resp:
+            yield resp if model is None else model.from_dict(resp)
+            return
+
+        records = self._iter_all_results(resp, path, data=data, flags=flags, params=params, headers=headers,
+                                         trailing=trailing, parallel_pages=parallel_pages, call=call)
+        yield from records if model is None else map(model.from_dict, records)
+
+    def _search_pages(self, path, data=None, params=None):
+        """
+        Returns a callable fetching one page of a POST search, and the offset and limit of its first page.
+        The body is serialized only once: paging goes to the query string, or is appended to the serialized
+        body if the caller put ``offset``/``limit`` there.
+        """
+        params = dict(params or {})
+        body = dict(data or {})
+
+        if 'offset' in body or 'limit' in body:
+            offset, limit = body.pop('offset', 0), body.pop('limit', self._page_limit(path))
+            serialized = self._codec.dumps(body)
 
-        # multiple items
-        results = resp['results']
+            def fetch_page(offset, limit):
+                return self.post(path, data=with_paging(serialized, offset, limit), params=params)
+        else:
+            offset, limit = params.pop('offset', 0), params.pop('limit', self._page_limit(path))
+            serialized = self._codec.dumps(body)
 
-        # handle all results paginated
-        while 'next' in resp.get('metadata'):
-            resp = super().get(resp.get('metadata').get('next'))
-            results.extend(resp['results'])
+            def fetch_page(offset, limit):
+                return self.post(path, data=serialized, params=dict(params, offset=offset, limit=limit))
 
-        return results
+        return fetch_page, offset, limit
+
+    def _iter_search_results(self, resp, fetch_page, parallel_pages=None, path=None):
+        pages = PageCounter(self._instrumentation, path)
+        fetch_page = pages.wrap(fetch_page)
+        parallel_pages = parallel_pages or self._parallel_pages
+        if not parallel_pages or parallel_pages < 2:
+            return pages.records(iter_results(resp, lambda page: fetch_page(*next_window(page))))
+        return pages.records(iter_results_parallel(resp, fetch_page, parallel_pages))
+
+    def search(self, path, data=None, params=None, parallel_pages=None, model=None):
+        """
+        POSTs a search request and collects all pages of its results, like ``get`` does for GET endpoints.
+        :param path:
+        :param data: search body, may contain ``offset`` and ``limit`` if the endpoint pages through the body
+        :param params: query parameters, ``offset`` and ``limit`` are taken from here otherwise
+        :param parallel_pages: OPTIONAL: number of pages fetched at the same time, defaults to the client setting
+        :param model: OPTIONAL: record type (see ``models``) the results are converted to with its ``from_dict``
+        """
+        fetch_page, offset, limit = self._search_pages(path, data=data, params=params)
+        fetch_page = profiled(self._profiled_call(path), fetch_page)
+        resp = fetch_page(offset, limit)
+
+        # single item returned
+        if 'results' not in resp:
+            return resp if model is None else model.from_dict(resp)
+
+        records = self._iter_search_results(resp, fetch_page, parallel_pages=parallel_pages, path=path)
+        return list(records if model is None else map(model.from_dict, records))
+
+    def iter_search(self, path, data=None, params=None, parallel_pages=None, model=None):
+        """
+        Same as ``search``, but yields the results page by page instead of collecting them into one list.
+        """
+        fetch_page, offset, limit = self._search_pages(path, data=data, params=params)
+        fetch_page = profiled(self._profiled_call(path), fetch_page)
+        resp = fetch_page(offset, limit)
+
+        if 'results' not in resp:
+            yield resp if model is None else model.from_dict(resp)
+            return
+
+        records = self._iter_search_results(resp, fetch_page, parallel_pages=parallel_pages, path=path)
+        yield from records if model is None else map(model.from_dict, records)
+
+    def invalidate_cache(self, path=None):
+        """
+        Drops cached responses of the resource ``path`` belongs to, or all cached responses.
+        """
+        if self._cache is not None:
+            self._cache.invalidate(path)
+
+    def _invalidate_after_write(self, path):
+        # searches are reads sent as POST
+        if not path.rstrip('/').endswith('/search'):
+            self.invalidate_cache(path)
+
+    # the cache is invalidated once the write is done (or failed), so responses of reads running at the same
+    # time, which may predate the write, are dropped as well
 
     def post(self, path, data=None, params=None, headers=None, not_json_response=None, trailing=None):
         path_absolute = super().url_joiner(self._base_url, path)
-        return super().post(path_absolute, data=data, params=params, headers=headers, trailing=trailing)
+        try:
+            return super().post(path_absolute, data=data, params=params, headers=headers, trailing=trailing)
+        finally:
+            self._invalidate_after_write(path)
 
     def put(self, path, data=None, params=None, headers=None, not_json_response=None, trailing=None):
         path_absolute = super().url_joiner(self._base_url, path)
-        return super().put(path_absolute, data=data, params=params, headers=headers, trailing=trailing)
+        try:
+            return super().put(path_absolute, data=data, params=params, headers=headers, trailing=trailing)
+        finally:
+            self.invalidate_cache(path)
 
     def delete(self, path, data=None, params=None, headers=None, not_json_response=None, trailing=None):
         path_absolute = super().url_joiner(self._base_url, path)
-        return super().delete(path_absolute, headers=headers, trailing=trailing)
+        try:
+            return super().delete(path_absolute, headers=headers, trailing=trailing)
+        finally:
+            self.invalidate_cache(path)
+
+    def _fan_out(self, func, ids, max_workers=8):
+        return fan_out(func, ids, max_workers=max_workers)
 
 # Accounts
 
-    def get_accounts(self):
+    def get_accounts(self, as_records=False):
         """
         Retrieves existing accounts.
+        :param as_records: return ``models.Account`` records instead of dicts
         """
-        return self.get("/accounts")
+        return self.get("/accounts", model=Account if as_records else None)
 
     # Account - Categories
     def get_account_categories(self):
@@ -139,7 +359,7 @@ class Tempo(RestAPIClient):
         return self.get(url)
 
     # Plans
-    def get_plans(self, dateFrom=None, dateTo=None, id=None, accountId=None, accountIds=None, assigneeTypes=None, genericResourceId=None, genericResourceIds=None, planIds=None, planItemIds=None, planItemTypes=None, plannedTimeBreakdown=None, updatedFrom=None):
+    def get_plans(self, dateFrom=None, dateTo=None, id=None, accountId=None, accountIds=None, assigneeTypes=None, genericResourceId=None, genericResourceIds=None, planIds=None, planItemIds=None, planItemTypes=None, plannedTimeBreakdown=None, updatedFrom=None, parallel_pages=None, as_records=False):
         """
         Retrieves a list of existing Plans that matches the given search parameters.
         :param dateFrom:
@@ -155,16 +375,19 @@ class Tempo(RestAPIClient):
         :param planItemTypes:           ~~~ search plans ~~~
         :param plannedTimeBreakdown:    ~~~ search plans ~~~
         :param updatedFrom:             ~~~ retrieve plans for user / retrieve plans for generic resource / search plans ~~~
+        :param parallel_pages:          number of pages fetched at the same time
+        :param as_records:              return ``models.Plan`` records instead of dicts
         """
 
+        model = Plan if as_records else None
         if id:
             url = f"plans/{id}"
-            return self.get(url)
+            return self.get(url, model=model)
         elif accountId:
             url = f"/plans/user/{accountId}"
             params = {
                 "offset": 0,
-                "limit": self._limit
+                "limit": self._page_limit(url)
             }
             if plannedTimeBreakdown:
                 params['plannedTimeBreakdown'] = plannedTimeBreakdown
@@ -175,12 +398,12 @@ class Tempo(RestAPIClient):
             if updatedFrom:
                 params['updatedFrom'] = self._resolve_date(updatedFrom).isoformat()
 
-            return self.get(url, params=params)
+            return self.get(url, params=params, parallel_pages=parallel_pages, model=model)
         elif genericResourceId:
             url = f"/plans/generic-resource/{genericResourceId}"
             params = {
                 "offset": 0,
-                "limit": self._limit
+                "limit": self._page_limit(url)
             }
             if plannedTimeBreakdown:
                 params['plannedTimeBreakdown'] = plannedTimeBreakdown
@@ -191,13 +414,13 @@ class Tempo(RestAPIClient):
             if updatedFrom:
                 params['updatedFrom'] = self._resolve_date(updatedFrom).isoformat()
 
-            return self.get(url, params=params)
+            return self.get(url, params=params, parallel_pages=parallel_pages, model=model)
         elif dateFrom and dateTo:
             data = {
                 "from": self._resolve_date(dateFrom).isoformat(),
                 "to": self._resolve_date(dateTo).isoformat(),
                 "offset": 0,
-                "limit": self._limit
+                "limit": self._page_limit("/plans/search")
             }
             if accountIds:
                 data['accountIds'] = accountIds
@@ -216,20 +439,33 @@ class Tempo(RestAPIClient):
             if updatedFrom:
                 data['updatedFrom'] = self._resolve_date(updatedFrom).isoformat()
             url = "/plans/search"
-            return self.post(url, data=data)
+            return self.search(url, data=data, parallel_pages=parallel_pages, model=model)
         return
 
-    def get_plan(self, id):
-        return self.get_plans(id=id)
+    def get_plan(self, id, as_records=False):
+        return self.get_plans(id=id, as_records=as_records)
 
-    def get_plan_for_user(self, accountId, plannedTimeBreakdown=None, dateFrom=None, dateTo=None, updatedFrom=None):
-        return self.get_plans(accountId=accountId, plannedTimeBreakdown=plannedTimeBreakdown, dateFrom=dateFrom, dateTo=dateTo, updatedFrom=updatedFrom)
+    def get_plan_for_user(self, accountId, plannedTimeBreakdown=None, dateFrom=None, dateTo=None, updatedFrom=None, parallel_pages=None, as_records=False):
+        return self.get_plans(accountId=accountId, plannedTimeBreakdown=plannedTimeBreakdown, dateFrom=dateFrom, dateTo=dateTo, updatedFrom=updatedFrom, parallel_pages=parallel_pages, as_records=as_records)
 
-    def get_plan_for_resource(self, genericResourceId, plannedTimeBreakdown=None, dateFrom=None, dateTo=None, updatedFrom=None):
-        return self.get_plans(genericResourceId=genericResourceId, plannedTimeBreakdown=plannedTimeBreakdown, dateFrom=dateFrom, dateTo=dateTo, updatedFrom=updatedFrom)
+    def get_plan_for_resource(self, genericResourceId, plannedTimeBreakdown=None, dateFrom=None, dateTo=None, updatedFrom=None, parallel_pages=None, as_records=False):
+        return self.get_plans(genericResourceId=genericResourceId, plannedTimeBreakdown=plannedTimeBreakdown, dateFrom=dateFrom, dateTo=dateTo, updatedFrom=updatedFrom, parallel_pages=parallel_pages, as_records=as_records)
 
-    def search_plans(self, dateFrom, dateTo, accountIds=None, assigneeTypes=None, genericResourceIds=None, planIds=None, planItemIds=None, planItemTypes=None, plannedTimeBreakdown=None, updatedFrom=None):
-        return self.get_plans(dateFrom=dateFrom, dateTo=dateTo, accountIds=accountIds, assigneeTypes=assigneeTypes, genericResourceIds=genericResourceIds, planIds=planIds, planItemIds=planItemIds, planItemTypes=planItemTypes, plannedTimeBreakdown=plannedTimeBreakdown, updatedFrom=updatedFrom)
+    def get_plans_for_users(self, accountIds, plannedTimeBreakdown=None, dateFrom=None, dateTo=None, updatedFrom=None,
+                            parallel_pages=None, as_records=False, max_workers=8):
+        """
+        Retrieves the plans of many users concurrently.
+        :param accountIds: IDs of the users
+        :param max_workers: number of users fetched at the same time
+        :return: ``batch.BatchResults`` mapping the account IDs to their plans and errors
+        """
+        return self._fan_out(lambda accountId: self.get_plan_for_user(
+            accountId, plannedTimeBreakdown=plannedTimeBreakdown, dateFrom=dateFrom, dateTo=dateTo,
+            updatedFrom=updatedFrom, parallel_pages=parallel_pages, as_records=as_records), accountIds,
+            max_workers=max_workers)
+
+    def search_plans(self, dateFrom, dateTo, accountIds=None, assigneeTypes=None, genericResourceIds=None, planIds=None, planItemIds=None, planItemTypes=None, plannedTimeBreakdown=None, updatedFrom=None, parallel_pages=None, as_records=False):
+        return self.get_plans(dateFrom=dateFrom, dateTo=dateTo, accountIds=accountIds, assigneeTypes=assigneeTypes, genericResourceIds=genericResourceIds, planIds=planIds, planItemIds=planItemIds, planItemTypes=planItemTypes, plannedTimeBreakdown=plannedTimeBreakdown, updatedFrom=updatedFrom, parallel_pages=parallel_pages, as_records=as_records)
 
     def create_plan(self, assigneeId, assigneeType, startDate, endDate, planItemId, planItemType, plannedSecondsPerDay, description=None, includeNonWorkingDays=None, planApprovalReviewerId=None, planApprovalStatus=None, recurrenceEndDate=None, rule=None):
         """
@@ -339,17 +575,18 @@ class Tempo(RestAPIClient):
     ## TBD
 
     # Teams
-    def get_teams(self, teamId=None):
+    def get_teams(self, teamId=None, as_records=False):
         """
         Returns teams information.
         :param teamId: Returns details for team ```teamId```.
+        :param as_records: return ``models.Team`` records instead of dicts
         """
 
         url = f"/teams"
         if (teamId):
             url += f"/{teamId}"
 
-        return self.get(url)
+        return self.get(url, model=Team if as_records else None)
 
     def get_team_members(self, teamId):
         """
@@ -360,6 +597,15 @@ class Tempo(RestAPIClient):
         url = f"/teams/{teamId}/members"
         return self.get(url)
 
+    def get_team_members_many(self, teamIds, max_workers=8):
+        """
+        Returns members of many teams concurrently.
+        :param teamIds: IDs of the teams
+        :param max_workers: number of teams fetched at the same time
+        :return: ``batch.BatchResults`` mapping the team IDs to their members and errors
+        """
+        return self._fan_out(self.get_team_members, teamIds, max_workers=max_workers)
+
     # Team - Links
     ## TBD
 
@@ -382,6 +628,17 @@ class Tempo(RestAPIClient):
 
         return self.get(f"/teams/{teamId}/members/{accountId}")
 
+    def get_account_team_membership_many(self, teamId, accountIds, max_workers=8):
+        """
+        Returns the active team memberships of many accounts concurrently.
+        :param teamId:
+        :param accountIds:
+        :param max_workers: number of accounts fetched at the same time
+        :return: ``batch.BatchResults`` mapping the account IDs to their memberships and errors
+        """
+        return self._fan_out(lambda accountId: self.get_account_team_membership(teamId, accountId), accountIds,
+                             max_workers=max_workers)
+
     def get_account_team_memberships(self, teamId, accountId):
         """
         Returns all team memberships.
@@ -437,6 +694,19 @@ class Tempo(RestAPIClient):
             url += f"/team/{teamId}"
         return self.get(url, params=params)
 
+    def get_timesheet_approvals_many(self, userIds, dateFrom=None, dateTo=None, max_workers=8):
+        """
+        Retrieves timesheet approvals of many users concurrently.
+        :param userIds:
+        :param dateFrom:
+        :param dateTo:
+        :param max_workers: number of users fetched at the same time
+        :return: ``batch.BatchResults`` mapping the user IDs to their approvals and errors
+        """
+        return self._fan_out(lambda userId: self.get_timesheet_approvals(dateFrom=dateFrom, dateTo=dateTo,
+                                                                         userId=userId), userIds,
+                             max_workers=max_workers)
+
     # User Schedule
     def get_user_schedule(self, dateFrom, dateTo, userId=None):
         """
@@ -455,6 +725,18 @@ class Tempo(RestAPIClient):
             url += f"/{userId}"
         return self.get(url, params=params)
 
+    def get_user_schedules(self, userIds, dateFrom, dateTo, max_workers=8):
+        """
+        Returns schedules of many users concurrently.
+        :param userIds:
+        :param dateFrom:
+        :param dateTo:
+        :param max_workers: number of users fetched at the same time
+        :return: ``batch.BatchResults`` mapping the user IDs to their schedules and errors
+        """
+        return self._fan_out(lambda userId: self.get_user_schedule(dateFrom, dateTo, userId=userId), userIds,
+                             max_workers=max_workers)
+
     # Work Attributes
     def get_work_attributes(self):
         """
@@ -536,8 +818,41 @@ class Tempo(RestAPIClient):
 
 # Worklogs
 
+    def _worklogs_query(self, dateFrom, dateTo, updatedFrom=None, worklogId=None, jiraWorklogId=None, jiraFilterId=None,
+                         accountKey=None, projectId=None, teamId=None, accountId=None, issueId=None):
+        url = f"/worklogs"
+        if worklogId:
+            url += f"/{worklogId}"
+        elif jiraWorklogId:
+            url += f"/jira/{jiraWorklogId}"
+        elif jiraFilterId:
+            url += f"/jira/filter/{jiraFilterId}"
+        elif accountKey:
+            url += f"/account/{accountKey}"
+        elif teamId:
+            url += f"/team/{teamId}"
+        elif accountId:
+            url += f"/user/{accountId}"
+        elif issueId:
+            url += f"/issue/{issueId}"
+        elif projectId:
+            url += f"/project/{projectId}"
+
+        params = {
+            "from": self._resolve_date(dateFrom).isoformat(),
+            "to": self._resolve_date(dateTo).isoformat(),
+            "offset": 0,
+            "limit": self._page_limit(url)
+            }
+
+        if updatedFrom:
+            params["updatedFrom"] = self._resolve_date(updatedFrom).isoformat()
+
+        return url, params
+
     def get_worklogs(self, dateFrom, dateTo, updatedFrom=None, worklogId=None, jiraWorklogId=None, jiraFilterId=None,
-                     accountKey=None, projectId=None, teamId=None, accountId=None, issueId=None):
+                     accountKey=None, projectId=None, teamId=None, accountId=None, issueId=None,
+                     parallel_pages=None, as_records=False):
         """
         Returns worklogs for particular parameters.
         :param dateFrom:
@@ -551,49 +866,94 @@ class Tempo(RestAPIClient):
         :param teamId:
         :param accountId:
         :param issue:
+        :param parallel_pages: number of pages fetched at the same time
+        :param as_records: return ``models.Worklog`` records instead of dicts, which take a fraction of the memory
         """
 
-        params = {
-            "from": self._resolve_date(dateFrom).isoformat(),
-            "to": self._resolve_date(dateTo).isoformat(),
-            "offset": 0,
-            "limit": self._limit
-            }
+        url, params = self._worklogs_query(dateFrom, dateTo, updatedFrom=updatedFrom, worklogId=worklogId,
+                                           jiraWorklogId=jiraWorklogId, jiraFilterId=jiraFilterId,
+                                           accountKey=accountKey, projectId=projectId, teamId=teamId,
+                                           accountId=accountId, issueId=issueId)
+        return self.get(url, params=params, parallel_pages=parallel_pages, model=Worklog if as_records else None)
 
-        if updatedFrom:
-            params["updatedFrom"] = self._resolve_date(updatedFrom).isoformat()
+    def iter_worklogs(self, dateFrom, dateTo, updatedFrom=None, worklogId=None, jiraWorklogId=None, jiraFilterId=None,
+                      accountKey=None, projectId=None, teamId=None, accountId=None, issueId=None,
+                      parallel_pages=None, as_records=False):
+        """
+        Same as ``get_worklogs``, but yields the worklogs page by page as they arrive.
+        """
 
-        url = f"/worklogs"
-        if worklogId:
-            url += f"/{worklogId}"
-        elif jiraWorklogId:
-            url += f"/jira/{jiraWorklogId}"
-        elif jiraFilterId:
-            url += f"/jira/filter/{jiraFilterId}"
-        elif accountKey:
-            url += f"/account/{accountKey}"
-        elif teamId:
-            url += f"/team/{teamId}"
-        elif accountId:
-            url += f"/user/{accountId}"
-        elif issueId:
-            url += f"/issue/{issueId}"
-        elif projectId:
-            url += f"/project/{projectId}"
-        
-        return self.get(url, params=params)
+        url, params = self._worklogs_query(dateFrom, dateTo, updatedFrom=updatedFrom, worklogId=worklogId,
+                                           jiraWorklogId=jiraWorklogId, jiraFilterId=jiraFilterId,
+                                           accountKey=accountKey, projectId=projectId, teamId=teamId,
+                                           accountId=accountId, issueId=issueId)
+        return self.iter_get(url, params=params, parallel_pages=parallel_pages,
+                             model=Worklog if as_records else None)
 
-    def search_worklogs(self, dateFrom, dateTo, updatedFrom=None, authorIds=None, issueIds=None, projectIds=None,
-                     	offset=None, limit=None):
+    @staticmethod
+    def _probe_params(params):
         """
-        Retrieves a list of existing Worklogs that matches the given search parameter.
-        :param offset:
-        :param limit:
+        Returns the query of the first record after the first page, to tell whether a query needs more than one
+        page without downloading a full page.
         """
+        return dict(params, offset=params["offset"] + params["limit"], limit=1)
+
+    def _worklogs_shard_fetcher(self, updatedFrom=None, jiraFilterId=None, accountKey=None, projectId=None,
+                                teamId=None, accountId=None, issueId=None, parallel_pages=None, model=None):
+        def fetch_shard(dateFrom, dateTo, splittable):
+            url, params = self._worklogs_query(dateFrom, dateTo, updatedFrom=updatedFrom, jiraFilterId=jiraFilterId,
+                                               accountKey=accountKey, projectId=projectId, teamId=teamId,
+                                               accountId=accountId, issueId=issueId)
+            # more than one page in the shard, ask for it to be split instead of paginating deep offsets
+            if splittable and self._get_first_page(url, params=self._probe_params(params)).get('results'):
+                return None
+            resp = self._get_first_page(url, params=params)
+            records = self._iter_all_results(resp, url, params=params, parallel_pages=parallel_pages)
+            return list(records if model is None else map(model.from_dict, records))
+
+        return fetch_shard
+
+    def get_worklogs_sharded(self, dateFrom, dateTo, shard="month", max_workers=4, retries=2, updatedFrom=None,
+                             jiraFilterId=None, accountKey=None, projectId=None, teamId=None, accountId=None,
+                             issueId=None, parallel_pages=None, as_records=False):
+        """
+        Returns worklogs like ``get_worklogs``, but splits the date range into sub-ranges which are fetched
+        concurrently and merged in date order. A sub-range which does not fit into one page is split into
+        halves again (down to a single day), so deep offset pagination is avoided.
+        :param dateFrom:
+        :param dateTo:
+        :param shard: initial sub-range size: "day", "week", "month" or "year"
+        :param max_workers: number of sub-ranges fetched at the same time
+        :param retries: number of times a failed sub-range is retried on its own
+        :param parallel_pages: number of pages fetched at the same time for single days with more than one page
+        :param as_records: return ``models.Worklog`` records instead of dicts
+        """
+
+        fetch_shard = self._worklogs_shard_fetcher(updatedFrom=updatedFrom, jiraFilterId=jiraFilterId,
+                                                   accountKey=accountKey, projectId=projectId, teamId=teamId,
+                                                   accountId=accountId, issueId=issueId,
+                                                   parallel_pages=parallel_pages,
+                                                   model=Worklog if as_records else None)
+        return fetch_sharded(fetch_shard, self._resolve_date(dateFrom), self._resolve_date(dateTo), period=shard,
+                             max_workers=max_workers, retries=retries)
 
+    def get_worklogs_many(self, accountIds, dateFrom, dateTo, updatedFrom=None, parallel_pages=None,
+                          as_records=False, max_workers=8):
+        """
+        Returns worklogs of many users concurrently.
+        :param accountIds: IDs of the authors
+        :param max_workers: number of users fetched at the same time
+        :return: ``batch.BatchResults`` mapping the account IDs to their worklogs and errors
+        """
+        return self._fan_out(lambda accountId: self.get_worklogs(
+            dateFrom, dateTo, updatedFrom=updatedFrom, accountId=accountId, parallel_pages=parallel_pages,
+            as_records=as_records), accountIds, max_workers=max_workers)
+
+    def _search_worklogs_query(self, dateFrom, dateTo, updatedFrom=None, authorIds=None, issueIds=None,
+                               projectIds=None, offset=None, limit=None):
         params = {
             "offset": 0 if offset is None else offset,
-            "limit": self._limit if limit is None else limit
+            "limit": self._page_limit("/worklogs/search") if limit is None else limit
         }
 
         data = {
@@ -612,25 +972,39 @@ class Tempo(RestAPIClient):
 
         url = f"/worklogs/search"
 
-        return self.post(url, params=params, data=data)
+        return url, params, data
 
-    def create_worklog(self, accountId, issueId, dateFrom, timeSpentSeconds, billableSeconds=None, description=None,
-                       remainingEstimateSeconds=None, startTime=None, attributes=None):
+    def search_worklogs(self, dateFrom, dateTo, updatedFrom=None, authorIds=None, issueIds=None, projectIds=None,
+                        offset=None, limit=None, parallel_pages=None, as_records=False):
         """
-        Creates a new Worklog using the provided input and returns the newly created Worklog.
-        :param accountId:
-        :param issueId:
-        :param dateFrom:
-        :param timeSpentSeconds:
-        :param billableSeconds:
-        :param description:
-        :param remainingEstimateSeconds:
-        :param startTime:
-        :param attributes:
+        Retrieves a list of existing Worklogs that matches the given search parameter.
+        All pages are retrieved, starting at ``offset``.
+        :param offset: offset of the first page
+        :param limit: page size
+        :param parallel_pages: number of pages fetched at the same time
+        :param as_records: return ``models.Worklog`` records instead of dicts
         """
 
-        url = f"/worklogs"
-        
+        url, params, data = self._search_worklogs_query(dateFrom, dateTo, updatedFrom=updatedFrom,
+                                                        authorIds=authorIds, issueIds=issueIds,
+                                                        projectIds=projectIds, offset=offset, limit=limit)
+        return self.search(url, params=params, data=data, parallel_pages=parallel_pages,
+                           model=Worklog if as_records else None)
+
+    def iter_search_worklogs(self, dateFrom, dateTo, updatedFrom=None, authorIds=None, issueIds=None,
+                             projectIds=None, offset=None, limit=None, parallel_pages=None, as_records=False):
+        """
+        Same as ``search_worklogs``, but yields the worklogs page by page as they arrive.
+        """
+
+        url, params, data = self._search_worklogs_query(dateFrom, dateTo, updatedFrom=updatedFrom,
+                                                        authorIds=authorIds, issueIds=issueIds,
+                                                        projectIds=projectIds, offset=offset, limit=limit)
+        return self.iter_search(url, params=params, data=data, parallel_pages=parallel_pages,
+                                model=Worklog if as_records else None)
+
+    def _worklog_data(self, accountId, issueId, dateFrom, timeSpentSeconds, billableSeconds=None, description=None,
+                      remainingEstimateSeconds=None, startTime=None, attributes=None):
         data = {
             "authorAccountId": str(accountId),
             "issueId": int(issueId),
@@ -647,9 +1021,98 @@ class Tempo(RestAPIClient):
             data["remainingEstimateSeconds"] = int(remainingEstimateSeconds)
         if startTime:
             data["startTime"] = self._resolve_time(startTime).isoformat()
-        
+
+        return data
+
+    def create_worklog(self, accountId, issueId, dateFrom, timeSpentSeconds, billableSeconds=None, description=None,
+                       remainingEstimateSeconds=None, startTime=None, attributes=None):
+        """
+        Creates a new Worklog using the provided input and returns the newly created Worklog.
+        :param accountId:
+        :param issueId:
+        :param dateFrom:
+        :param timeSpentSeconds:
+        :param billableSeconds:
+        :param description:
+        :param remainingEstimateSeconds:
+        :param startTime:
+        :param attributes:
+        """
+
+        url = f"/worklogs"
+
+        data = self._worklog_data(accountId, issueId, dateFrom, timeSpentSeconds, billableSeconds=billableSeconds,
+                                  description=description, remainingEstimateSeconds=remainingEstimateSeconds,
+                                  startTime=startTime, attributes=attributes)
+
         return self.post(url, data=data)
 
+    def create_worklogs(self, worklogs, max_workers=8, use_bulk_endpoint=False, bulk_size=100):
+        """
+        Creates many Worklogs. A failing Worklog does not abort the others.
+        :param worklogs: iterable of dicts with the parameters of ``create_worklog``
+        :param max_workers: number of requests running at the same time
+        :param use_bulk_endpoint: post the Worklogs of each issue in chunks of ``bulk_size`` to
+            ``/worklogs/issue/{issueId}/bulk`` instead of one request per Worklog
+        :param bulk_size: maximum number of Worklogs per bulk request
+        :return: list of ``batch.ItemResult`` (``item``, created ``value`` or ``error``) in input order
+        """
+
+        worklogs = list(worklogs)
+        if not use_bulk_endpoint:
+            return run_batch(lambda worklog: self.create_worklog(**worklog), worklogs, max_workers=max_workers)
+
+        results, payloads = self._validate_worklogs(worklogs)
+        chunk_results = run_batch(self._create_worklog_chunk, self._worklog_chunks(payloads, bulk_size),
+                                  max_workers=max_workers)
+        return self._split_chunk_results(worklogs, chunk_results, results)
+
+    def _validate_worklogs(self, worklogs):
+        """
+        Builds the request bodies of the Worklogs. Returns the ``ItemResult`` of every Worklog in input order,
+        an error for the invalid ones and None for the others, and the bodies of the others by input position.
+        """
+        results, payloads = [None] * len(worklogs), {}
+        for index, worklog in enumerate(worklogs):
+            try:
+                payloads[index] = self._worklog_data(**worklog)
+            except (TypeError, ValueError, KeyError) as error:
+                results[index] = ItemResult(worklog, None, error)
+        return results, payloads
+
+    @staticmethod
+    def _worklog_chunks(payloads, bulk_size):
+        """
+        Groups Worklog bodies by issue into chunks of at most ``bulk_size``, as ``(issueId, [(input position,
+        body)])``.
+        """
+        chunks = {}
+        for index, payload in payloads.items():
+            issue_chunks = chunks.setdefault(payload["issueId"], [[]])
+            if len(issue_chunks[-1]) >= bulk_size:
+                issue_chunks.append([])
+            issue_chunks[-1].append((index, payload))
+        return [(issueId, chunk) for issueId, issue_chunks in chunks.items() for chunk in issue_chunks]
+
+    def _create_worklog_chunk(self, chunk):
+        issueId, items = chunk
+        data = [{name: value for name, value in payload.items() if name != "issueId"} for _, payload in items]
+        return self.post(f"/worklogs/issue/{issueId}/bulk", data=data)
+
+    @staticmethod
+    def _split_chunk_results(worklogs, chunk_results, results):
+        """
+        Maps the results of bulk requests back to one ``ItemResult`` per Worklog in ``results``, in input order.
+        """
+        for chunk_result in chunk_results:
+            items = chunk_result.item[1]
+            error = chunk_result.error
+            if error is None and (not isinstance(chunk_result.value, list) or len(chunk_result.value) != len(items)):
+                error = ValueError(f"Unexpected bulk response for issue {chunk_result.item[0]}: {chunk_result.value}")
+            for position, (index, _) in enumerate(items):
+                results[index] = ItemResult(worklogs[index], None if error else chunk_result.value[position], error)
+        return results
+
     def update_worklog(self, id, accountId, dateFrom, timeSpentSeconds, billableSeconds=None, description=None,
                        remainingEstimateSeconds=None, startTime=None):
         """
@@ -0,0 +1,359 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#   http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from __future__ import unicode_literals
+
+import asyncio
+import logging
+from urllib.parse import urlencode
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+from .batch import afan_out, arun_batch
+from .client_v4 import Tempo
+from .instrumentation import PageCounter
+from .models import Worklog
+from .pagination import aiter_results, aiter_results_parallel, next_window
+from .profiling import aprofiled, current_page
+from .rest_client import TempoError
+from .sharding import afetch_sharded
+from .transport import TIMEOUT_ERRORS, Transport
+
+log = logging.getLogger(__name__)
+
+
+class _AsyncClientTransport(Transport):
+    """
+    Transport of the ``RestAPIClient`` base of ``AsyncTempo``: shares the headers of its ``httpx.AsyncClient``,
+    the requests themselves are sent by ``AsyncTempo``.
+    """
+
+    def __init__(self, client):
+        self.headers = client.headers
+
+    def request(self, method, url, headers=None, data=None, json=None, files=None, timeout=None, verify=None,
+                proxies=None):
+        raise TypeError("AsyncTempo sends its requests through its httpx.AsyncClient")
+
+
+class AsyncTempo(Tempo):
+    """
+    Asynchronous client for accessing Tempo Rest API as provided by api.tempo.io.
+
+    Mirrors ``client_v4.Tempo``: every API method takes the same parameters but returns an awaitable,
+    and the ``iter_*`` methods return asynchronous iterators to be used with ``async for``.
+    Requests go through one pooled ``httpx.AsyncClient``, so many calls can run concurrently
+    (e.g. with ``asyncio.gather``) from a single event loop. Failed requests raise ``rest_client.TempoError``
+    instead of ``SystemExit``, its ``status_code`` is the HTTP status.
+
+        async with AsyncTempo(auth_token="<your_tempo_api_key>") as tempo:
+            worklogs = await tempo.get_worklogs(dateFrom="2019-11-10", dateTo="2019-11-11")
+    """
+
+    def __init__(self, auth_token, base_url="https://api.tempo.io/4", limit=5000, parallel_pages=None,
+                 cache=None, conditional_requests=None, rate_limiter=None, retry=None, timeout=None, verify_ssl=None,
+                 proxy=None, max_connections=100, max_keepalive_connections=20, transport_config=None,
+                 transport=None, codec=None, coalesce_requests=None, instrumentation=None, profiler=None,
+                 adaptive_limit=None):
+        """
+        Takes the parameters of ``client_v4.Tempo``, except for:
+        :param proxy: OPTIONAL: proxy URL
+        :param max_connections: number of connections open at the same time
+        :param max_keepalive_connections: number of idle connections kept open
+        :param transport: OPTIONAL: ``httpx.AsyncBaseTransport`` sending the requests, e.g. an
+            ``httpx.MockTransport`` in tests
+        """
+        if httpx is None:
+            raise ImportError("AsyncTempo requires httpx, install it with "
+                              "`pip install tempo-api-python-client[async]`")
+        if transport is not None and not isinstance(transport, httpx.AsyncBaseTransport):
+            raise TypeError("AsyncTempo requires an httpx.AsyncBaseTransport as transport, "
+                            f"not {type(transport).__name__}")
+        if transport_config is not None:
+            max_connections = transport_config.pool_maxsize
+            max_keepalive_connections = transport_config.pool_maxsize if transport_config.keep_alive else 0
+            if timeout is None and transport_config.timeout is not None:
+                timeout = httpx.Timeout(None, connect=transport_config.connect_timeout,
+                                        read=transport_config.read_timeout)
+        self._async_session = httpx.AsyncClient(
+            headers=self.default_headers,
+            timeout=timeout,
+            verify=True if verify_ssl is None else verify_ssl,
+            proxy=proxy,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_keepalive_connections),
+            transport=transport,
+        )
+        # no requests.Session is created for the synchronous base, it sets the Authorization header of the client
+        super().__init__(auth_token=auth_token, base_url=base_url, limit=limit, parallel_pages=parallel_pages,
+                         cache=cache, conditional_requests=conditional_requests, rate_limiter=rate_limiter,
+                         retry=retry, transport=_AsyncClientTransport(self._async_session), codec=codec,
+                         coalesce_requests=coalesce_requests, instrumentation=instrumentation, profiler=profiler,
+                         adaptive_limit=adaptive_limit)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+    async def close(self):
+        await self._async_session.aclose()
+        super().close()
+
+    async def _async_request(self, method, url, data=None, params=None, headers=None):
+        send = self._send_request if method != 'GET' or self._validators is None else self._send_conditional
+        if method != 'GET' or self._single_flight is None:
+            return await send(method, url, data=data, params=params, headers=headers)
+
+        key = self._single_flight.key(method, url + ('?' + urlencode(params) if params else ''), data, headers)
+        return await self._single_flight.ado(key, lambda: send(method, url, data=data, params=params,
+                                                               headers=headers))
+
+    async def _send_request(self, method, url, data=None, params=None, headers=None):
+        return self._response_handler(await self._send(method, url, data=data, params=params, headers=headers))
+
+    async def _send_conditional(self, method, url, data=None, params=None, headers=None):
+        full_url = url + ('?' + urlencode(params) if params else '')
+        conditional_headers = self._validators.headers(full_url)
+        response = await self._send(method, url, data=data, params=params,
+                                    headers=dict(headers or {}, **conditional_headers) if conditional_headers
+                                    else headers)
+
+        if response.status_code == 304:
+            stored, payload = self._validators.get(full_url)
+            if stored:
+                if self._instrumentation is not None:
+                    self._instrumentation.cache_lookup(url, True, cache="conditional")
+                return payload
+            # the payload was evicted after the request was sent, the 304 has nothing to be served from
+            response = await self._send(method, url, data=data, params=params, headers=headers)
+
+        if self._instrumentation is not None and conditional_headers:
+            self._instrumentation.cache_lookup(url, False, cache="conditional")
+
+        payload = self._response_handler(response)
+        self._validators.set(full_url, response.headers, payload)
+        return payload
+
+    async def _send(self, method, url, data=None, params=None, headers=None):
+        content = None if not data else data if isinstance(data, (str, bytes)) else self._codec.dumps(data)
+        instrumentation = self._instrumentation
+        event = None if instrumentation is None else instrumentation.request_started(
+            method, url + ('?' + urlencode(params) if params else ''), content)
+        page = current_page()
+        attempt = 0
+        try:
+            while True:
+                if self._rate_limiter is not None:
+                    await asyncio.sleep(self._rate_limiter.reserve())
+                if page is not None:
+                    page.sent(url + ('?' + urlencode(params) if params else ''))
+                try:
+                    response = await self._async_session.request(
+                        method=method,
+                        url=url,
+                        params=params,
+                        content=content,
+                        headers=headers,
+                        # reports the arrival of the response headers
+                        extensions=None if page is None else {"trace": page.trace},
+                    )
+                except TIMEOUT_ERRORS:
+                    self._page_failed(method, url + ('?' + urlencode(params) if params else ''))
+                    raise
+                if page is not None:
+                    page.received(response.content)
+                if self._retry is None or not self._retry.is_retry(method, response.status_code, attempt, url):
+                    break
+                if event is not None:
+                    instrumentation.request_retried(event, response.status_code)
+                await asyncio.sleep(self._retry_delay(method, url, response.status_code, response.headers, attempt))
+                attempt += 1
+        except Exception as e:
+            if event is not None:
+                instrumentation.request_failed(event, e)
+            raise
+        response.encoding = 'utf-8'
+        self._page_failed(method, str(response.url), response.status_code)
+        if event is not None:
+            instrumentation.request_finished(event, response.status_code, response.content)
+
+        log.debug("HTTP: %s %s -> %s %s", method, url, response.status_code, response.reason_phrase)
+        return response
+
+    def _response_handler(self, response):
+        try:
+            return super()._response_handler(response)
+        except SystemExit as e:
+            # a SystemExit escaping a task stops the event loop
+            raise TempoError(*e.args) from e.args[0]
+
+    async def _get_first_page(self, path, data=None, flags=None, params=None, headers=None, not_json_response=None,
+                              trailing=None):
+        if flags:
+            raise ValueError("AsyncTempo does not support flags, pass them as params")
+        return await self._async_request('GET', self.url_joiner(self._base_url, path, trailing), data=data,
+                                         params=params, headers=headers)
+
+    async def _get_next_page(self, resp):
+        return await self._async_request('GET', resp.get('metadata').get('next'))
+
+    def _iter_all_results(self, resp, path, data=None, flags=None, params=None, headers=None, trailing=None,
+                          parallel_pages=None, call=None):
+        pages = PageCounter(self._instrumentation, path)
+        parallel_pages = parallel_pages or self._parallel_pages
+        if not parallel_pages or parallel_pages < 2:
+            return pages.arecords(aiter_results(resp, pages.awrap(aprofiled(call, self._get_next_page))))
+
+        async def fetch_page(offset, limit):
+            page_params = dict(params or {}, offset=offset, limit=limit)
+            return await self._get_first_page(path, data=data, params=page_params, headers=headers,
+                                              trailing=trailing)
+
+        return pages.arecords(aiter_results_parallel(resp, pages.awrap(aprofiled(call, fetch_page)), parallel_pages))
+
+    async def get(self, path, data=None, flags=None, params=None, headers=None, not_json_response=None,
+                  trailing=None, parallel_pages=None, model=None):
+        cache_params = params if model is None else dict(params or {}, model=model.__name__)
+        if self._cache is not None:
+            hit, value = self._cache_lookup(path, cache_params)
+            if hit:
+                return value
+            generation = self._cache.generation(path)
+
+        call = self._profiled_call(path)
+        resp = await aprofiled(call, self._get_first_page)(path, data=data, flags=flags, params=params,
+                                                           headers=headers, trailing=trailing)
+
+        # single item returned
+        if 'results' not in resp:
+            result = resp if model is None else model.from_dict(resp)
+        else:
+            # multiple items, handle all results paginated
+            records = self._iter_all_results(resp, path, data=data, params=params, headers=headers,
+                                             trailing=trailing, parallel_pages=parallel_pages, call=call)
+            result = [record if model is None else model.from_dict(record) async for record in records]
+
+        if self._cache is not None:
+            self._cache.set(path, cache_params, result, generation=generation)
+        return result
+
+    async def iter_get(self, path, data=None, flags=None, params=None, headers=None, not_json_response=None,
+                       trailing=None, parallel_pages=None, model=None):
+        call = self._profiled_call(path)
+        resp = await aprofiled(call, self._get_first_page)(path, data=data, flags=flags, params=params,
+                                                           headers=headers, trailing=trailing)
+
+        if 'results' not in resp:
+            yield resp if model is None else model.from_dict(resp)
+            return
+
+        async for record in self._iter_all_results(resp, path, data=data, params=params, headers=headers,
+                                                   trailing=trailing, parallel_pages=parallel_pages, call=call):
+            yield record if model is None else model.from_dict(record)
+
+    def _iter_search_results(self, resp, fetch_page, parallel_pages=None, path=None):
+        pages = PageCounter(self._instrumentation, path)
+        fetch_page = pages.awrap(fetch_page)
+        parallel_pages = parallel_pages or self._parallel_pages
+        if not parallel_pages or parallel_pages < 2:
+            return pages.arecords(aiter_results(resp, lambda page: fetch_page(*next_window(page))))
+        return pages.arecords(aiter_results_parallel(resp, fetch_page, parallel_pages))
+
+    async def search(self, path, data=None, params=None, parallel_pages=None, model=None):
+        fetch_page, offset, limit = self._search_pages(path, data=data, params=params)
+        fetch_page = aprofiled(self._profiled_call(path), fetch_page)
+        resp = await fetch_page(offset, limit)
+
+        # single item returned
+        if 'results' not in resp:
+            return resp if model is None else model.from_dict(resp)
+
+        records = self._iter_search_results(resp, fetch_page, parallel_pages=parallel_pages, path=path)
+        return [record if model is None else model.from_dict(record) async for record in records]
+
+    async def iter_search(self, path, data=None, params=None, parallel_pages=None, model=None):
+        fetch_page, offset, limit = self._search_pages(path, data=data, params=params)
+        fetch_page = aprofiled(self._profiled_call(path), fetch_page)
+        resp = await fetch_page(offset, limit)
+
+        if 'results' not in resp:
+            yield resp if model is None else model.from_dict(resp)
+            return
+
+        async for record in self._iter_search_results(resp, fetch_page, parallel_pages=parallel_pages,
+                                                      path=path):
+            yield record if model is None else model.from_dict(record)
+
+    async def post(self, path, data=None, params=None, headers=None, not_json_response=None, trailing=None):
+        try:
+            return await self._async_request('POST', self.url_joiner(self._base_url, path, trailing), data=data,
+                                             params=params, headers=headers)
+        finally:
+            self._invalidate_after_write(path)
+
+    async def put(self, path, data=None, params=None, headers=None, not_json_response=None, trailing=None):
+        try:
+            return await self._async_request('PUT', self.url_joiner(self._base_url, path, trailing), data=data,
+                                             params=params, headers=headers)
+        finally:
+            self.invalidate_cache(path)
+
+    async def delete(self, path, data=None, params=None, headers=None, not_json_response=None, trailing=None):
+        try:
+            return await self._async_request('DELETE', self.url_joiner(self._base_url, path, trailing),
+                                             headers=headers)
+        finally:
+            self.invalidate_cache(path)
+
+    async def _fan_out(self, func, ids, max_workers=8):
+        return await afan_out(func, ids, max_workers=max_workers)
+
+    def _worklogs_shard_fetcher(self, updatedFrom=None, jiraFilterId=None, accountKey=None, projectId=None,
+                                teamId=None, accountId=None, issueId=None, parallel_pages=None, model=None):
+        async def fetch_shard(dateFrom, dateTo, splittable):
+            url, params = self._worklogs_query(dateFrom, dateTo, updatedFrom=updatedFrom, jiraFilterId=jiraFilterId,
+                                               accountKey=accountKey, projectId=projectId, teamId=teamId,
+                                               accountId=accountId, issueId=issueId)
+            if splittable and (await self._get_first_page(url, params=self._probe_params(params))).get('results'):
+                return None
+            resp = await self._get_first_page(url, params=params)
+            records = self._iter_all_results(resp, url, params=params, parallel_pages=parallel_pages)
+            return [record if model is None else model.from_dict(record) async for record in records]
+
+        return fetch_shard
+
+    async def get_worklogs_sharded(self, dateFrom, dateTo, shard="month", max_workers=4, retries=2,
+                                   updatedFrom=None, jiraFilterId=None, accountKey=None, projectId=None, teamId=None,
+                                   accountId=None, issueId=None, parallel_pages=None, as_records=False):
+        fetch_shard = self._worklogs_shard_fetcher(updatedFrom=updatedFrom, jiraFilterId=jiraFilterId,
+                                                   accountKey=accountKey, projectId=projectId, teamId=teamId,
+                                                   accountId=accountId, issueId=issueId,
+                                                   parallel_pages=parallel_pages,
+                                                   model=Worklog if as_records else None)
+        return await afetch_sharded(fetch_shard, self._resolve_date(dateFrom), self._resolve_date(dateTo),
+                                    period=shard, max_workers=max_workers, retries=retries)
+
+    async def create_worklogs(self, worklogs, max_workers=8, use_bulk_endpoint=False, bulk_size=100):
+        worklogs = list(worklogs)
+        if not use_bulk_endpoint:
+            return await arun_batch(lambda worklog: self.create_worklog(**worklog), worklogs, max_workers=max_workers)
+
+        results, payloads = self._validate_worklogs(worklogs)
+        chunk_results = await arun_batch(self._create_worklog_chunk, self._worklog_chunks(payloads, bulk_size),
+                                         max_workers=max_workers)
+        return self._split_chunk_results(worklogs, chunk_results, results)
@@ -0,0 +1,113 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#   http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+JSON encoding of request bodies and decoding of responses, using orjson or msgspec when installed.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+
+class JSONCodec(object):
+    """
+    Codec based on the standard library ``json`` module, always available.
+
+    ``dumps`` returns the UTF-8 encoded bytes sent as request body, ``loads`` accepts the raw bytes of a response
+    (or a string).
+    """
+
+    name = "json"
+
+    def dumps(self, obj):
+        return json.dumps(obj).encode("utf-8")
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    Codec based on orjson (``pip install tempo-api-python-client[orjson]``).
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("OrjsonCodec requires orjson, install it with "
+                              "`pip install tempo-api-python-client[orjson]`")
+
+    def dumps(self, obj):
+        # the standard library accepts non-string keys as well
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+class MsgspecCodec(JSONCodec):
+    """
+    Codec based on msgspec (``pip install tempo-api-python-client[msgspec]``).
+    """
+
+    name = "msgspec"
+
+    def __init__(self):
+        if msgspec is None:
+            raise ImportError("MsgspecCodec requires msgspec, install it with "
+                              "`pip install tempo-api-python-client[msgspec]`")
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj):
+        return self._encoder.encode(obj)
+
+    def loads(self, data):
+        return self._decoder.decode(data)
+
+
+CODECS = {codec.name: codec for codec in (OrjsonCodec, MsgspecCodec, JSONCodec)}
+
+
+def default_codec():
+    """
+    Returns the fastest installed codec: orjson, msgspec or the standard library, in that order.
+    """
+    if orjson is not None:
+        return OrjsonCodec()
+    if msgspec is not None:
+        return MsgspecCodec()
+    return JSONCodec()
+
+
+def get_codec(codec=None):
+    """
+    Returns the codec for ``codec``: None for the fastest installed one, a name ("orjson", "msgspec", "json"),
+    or a codec instance which is returned as it is.
+    """
+    if codec is None:
+        return default_codec()
+    if isinstance(codec, str):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec '{codec}', use one of {', '.join(CODECS)}")
+        return CODECS[codec]()
+    return codec
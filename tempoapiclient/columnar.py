@@ -0,0 +1,215 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#   http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Columnar export of worklogs to Arrow record batches, Parquet files and NumPy arrays.
+
+Worklogs are consumed in batches from any iterable of worklog dicts or ``models.Worklog`` records, usually
+``Tempo.iter_worklogs``, so only one batch of rows is kept as Python objects at a time. Columns are named like
+the fields of ``models.Worklog``, and work attributes are available as ``attribute:<key>`` columns (e.g.
+``attribute:_Account_``). Requires ``pip install tempo-api-python-client[arrow]`` (or ``[numpy]`` for
+``to_numpy``).
+
+    table = columnar.to_arrow(tempo.iter_worklogs(dateFrom="2019-11-01", dateTo="2019-11-30"))
+"""
+
+from collections import namedtuple
+from itertools import islice
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+DEFAULT_COLUMNS = ("id", "issueId", "authorAccountId", "startDate", "timeSpentSeconds", "billableSeconds")
+
+INTEGER, DATE, CATEGORY, STRING = "integer", "date", "category", "string"
+
+# column name: (kind, getter of the worklog dict)
+COLUMNS = {
+    "id": (INTEGER, lambda worklog: worklog.get("tempoWorklogId")),
+    "issueId": (INTEGER, lambda worklog: (worklog.get("issue") or {}).get("id")),
+    "authorAccountId": (CATEGORY, lambda worklog: (worklog.get("author") or {}).get("accountId")),
+    "startDate": (DATE, lambda worklog: worklog.get("startDate")),
+    "startTime": (CATEGORY, lambda worklog: worklog.get("startTime")),
+    "timeSpentSeconds": (INTEGER, lambda worklog: worklog.get("timeSpentSeconds")),
+    "billableSeconds": (INTEGER, lambda worklog: worklog.get("billableSeconds")),
+    "description": (STRING, lambda worklog: worklog.get("description")),
+    "createdAt": (STRING, lambda worklog: worklog.get("createdAt")),
+    "updatedAt": (STRING, lambda worklog: worklog.get("updatedAt")),
+}
+
+ATTRIBUTE_PREFIX = "attribute:"
+
+Categorical = namedtuple("Categorical", ["codes", "categories"])
+Categorical.__doc__ = """
+Dictionary-encoded string column of ``to_numpy``: ``categories[codes[i]]`` is the value of row ``i``,
+a code of -1 stands for a missing value.
+"""
+
+
+def _attribute_getter(key):
+    def get(worklog):
+        for attribute in (worklog.get("attributes") or {}).get("values") or ():
+            if attribute.get("key") == key:
+                return attribute.get("value")
+        return None
+
+    return get
+
+
+def _record_attribute_getter(key):
+    return lambda worklog: worklog.attributes.get(key)
+
+
+def _column(name, records):
+    """
+    Returns the kind of the column and the list of its values in the batch ``records``.
+    """
+    if name.startswith(ATTRIBUTE_PREFIX):
+        key = name[len(ATTRIBUTE_PREFIX):]
+        kind, get = CATEGORY, _attribute_getter(key) if isinstance(records[0], dict) else _record_attribute_getter(key)
+    else:
+        kind, get = COLUMNS[name]
+        if not isinstance(records[0], dict):
+            index = records[0]._fields.index(name)
+            return kind, [record[index] for record in records]
+    return kind, [get(record) for record in records]
+
+
+def iter_batches(worklogs, batch_size=5000):
+    """
+    Yields lists of at most ``batch_size`` worklogs.
+    """
+    worklogs = iter(worklogs)
+    while True:
+        batch = list(islice(worklogs, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _require_pyarrow():
+    if pyarrow is None:
+        raise ImportError("Arrow export requires pyarrow, install it with "
+                          "`pip install tempo-api-python-client[arrow]`")
+
+
+def _arrow_type(kind):
+    if kind == INTEGER:
+        return pyarrow.int64()
+    if kind == DATE:
+        return pyarrow.date32()
+    if kind == CATEGORY:
+        return pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+    return pyarrow.string()
+
+
+def _kind(name):
+    return CATEGORY if name.startswith(ATTRIBUTE_PREFIX) else COLUMNS[name][0] if name in COLUMNS else None
+
+
+def _check_columns(columns):
+    for name in columns:
+        if _kind(name) is None:
+            raise ValueError(f"Unknown worklog column '{name}', use one of {', '.join(COLUMNS)} "
+                             f"or '{ATTRIBUTE_PREFIX}<key>'")
+
+
+def arrow_schema(columns=DEFAULT_COLUMNS):
+    """
+    Returns the Arrow schema of the record batches with ``columns``.
+    """
+    _require_pyarrow()
+    _check_columns(columns)
+    return pyarrow.schema([(name, _arrow_type(_kind(name))) for name in columns])
+
+
+def iter_record_batches(worklogs, columns=DEFAULT_COLUMNS, batch_size=5000):
+    """
+    Yields ``pyarrow.RecordBatch`` objects of at most ``batch_size`` worklogs, string columns like
+    ``authorAccountId`` are dictionary-encoded.
+    """
+    schema = arrow_schema(columns)
+    for batch in iter_batches(worklogs, batch_size):
+        arrays = []
+        for field in schema:
+            kind, values = _column(field.name, batch)
+            if kind == DATE:
+                arrays.append(pyarrow.array(values, type=pyarrow.string()).cast(pyarrow.date32()))
+            else:
+                arrays.append(pyarrow.array(values, type=field.type))
+        yield pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def to_arrow(worklogs, columns=DEFAULT_COLUMNS, batch_size=5000):
+    """
+    Returns a ``pyarrow.Table`` of the worklogs.
+    """
+    return pyarrow.Table.from_batches(iter_record_batches(worklogs, columns=columns, batch_size=batch_size),
+                                      schema=arrow_schema(columns))
+
+
+def write_parquet(worklogs, path, columns=DEFAULT_COLUMNS, batch_size=5000, compression="zstd"):
+    """
+    Writes the worklogs to a Parquet file batch by batch, so exports of any size run in bounded memory.
+    :return: number of written worklogs
+    """
+    rows = 0
+    with pyarrow.parquet.ParquetWriter(path, arrow_schema(columns), compression=compression) as writer:
+        for batch in iter_record_batches(worklogs, columns=columns, batch_size=batch_size):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+def to_numpy(worklogs, columns=DEFAULT_COLUMNS, batch_size=5000):
+    """
+    Returns a dict of NumPy arrays per column: ``int64`` for numbers (missing values are 0), ``datetime64[D]``
+    for dates, ``Categorical`` for dictionary-encoded strings and object arrays for free text.
+    """
+    if numpy is None:
+        raise ImportError("NumPy export requires numpy, install it with "
+                          "`pip install tempo-api-python-client[numpy]`")
+    _check_columns(columns)
+
+    chunks = {name: [] for name in columns}
+    categories = {name: {} for name in columns if _kind(name) == CATEGORY}
+    for batch in iter_batches(worklogs, batch_size):
+        for name in columns:
+            kind, values = _column(name, batch)
+            if kind == INTEGER:
+                chunks[name].append(numpy.array([value or 0 for value in values], dtype=numpy.int64))
+            elif kind == DATE:
+                chunks[name].append(numpy.array(values, dtype="datetime64[D]"))
+            elif kind == CATEGORY:
+                codes = categories[name]
+                chunks[name].append(numpy.array([-1 if value is None else codes.setdefault(value, len(codes))
+                                                 for value in values], dtype=numpy.int32))
+            else:
+                chunks[name].append(numpy.array(values, dtype=object))
+
+    result = {}
+    for name in columns:
+        kind = _kind(name)
+        dtype = {INTEGER: numpy.int64, DATE: "datetime64[D]", CATEGORY: numpy.int32}.get(kind, object)
+        array = numpy.concatenate(chunks[name]) if chunks[name] else numpy.array([], dtype=dtype)
+        if kind == CATEGORY:
+            array = Categorical(array, numpy.array(list(categories[name]), dtype=object))
+        result[name] = array
+    return result
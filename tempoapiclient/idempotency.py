@@ -0,0 +1,253 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#   http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Replay-safe ``create_worklog``, ``create_plan`` and ``create_customer``.
+
+Tempo has no idempotency keys, so after a timeout or a server error it is unknown whether a create went through.
+Before such a create is retried, Tempo is searched for a record matching it which was created in the meantime,
+and that record is returned instead of creating a second one:
+
+    mutations = IdempotentMutations(tempo, retry=RetryPolicy(max_retries=5))
+    worklog = mutations.create_worklog(accountId="5b10ac8d82e05b22cc7d4ef5", issueId=10001,
+                                       dateFrom="2019-11-10", timeSpentSeconds=3600, idempotencyKey="import-42")
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from .ratelimit import RetryPolicy
+from .rest_client import status_code
+from .singleflight import SingleFlight
+from .transport import TRANSPORT_ERRORS
+
+log = logging.getLogger(__name__)
+
+# statuses of responses after which the create may or may not have happened (429 was not processed at all)
+_UNCERTAIN_STATUS = (408, 500, 502, 503, 504)
+
+
+def _lookup(record, path):
+    for name in path.split("."):
+        record = record.get(name) if isinstance(record, dict) else None
+    return record
+
+
+def _created_at(record):
+    value = record.get("createdAt")
+    if not value:
+        return None
+    try:
+        created = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return (created if created.tzinfo else created.replace(tzinfo=timezone.utc)).timestamp()
+
+
+class IdempotentMutations(object):
+    """
+    Wraps the create methods of a ``client_v4.Tempo`` with client-side idempotency keys.
+
+    Every create has a key: the ``idempotencyKey`` passed by the caller, or otherwise the method and its
+    arguments. Calls with the key of a create in flight wait for it and get its result instead of sending a
+    second request. The records created for keys passed by the caller are remembered, so repeating a call with
+    the same ``idempotencyKey`` returns the record created the first time.
+
+    A create failing with a lost connection, a timeout or a 408/5xx response is retried up to
+    ``retry.max_retries`` times. Before every retry Tempo is searched for a record with the same values created
+    since the first attempt: worklogs by author, issue, date, start time, duration and description, plans by
+    assignee, plan item, dates and planned seconds, customers by key. Matching records which were created by
+    someone else at the same time cannot be told apart, but a record is returned for one key only.
+    """
+
+    def __init__(self, tempo, retry=None, clock_skew=300.0, remember=1000):
+        """
+        :param tempo: ``client_v4.Tempo`` instance used to create and look up the records
+        :param retry: ``ratelimit.RetryPolicy`` deciding the number of retries and the wait before each of them
+        :param clock_skew: seconds the clocks of the client and Tempo may differ by, records created that long
+            before the first attempt are considered to be matching as well
+        :param remember: number of ``idempotencyKey`` results remembered, and of returned records which are not
+            matched for another create
+        """
+        self._tempo = tempo
+        self._retry = retry if retry is not None else RetryPolicy()
+        self._clock_skew = clock_skew
+        self._remember = remember
+        self._single_flight = SingleFlight()
+        self._completed = OrderedDict()
+        self._claimed = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create_worklog(self, accountId, issueId, dateFrom, timeSpentSeconds, billableSeconds=None, description=None,
+                       remainingEstimateSeconds=None, startTime=None, attributes=None, idempotencyKey=None):
+        """
+        Same as ``Tempo.create_worklog``.
+        :param idempotencyKey: OPTIONAL: client-side key of the Worklog
+        """
+        arguments = dict(accountId=accountId, issueId=issueId, dateFrom=dateFrom, timeSpentSeconds=timeSpentSeconds,
+                         billableSeconds=billableSeconds, description=description,
+                         remainingEstimateSeconds=remainingEstimateSeconds, startTime=startTime,
+                         attributes=attributes)
+        data, expected, find = self._worklog_lookup(arguments)
+        return self._create("worklog", "tempoWorklogId", data, idempotencyKey, expected, find,
+                            lambda: self._tempo.create_worklog(**arguments))
+
+    def find_worklog(self, since, **arguments):
+        """
+        Searches Tempo for a Worklog created by an earlier, uncertain ``create_worklog``.
+        :param since: timestamp of the first attempt of the create
+        :param arguments: arguments of ``Tempo.create_worklog``
+        :return: matching Worklog created since then and not returned for another create yet, or None
+        """
+        _, expected, find = self._worklog_lookup(arguments)
+        record = self._match("worklog", "tempoWorklogId", expected, find(), since - self._clock_skew)
+        return None if record is None else self._claim("worklog", "tempoWorklogId", record)
+
+    def _worklog_lookup(self, arguments):
+        data = self._tempo._worklog_data(**arguments)
+        expected = {"author.accountId": data["authorAccountId"], "issue.id": data["issueId"],
+                    "startDate": data["startDate"], "timeSpentSeconds": data["timeSpentSeconds"],
+                    "startTime": data.get("startTime"), "description": data.get("description")}
+
+        def find():
+            return self._tempo.search_worklogs(dateFrom=data["startDate"], dateTo=data["startDate"],
+                                               authorIds=[data["authorAccountId"]], issueIds=[data["issueId"]])
+
+        return data, expected, find
+
+    def create_plan(self, assigneeId, assigneeType, startDate, endDate, planItemId, planItemType,
+                    plannedSecondsPerDay, description=None, includeNonWorkingDays=None, planApprovalReviewerId=None,
+                    planApprovalStatus=None, recurrenceEndDate=None, rule=None, idempotencyKey=None):
+        """
+        Same as ``Tempo.create_plan``.
+        :param idempotencyKey: OPTIONAL: client-side key of the Plan
+        """
+        startDate = self._tempo._resolve_date(startDate).isoformat()
+        endDate = self._tempo._resolve_date(endDate).isoformat()
+        arguments = dict(assigneeId=assigneeId, assigneeType=assigneeType, startDate=startDate, endDate=endDate,
+                         planItemId=planItemId, planItemType=planItemType,
+                         plannedSecondsPerDay=plannedSecondsPerDay, description=description,
+                         includeNonWorkingDays=includeNonWorkingDays, planApprovalReviewerId=planApprovalReviewerId,
+                         planApprovalStatus=planApprovalStatus, recurrenceEndDate=recurrenceEndDate, rule=rule)
+        expected = {"assignee.id": assigneeId, "assignee.type": assigneeType, "planItem.id": planItemId,
+                    "planItem.type": planItemType, "startDate": startDate, "endDate": endDate,
+                    "plannedSecondsPerDay": plannedSecondsPerDay, "description": description}
+
+        def find():
+            generic = assigneeType == "GENERIC"
+            return self._tempo.search_plans(dateFrom=startDate, dateTo=endDate,
+                                            accountIds=None if generic else [assigneeId],
+                                            genericResourceIds=[assigneeId] if generic else None,
+                                            assigneeTypes=[assigneeType], planItemIds=[planItemId],
+                                            planItemTypes=[planItemType])
+
+        return self._create("plan", "id", arguments, idempotencyKey, expected, find,
+                            lambda: self._tempo.create_plan(**arguments))
+
+    def create_customer(self, key=None, name=None, data=None, idempotencyKey=None):
+        """
+        Same as ``Tempo.create_customer``, customers are matched by their key.
+        :param idempotencyKey: OPTIONAL: client-side key of the customer
+        """
+        arguments = dict(key=key, name=name, data=data)
+        customerKey = data.get("key") if data else key
+
+        def find():
+            try:
+                return [self._tempo.get_customers(key=customerKey)]
+            except SystemExit as e:
+                if status_code(e) == 404:
+                    return []
+                raise
+
+        return self._create("customer", "id", arguments, idempotencyKey, {"key": customerKey}, find,
+                            lambda: self._tempo.create_customer(key=key, name=name, data=data))
+
+    def _create(self, kind, id_field, arguments, idempotencyKey, expected, find, create):
+        if idempotencyKey is None:
+            return self._single_flight.do((kind, json.dumps(arguments, sort_keys=True, default=str)),
+                                          lambda: self._attempt(kind, id_field, expected, find, create))
+
+        key = (kind, idempotencyKey)
+
+        def remembered():
+            # looked up within the single flight, so a call finishing meanwhile is not missed
+            with self._lock:
+                if key in self._completed:
+                    return self._completed[key]
+            record = self._attempt(kind, id_field, expected, find, create)
+            with self._lock:
+                self._completed[key] = record
+                while len(self._completed) > self._remember:
+                    self._completed.popitem(last=False)
+            return record
+
+        return self._single_flight.do(key, remembered)
+
+    @staticmethod
+    def _uncertain(error):
+        if not isinstance(error, SystemExit):
+            return True
+        status = status_code(error)
+        # a SystemExit without status is raised when the response of a successful create could not be decoded
+        return status is None or status in _UNCERTAIN_STATUS
+
+    def _claim(self, kind, id_field, record):
+        with self._lock:
+            self._claimed[kind, _lookup(record, id_field)] = None
+            while len(self._claimed) > self._remember:
+                self._claimed.popitem(last=False)
+        return record
+
+    def _match(self, kind, id_field, expected, records, since):
+        for record in records:
+            if any(value is not None and str(_lookup(record, path)) != str(value)
+                   for path, value in expected.items()):
+                continue
+            created = _created_at(record)
+            if created is not None and created < since:
+                continue
+            with self._lock:
+                if (kind, _lookup(record, id_field)) in self._claimed:
+                    continue
+            return record
+        return None
+
+    def _attempt(self, kind, id_field, expected, find, create):
+        since = time.time() - self._clock_skew
+        attempt = 0
+        # whether an earlier attempt may have created the record
+        maybe_created = False
+        while True:
+            try:
+                if maybe_created:
+                    record = self._match(kind, id_field, expected, find(), since)
+                    if record is not None:
+                        log.info("Found %s %s created by an earlier attempt", kind, _lookup(record, id_field))
+                        return self._claim(kind, id_field, record)
+                    maybe_created = False
+                return self._claim(kind, id_field, create())
+            except (SystemExit,) + TRANSPORT_ERRORS as e:
+                status = status_code(e) if isinstance(e, SystemExit) else None
+                if attempt >= self._retry.max_retries or not (status == 429 or self._uncertain(e)):
+                    raise
+                # a throttled request was not processed
+                maybe_created = maybe_created or status != 429
+                # honours Retry-After
+                cause = e.args[0] if isinstance(e, SystemExit) and e.args else None
+                headers = getattr(getattr(cause, "response", None), "headers", None)
+            time.sleep(self._retry.delay(attempt, headers))
+            attempt += 1
@@ -0,0 +1,410 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#   http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Request hooks and metrics of a client: latency, bytes, retries, JSON decode time, pages per paginated call and
+cache lookups, labelled by endpoint template (e.g. ``/worklogs/user/{id}``).
+
+    instrumentation = Instrumentation(exporters=[PrometheusMetrics()])
+    tempo = Tempo(auth_token="<your_tempo_api_key>", instrumentation=instrumentation)
+    ...
+    for row in instrumentation.metrics.summary():
+        print(row["method"], row["endpoint"], row["requests"], row["seconds"])
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+try:
+    import prometheus_client
+except ImportError:  # pragma: no cover
+    prometheus_client = None
+
+try:
+    from opentelemetry import metrics as otel_metrics
+except ImportError:  # pragma: no cover
+    otel_metrics = None
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PAGES_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# name: (kind, description, labels, histogram buckets)
+METRICS = {
+    "tempo_requests_total": ("counter", "Requests sent to Tempo, status error if none arrived",
+                             ("method", "endpoint", "status"), None),
+    "tempo_request_seconds": ("histogram", "Duration of requests including retries", ("method", "endpoint"),
+                              SECONDS_BUCKETS),
+    "tempo_request_bytes_total": ("counter", "Bytes of request bodies sent", ("method", "endpoint"), None),
+    "tempo_response_bytes_total": ("counter", "Bytes of response bodies received", ("method", "endpoint"), None),
+    "tempo_retries_total": ("counter", "Responses which were retried", ("method", "endpoint", "status"), None),
+    "tempo_decode_seconds": ("histogram", "JSON decoding time of response bodies", ("method", "endpoint"),
+                             SECONDS_BUCKETS),
+    "tempo_pages": ("histogram", "Pages fetched per paginated call", ("endpoint",), PAGES_BUCKETS),
+    "tempo_cache_total": ("counter", "Cache lookups", ("endpoint", "cache", "result"), None),
+}
+
+# segments after these are keys or account IDs, which need not contain digits
+_KEY_PARENTS = frozenset(("account", "accounts", "account-categories", "customers", "members", "user",
+                          "user-schedule"))
+_LITERALS = frozenset(("search", "bulk"))
+
+
+@lru_cache(maxsize=1024)
+def _template(path):
+    segments = [segment for segment in path.split("/") if segment]
+    # the API version is not part of the endpoint: /4/..., /core/3/...
+    if segments[:1] == ["core"]:
+        segments = segments[1:]
+    if segments[:1] and segments[0].isdigit():
+        segments = segments[1:]
+
+    template = []
+    for n, segment in enumerate(segments):
+        is_id = any(c.isdigit() for c in segment) or (n > 0 and segments[n - 1] in _KEY_PARENTS)
+        template.append("{id}" if is_id and segment not in _LITERALS else segment)
+    return "/" + "/".join(template)
+
+
+def endpoint_template(url):
+    """
+    Returns the endpoint of ``url`` (absolute or a path) with IDs and keys replaced by ``{id}``,
+    e.g. ``https://api.tempo.io/4/worklogs/user/123abc?from=2019-11-10`` -> ``/worklogs/user/{id}``.
+    """
+    return _template(urlsplit(url).path)
+
+
+class Histogram(object):
+    """
+    Observations counted in buckets of upper bounds, plus their count and sum.
+    """
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, fraction):
+        """
+        Returns the upper bound of the bucket holding the ``fraction`` quantile (inf above the last bucket).
+        """
+        rank, seen = fraction * self.count, 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank and seen:
+                return bound
+        return 0.0
+
+
+class Metrics(object):
+    """
+    In-process counters and histograms, keyed by metric name and labels. Thread safe.
+
+    Exporters (``PrometheusMetrics``, ``OpenTelemetryMetrics``) offer the same ``inc``/``observe`` interface.
+    """
+
+    def __init__(self):
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, value, labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(METRICS[name][3])
+            histogram.observe(value)
+
+    def counter(self, name, **labels):
+        """
+        Returns the value of a counter, summed over the labels not given.
+        """
+        with self._lock:
+            return sum(value for (counter, key), value in self._counters.items()
+                       if counter == name and labels.items() <= dict(key).items())
+
+    def histogram(self, name, **labels):
+        """
+        Returns the ``Histogram`` with exactly ``labels``, or None.
+        """
+        with self._lock:
+            return self._histograms.get(self._key(name, labels))
+
+    def collect(self):
+        """
+        Returns ``(name, labels, value)`` of all counters and ``(name, labels, Histogram)`` of all histograms.
+        """
+        with self._lock:
+            return ([(name, dict(key), value) for (name, key), value in self._counters.items()],
+                    [(name, dict(key), histogram) for (name, key), histogram in self._histograms.items()])
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def summary(self):
+        """
+        Returns one row per method and endpoint, the endpoints the most time was spent on first. Each row has
+        ``method``, ``endpoint``, ``requests``, ``seconds``, ``p50``, ``p99`` (bucket bounds in seconds),
+        ``bytes_in``, ``bytes_out``, ``retries`` and ``decode_seconds``.
+        """
+        counters, histograms = self.collect()
+        rows = {}
+        for name, labels, histogram in histograms:
+            if name == "tempo_request_seconds":
+                rows[labels["method"], labels["endpoint"]] = {
+                    "method": labels["method"], "endpoint": labels["endpoint"], "requests": histogram.count,
+                    "seconds": histogram.sum, "p50": histogram.quantile(0.5), "p99": histogram.quantile(0.99),
+                    "bytes_in": 0, "bytes_out": 0, "retries": 0, "decode_seconds": 0.0}
+        columns = {"tempo_response_bytes_total": "bytes_in", "tempo_request_bytes_total": "bytes_out",
+                   "tempo_retries_total": "retries"}
+        for name, labels, value in counters:
+            row = rows.get((labels.get("method"), labels.get("endpoint")))
+            if row is not None and name in columns:
+                row[columns[name]] += value
+        for name, labels, histogram in histograms:
+            row = rows.get((labels.get("method"), labels.get("endpoint")))
+            if row is not None and name == "tempo_decode_seconds":
+                row["decode_seconds"] += histogram.sum
+        return sorted(rows.values(), key=lambda row: row["seconds"], reverse=True)
+
+
+class PrometheusMetrics(object):
+    """
+    Exports the metrics to ``prometheus_client`` (``pip install prometheus-client``). Create one per registry,
+    the metrics are registered when it is created.
+    """
+
+    def __init__(self, registry=None):
+        if prometheus_client is None:
+            raise ImportError("PrometheusMetrics requires prometheus_client, install it with "
+                              "`pip install tempo-api-python-client[prometheus]`")
+        registry = registry if registry is not None else prometheus_client.REGISTRY
+        self._metrics = {}
+        for name, (kind, description, labels, buckets) in METRICS.items():
+            if kind == "counter":
+                # prometheus_client appends _total to counters itself
+                metric = prometheus_client.Counter(name[:-len("_total")], description, labels, registry=registry)
+            else:
+                metric = prometheus_client.Histogram(name, description, labels, buckets=buckets, registry=registry)
+            self._metrics[name] = metric
+
+    def inc(self, name, value, labels):
+        self._metrics[name].labels(**labels).inc(value)
+
+    def observe(self, name, value, labels):
+        self._metrics[name].labels(**labels).observe(value)
+
+
+class OpenTelemetryMetrics(object):
+    """
+    Exports the metrics to an OpenTelemetry meter (``pip install opentelemetry-api``), the global meter provider's
+    ``tempoapiclient`` meter by default.
+    """
+
+    def __init__(self, meter=None):
+        if otel_metrics is None:
+            raise ImportError("OpenTelemetryMetrics requires opentelemetry-api, install it with "
+                              "`pip install tempo-api-python-client[opentelemetry]`")
+        meter = meter if meter is not None else otel_metrics.get_meter("tempoapiclient")
+        self._instruments = {}
+        for name, (kind, description, _, _) in METRICS.items():
+            if kind == "counter":
+                instrument = meter.create_counter(name[:-len("_total")], description=description)
+            else:
+                instrument = meter.create_histogram(name, description=description,
+                                                    unit="s" if name.endswith("_seconds") else "1")
+            self._instruments[name] = instrument
+
+    def inc(self, name, value, labels):
+        self._instruments[name].add(value, attributes=labels)
+
+    def observe(self, name, value, labels):
+        self._instruments[name].record(value, attributes=labels)
+
+
+class RequestEvent(object):
+    """
+    One request as passed to the ``before_request`` and ``after_request`` hooks. ``status_code``,
+    ``bytes_in`` and ``seconds`` are set once the (last retry of the) request is answered, ``error`` and
+    ``seconds`` once it failed without a response (e.g. a timeout or a lost connection).
+    """
+
+    __slots__ = ("method", "url", "endpoint", "bytes_out", "started", "retries", "status_code", "bytes_in",
+                 "seconds", "error")
+
+    def __init__(self, method, url, bytes_out=0):
+        self.method = method
+        self.url = url
+        self.endpoint = endpoint_template(url)
+        self.bytes_out = bytes_out
+        self.started = time.perf_counter()
+        self.retries = 0
+        self.status_code = None
+        self.bytes_in = 0
+        self.seconds = None
+        self.error = None
+
+
+class Instrumentation(object):
+    """
+    Records metrics of the requests of one or more clients into ``metrics`` (and ``exporters``), and calls the
+    hooks ``before_request(event)`` before a request is sent and ``after_request(event)`` once it is answered
+    or failed. Requests failing without a response are counted with the status "error".
+    """
+
+    def __init__(self, metrics=None, exporters=(), before_request=None, after_request=None):
+        """
+        :param metrics: OPTIONAL: ``Metrics`` to record into, a new one by default
+        :param exporters: OPTIONAL: further sinks, e.g. ``PrometheusMetrics`` or ``OpenTelemetryMetrics``
+        :param before_request: OPTIONAL: callable taking a ``RequestEvent`` before the request is sent
+        :param after_request: OPTIONAL: callable taking the ``RequestEvent`` once the response arrived or the
+            request failed
+        """
+        self.metrics = metrics if metrics is not None else Metrics()
+        self._sinks = [self.metrics] + list(exporters)
+        self.before_request = before_request
+        self.after_request = after_request
+
+    def _inc(self, name, value, **labels):
+        for sink in self._sinks:
+            sink.inc(name, value, labels)
+
+    def _observe(self, name, value, **labels):
+        for sink in self._sinks:
+            sink.observe(name, value, labels)
+
+    def request_started(self, method, url, body=None):
+        event = RequestEvent(method, url, len(body) if body else 0)
+        if self.before_request is not None:
+            self.before_request(event)
+        return event
+
+    def request_retried(self, event, status_code):
+        event.retries += 1
+        self._inc("tempo_retries_total", 1, method=event.method, endpoint=event.endpoint, status=str(status_code))
+
+    def request_finished(self, event, status_code, content):
+        event.status_code = status_code
+        event.bytes_in = len(content) if content else 0
+        self._finished(event, str(status_code))
+
+    def request_failed(self, event, error):
+        event.error = error
+        self._finished(event, "error")
+
+    def _finished(self, event, status):
+        event.seconds = time.perf_counter() - event.started
+        self._inc("tempo_requests_total", 1, method=event.method, endpoint=event.endpoint, status=status)
+        self._observe("tempo_request_seconds", event.seconds, method=event.method, endpoint=event.endpoint)
+        if event.bytes_out:
+            self._inc("tempo_request_bytes_total", event.bytes_out, method=event.method, endpoint=event.endpoint)
+        self._inc("tempo_response_bytes_total", event.bytes_in, method=event.method, endpoint=event.endpoint)
+        if self.after_request is not None:
+            self.after_request(event)
+
+    def decoded(self, method, url, seconds):
+        self._observe("tempo_decode_seconds", seconds, method=method, endpoint=endpoint_template(url))
+
+    def paged(self, path, pages):
+        self._observe("tempo_pages", pages, endpoint=endpoint_template(path))
+
+    def cache_lookup(self, path, hit, cache="response"):
+        """
+        :param cache: "response" for ``cache.ResponseCache``, "conditional" for conditional GET requests
+        """
+        self._inc("tempo_cache_total", 1, endpoint=endpoint_template(path), cache=cache,
+                  result="hit" if hit else "miss")
+
+
+class PageCounter(object):
+    """
+    Counts the pages of one paginated call through the fetch functions it wraps, and reports the count to
+    ``instrumentation`` once the records are exhausted or abandoned. Does nothing without instrumentation.
+    """
+
+    def __init__(self, instrumentation, path, pages=1):
+        """
+        :param pages: pages fetched before the wrapped functions are used, i.e. the first page
+        """
+        self._instrumentation = instrumentation
+        self._path = path
+        self._lock = threading.Lock()
+        self.pages = pages
+
+    def _count(self):
+        with self._lock:
+            self.pages += 1
+
+    def wrap(self, fetch):
+        if self._instrumentation is None:
+            return fetch
+
+        def counted(*args):
+            self._count()
+            return fetch(*args)
+
+        return counted
+
+    def records(self, records):
+        if self._instrumentation is None:
+            return records
+        return self._records(records)
+
+    def _records(self, records):
+        try:
+            yield from records
+        finally:
+            self._instrumentation.paged(self._path, self.pages)
+
+    def awrap(self, fetch):
+        if self._instrumentation is None:
+            return fetch
+
+        async def counted(*args):
+            self._count()
+            return await fetch(*args)
+
+        return counted
+
+    def arecords(self, records):
+        if self._instrumentation is None:
+            return records
+        return self._arecords(records)
+
+    async def _arecords(self, records):
+        try:
+            async for record in records:
+                yield record
+        finally:
+            self._instrumentation.paged(self._path, self.pages)
@@ -0,0 +1,489 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#   http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Local read-through mirror of Tempo data in SQLite.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+
+from .models import Account, Plan, Team, Worklog
+from .sync import WorklogSync
+
+
+def _isoformat(value):
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _next_day(value):
+    return (date.fromisoformat(value) + timedelta(days=1)).isoformat()
+
+
+class TempoMirror(object):
+    """
+    Answers reads of a ``client_v4.Tempo`` client from a local SQLite copy, with the same method signatures.
+
+    Worklogs and plans are mirrored per date range with ``sync_worklogs`` and ``sync_plans``, every following
+    sync of a range only downloads what changed since (``updatedFrom``). Teams, team memberships and accounts
+    are mirrored completely with ``sync_teams`` and ``sync_accounts``. Reads covered by the mirror are answered
+    locally, everything else (other filters, ranges which were never synced, all other methods) is passed to
+    the client. Worklogs are indexed by date, author, issue and account (the ``_Account_`` work attribute).
+
+    Worklogs are synced by ``sync.WorklogSync``, with the same limits: a worklog deleted in Tempo is only
+    removed by a sync with ``detect_deletions``, and a worklog whose date was moved out of a synced range is still
+    answered for its old date until the range it was moved to is synced or a deletion pass of the old range
+    removes it. Plans are only ever added and updated, plans deleted in Tempo stay in the mirror.
+
+    A mirror can be shared by threads, its reads wait while a sync is storing into it.
+
+        with TempoMirror(tempo, "tempo.db") as mirror:
+            mirror.sync_worklogs("2019-01-01", "2019-12-31")
+            worklogs = mirror.get_worklogs("2019-11-01", "2019-11-30", accountId="1111aaaa2222bbbb3333cccc")
+    """
+
+    def __init__(self, tempo, path, parallel_pages=None, account_attribute="_Account_"):
+        """
+        :param tempo: ``client_v4.Tempo`` instance used to sync and for reads the mirror does not cover
+        :param path: path of the SQLite database, created if it does not exist
+        :param parallel_pages: number of pages fetched at the same time while syncing
+        :param account_attribute: key of the work attribute holding the account of a worklog
+        """
+        self._tempo = tempo
+        self._parallel_pages = parallel_pages
+        self._account_attribute = account_attribute
+        # shared by all threads using the mirror, every access holds the lock
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS worklogs (
+                id INTEGER PRIMARY KEY,
+                start_date TEXT NOT NULL,
+                author_account_id TEXT,
+                issue_id INTEGER,
+                account_key TEXT,
+                updated_at TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS worklogs_start_date ON worklogs (start_date);
+            CREATE INDEX IF NOT EXISTS worklogs_author ON worklogs (author_account_id, start_date);
+            CREATE INDEX IF NOT EXISTS worklogs_issue ON worklogs (issue_id, start_date);
+            CREATE INDEX IF NOT EXISTS worklogs_account ON worklogs (account_key, start_date);
+            CREATE TABLE IF NOT EXISTS plans (
+                id INTEGER PRIMARY KEY,
+                assignee_id TEXT,
+                assignee_type TEXT,
+                plan_item_id TEXT,
+                plan_item_type TEXT,
+                start_date TEXT,
+                end_date TEXT,
+                updated_at TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS plans_assignee ON plans (assignee_id, start_date);
+            CREATE INDEX IF NOT EXISTS plans_dates ON plans (start_date, end_date);
+            CREATE TABLE IF NOT EXISTS teams (
+                id INTEGER PRIMARY KEY,
+                data TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS team_memberships (
+                id INTEGER PRIMARY KEY,
+                team_id INTEGER NOT NULL,
+                account_id TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS team_memberships_team ON team_memberships (team_id);
+            CREATE INDEX IF NOT EXISTS team_memberships_account ON team_memberships (account_id);
+            CREATE TABLE IF NOT EXISTS accounts (
+                id INTEGER PRIMARY KEY,
+                key TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS coverage (
+                resource TEXT NOT NULL,
+                date_from TEXT NOT NULL,
+                date_to TEXT NOT NULL,
+                updated_from TEXT,
+                PRIMARY KEY (resource, date_from, date_to)
+            );
+            CREATE TABLE IF NOT EXISTS deletion_passes (
+                date_from TEXT NOT NULL,
+                date_to TEXT NOT NULL,
+                passed_at REAL NOT NULL,
+                PRIMARY KEY (date_from, date_to)
+            );
+        """)
+        self._worklog_sync = _MirrorWorklogSync(self)
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __getattr__(self, name):
+        # everything the mirror does not answer itself goes to the client
+        return getattr(self._tempo, name)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _rows(self, query, args=()):
+        with self._lock:
+            return self._db.execute(query, args).fetchall()
+
+    # Coverage
+
+    def _checkpoint(self, resource, dateFrom, dateTo):
+        rows = self._rows("SELECT updated_from FROM coverage WHERE resource = ? AND date_from = ? AND date_to = ?",
+                          (resource, dateFrom, dateTo))
+        return rows[0][0] if rows else None
+
+    def _has_range(self, resource, dateFrom, dateTo):
+        return bool(self._rows("SELECT 1 FROM coverage WHERE resource = ? AND date_from = ? AND date_to = ?",
+                               (resource, dateFrom, dateTo)))
+
+    def covers(self, resource, dateFrom, dateTo):
+        """
+        Returns True if the synced ranges of ``resource`` ("worklogs", "plans", "teams" or "accounts") together
+        cover the whole date range (date ranges are ignored for teams and accounts).
+        """
+        if resource in ("teams", "accounts"):
+            return self._has_range(resource, "", "")
+        dateFrom, dateTo = _isoformat(dateFrom), _isoformat(dateTo)
+        rows = self._rows("SELECT date_from, date_to FROM coverage WHERE resource = ? AND date_to >= ? "
+                          "AND date_from <= ? ORDER BY date_from", (resource, dateFrom, dateTo))
+        covered = dateFrom
+        for rangeFrom, rangeTo in rows:
+            if rangeFrom > covered:
+                return False
+            if rangeTo >= covered:
+                covered = _next_day(rangeTo)
+            if covered > dateTo:
+                return True
+        return False
+
+    def _answer(self, covered):
+        if covered:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return covered
+
+    # Worklogs
+
+    def _worklog_row(self, worklog):
+        attributes = (worklog.get("attributes") or {}).get("values") or ()
+        accountKey = next((attribute.get("value") for attribute in attributes
+                           if attribute.get("key") == self._account_attribute), None)
+        return (worklog["tempoWorklogId"], worklog["startDate"], (worklog.get("author") or {}).get("accountId"),
+                (worklog.get("issue") or {}).get("id"), accountKey, worklog.get("updatedAt"), json.dumps(worklog))
+
+    def sync_worklogs(self, dateFrom, dateTo, detect_deletions=False, deletion_interval=None):
+        """
+        Fetches the worklogs of the date range changed since its last sync and merges them into the mirror,
+        see ``sync.WorklogSync.sync``.
+        :param detect_deletions: also download all worklogs of the range again to find worklogs deleted in Tempo
+        :param deletion_interval: OPTIONAL: seconds, skip the deletion pass if the last one of the range is
+            more recent
+        :return: ``sync.SyncResult`` with the IDs of created, updated and deleted worklogs
+        """
+        return self._worklog_sync.sync(dateFrom, dateTo, detect_deletions=detect_deletions,
+                                       deletion_interval=deletion_interval)
+
+    def _query_worklogs(self, dateFrom, dateTo, updatedFrom=None, worklogId=None, jiraWorklogId=None,
+                        jiraFilterId=None, accountKey=None, projectId=None, teamId=None, accountId=None, issueId=None):
+        """
+        Returns the JSON of the stored worklogs, or None if the mirror cannot answer the query.
+        """
+        # projects, JIRA filters and teams are not part of the worklogs
+        if jiraWorklogId or jiraFilterId or projectId or teamId:
+            return None
+        if worklogId:
+            return [row[0] for row in self._rows("SELECT data FROM worklogs WHERE id = ?", (worklogId,))] or None
+
+        dateFrom, dateTo = _isoformat(dateFrom), _isoformat(dateTo)
+        if not self.covers("worklogs", dateFrom, dateTo):
+            return None
+
+        query, args = "SELECT data FROM worklogs WHERE start_date BETWEEN ? AND ?", [dateFrom, dateTo]
+        for column, value in (("account_key", accountKey), ("author_account_id", accountId),
+                              ("issue_id", issueId)):
+            if value:
+                query += f" AND {column} = ?"
+                args.append(value)
+        if updatedFrom:
+            query += " AND updated_at >= ?"
+            args.append(_isoformat(updatedFrom))
+        return [row[0] for row in self._rows(query + " ORDER BY start_date, id", args)]
+
+    def get_worklogs(self, dateFrom, dateTo, updatedFrom=None, worklogId=None, jiraWorklogId=None, jiraFilterId=None,
+                     accountKey=None, projectId=None, teamId=None, accountId=None, issueId=None,
+                     parallel_pages=None, as_records=False):
+        """
+        Same as ``Tempo.get_worklogs``, answered from the mirror if it covers the query.
+        """
+        worklogs = self._query_worklogs(dateFrom, dateTo, updatedFrom=updatedFrom, worklogId=worklogId,
+                                        jiraWorklogId=jiraWorklogId, jiraFilterId=jiraFilterId,
+                                        accountKey=accountKey, projectId=projectId, teamId=teamId,
+                                        accountId=accountId, issueId=issueId)
+        if not self._answer(worklogs is not None):
+            return self._tempo.get_worklogs(dateFrom, dateTo, updatedFrom=updatedFrom, worklogId=worklogId,
+                                            jiraWorklogId=jiraWorklogId, jiraFilterId=jiraFilterId,
+                                            accountKey=accountKey, projectId=projectId, teamId=teamId,
+                                            accountId=accountId, issueId=issueId, parallel_pages=parallel_pages,
+                                            as_records=as_records)
+        worklogs = [Worklog.from_dict(json.loads(worklog)) if as_records else json.loads(worklog)
+                    for worklog in worklogs]
+        return worklogs[0] if worklogId else worklogs
+
+    def iter_worklogs(self, dateFrom, dateTo, updatedFrom=None, worklogId=None, jiraWorklogId=None, jiraFilterId=None,
+                      accountKey=None, projectId=None, teamId=None, accountId=None, issueId=None,
+                      parallel_pages=None, as_records=False):
+        """
+        Same as ``Tempo.iter_worklogs``, answered from the mirror if it covers the query. The stored worklogs are
+        decoded one at a time, a query the mirror does not cover is streamed from Tempo page by page.
+        """
+        worklogs = self._query_worklogs(dateFrom, dateTo, updatedFrom=updatedFrom, worklogId=worklogId,
+                                        jiraWorklogId=jiraWorklogId, jiraFilterId=jiraFilterId,
+                                        accountKey=accountKey, projectId=projectId, teamId=teamId,
+                                        accountId=accountId, issueId=issueId)
+        if not self._answer(worklogs is not None):
+            return self._tempo.iter_worklogs(dateFrom, dateTo, updatedFrom=updatedFrom, worklogId=worklogId,
+                                             jiraWorklogId=jiraWorklogId, jiraFilterId=jiraFilterId,
+                                             accountKey=accountKey, projectId=projectId, teamId=teamId,
+                                             accountId=accountId, issueId=issueId, parallel_pages=parallel_pages,
+                                             as_records=as_records)
+        return (Worklog.from_dict(json.loads(worklog)) if as_records else json.loads(worklog) for worklog in worklogs)
+
+    # Plans
+
+    def sync_plans(self, dateFrom, dateTo):
+        """
+        Fetches the plans of the date range changed since its last sync and stores them in the mirror.
+        :return: number of stored plans
+        """
+        dateFrom, dateTo = _isoformat(dateFrom), _isoformat(dateTo)
+        updatedFrom = self._checkpoint("plans", dateFrom, dateTo)
+        plans = self._tempo.search_plans(dateFrom, dateTo, updatedFrom=updatedFrom[:10] if updatedFrom else None,
+                                         parallel_pages=self._parallel_pages) or []
+
+        highWaterMark = updatedFrom
+        with self._lock, self._db:
+            for plan in plans:
+                assignee, planItem = plan.get("assignee") or {}, plan.get("planItem") or {}
+                self._db.execute("INSERT OR REPLACE INTO plans (id, assignee_id, assignee_type, plan_item_id, "
+                                 "plan_item_type, start_date, end_date, updated_at, data) "
+                                 "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                 (plan["id"], str(assignee.get("id")), assignee.get("type"),
+                                  str(planItem.get("id")), planItem.get("type"), plan.get("startDate"),
+                                  max(plan.get("endDate") or "", plan.get("recurrenceEndDate") or ""),
+                                  plan.get("updatedAt"), json.dumps(plan)))
+                updatedAt = plan.get("updatedAt")
+                if updatedAt and (highWaterMark is None or updatedAt > highWaterMark):
+                    highWaterMark = updatedAt
+            self._db.execute("INSERT OR REPLACE INTO coverage (resource, date_from, date_to, updated_from) "
+                             "VALUES ('plans', ?, ?, ?)", (dateFrom, dateTo, highWaterMark))
+        return len(plans)
+
+    def _query_plans(self, dateFrom=None, dateTo=None, id=None, accountId=None, accountIds=None, assigneeTypes=None,
+                     genericResourceId=None, genericResourceIds=None, planIds=None, planItemIds=None,
+                     planItemTypes=None, plannedTimeBreakdown=None, updatedFrom=None):
+        # the breakdown is computed by Tempo for the requested range
+        if plannedTimeBreakdown:
+            return None
+        if id:
+            rows = self._rows("SELECT data FROM plans WHERE id = ?", (id,))
+            return json.loads(rows[0][0]) if rows else None
+        if not dateFrom or not dateTo:
+            return None
+
+        dateFrom, dateTo = _isoformat(dateFrom), _isoformat(dateTo)
+        if not self.covers("plans", dateFrom, dateTo):
+            return None
+
+        query, args = "SELECT data FROM plans WHERE start_date <= ? AND end_date >= ?", [dateTo, dateFrom]
+        if accountId:
+            accountIds, assigneeTypes = [accountId], ["USER"]
+        elif genericResourceId:
+            genericResourceIds, assigneeTypes = [genericResourceId], ["GENERIC"]
+        assigneeIds = [str(value) for value in (accountIds or []) + (genericResourceIds or [])]
+        for column, values in (("assignee_id", assigneeIds), ("assignee_type", assigneeTypes), ("id", planIds),
+                               ("plan_item_id", [str(value) for value in planItemIds or []]),
+                               ("plan_item_type", planItemTypes)):
+            if values:
+                query += f" AND {column} IN ({', '.join('?' * len(values))})"
+                args.extend(values)
+        if updatedFrom:
+            query += " AND updated_at >= ?"
+            args.append(_isoformat(updatedFrom))
+        return [json.loads(row[0]) for row in self._rows(query + " ORDER BY start_date, id", args)]
+
+    def get_plans(self, dateFrom=None, dateTo=None, id=None, accountId=None, accountIds=None, assigneeTypes=None,
+                  genericResourceId=None, genericResourceIds=None, planIds=None, planItemIds=None, planItemTypes=None,
+                  plannedTimeBreakdown=None, updatedFrom=None, parallel_pages=None, as_records=False):
+        """
+        Same as ``Tempo.get_plans``, answered from the mirror if it covers the query.
+        """
+        plans = self._query_plans(dateFrom=dateFrom, dateTo=dateTo, id=id, accountId=accountId, accountIds=accountIds,
+                                  assigneeTypes=assigneeTypes, genericResourceId=genericResourceId,
+                                  genericResourceIds=genericResourceIds, planIds=planIds, planItemIds=planItemIds,
+                                  planItemTypes=planItemTypes, plannedTimeBreakdown=plannedTimeBreakdown,
+                                  updatedFrom=updatedFrom)
+        if not self._answer(plans is not None):
+            return self._tempo.get_plans(dateFrom=dateFrom, dateTo=dateTo, id=id, accountId=accountId,
+                                         accountIds=accountIds, assigneeTypes=assigneeTypes,
+                                         genericResourceId=genericResourceId, genericResourceIds=genericResourceIds,
+                                         planIds=planIds, planItemIds=planItemIds, planItemTypes=planItemTypes,
+                                         plannedTimeBreakdown=plannedTimeBreakdown, updatedFrom=updatedFrom,
+                                         parallel_pages=parallel_pages, as_records=as_records)
+        if not as_records:
+            return plans
+        return Plan.from_dict(plans) if isinstance(plans, dict) else list(map(Plan.from_dict, plans))
+
+    def get_plan(self, id, as_records=False):
+        return self.get_plans(id=id, as_records=as_records)
+
+    def get_plan_for_user(self, accountId, plannedTimeBreakdown=None, dateFrom=None, dateTo=None, updatedFrom=None,
+                          parallel_pages=None, as_records=False):
+        return self.get_plans(accountId=accountId, plannedTimeBreakdown=plannedTimeBreakdown, dateFrom=dateFrom,
+                              dateTo=dateTo, updatedFrom=updatedFrom, parallel_pages=parallel_pages,
+                              as_records=as_records)
+
+    def get_plan_for_resource(self, genericResourceId, plannedTimeBreakdown=None, dateFrom=None, dateTo=None,
+                              updatedFrom=None, parallel_pages=None, as_records=False):
+        return self.get_plans(genericResourceId=genericResourceId, plannedTimeBreakdown=plannedTimeBreakdown,
+                              dateFrom=dateFrom, dateTo=dateTo, updatedFrom=updatedFrom, parallel_pages=parallel_pages,
+                              as_records=as_records)
+
+    def search_plans(self, dateFrom, dateTo, accountIds=None, assigneeTypes=None, genericResourceIds=None,
+                     planIds=None, planItemIds=None, planItemTypes=None, plannedTimeBreakdown=None, updatedFrom=None,
+                     parallel_pages=None, as_records=False):
+        return self.get_plans(dateFrom=dateFrom, dateTo=dateTo, accountIds=accountIds, assigneeTypes=assigneeTypes,
+                              genericResourceIds=genericResourceIds, planIds=planIds, planItemIds=planItemIds,
+                              planItemTypes=planItemTypes, plannedTimeBreakdown=plannedTimeBreakdown,
+                              updatedFrom=updatedFrom, parallel_pages=parallel_pages, as_records=as_records)
+
+    # Teams and accounts
+
+    def sync_teams(self):
+        """
+        Replaces the mirrored teams and their memberships with the current ones.
+        :return: number of stored teams
+        """
+        teams = self._tempo.get_teams()
+        memberships = {team["id"]: self._tempo.get_team_memberships(team["id"]) for team in teams}
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM teams")
+            self._db.execute("DELETE FROM team_memberships")
+            self._db.executemany("INSERT INTO teams (id, data) VALUES (?, ?)",
+                                 [(team["id"], json.dumps(team)) for team in teams])
+            self._db.executemany("INSERT OR REPLACE INTO team_memberships (id, team_id, account_id, data) "
+                                 "VALUES (?, ?, ?, ?)",
+                                 [(membership["id"], teamId, (membership.get("member") or {}).get("accountId"),
+                                   json.dumps(membership))
+                                  for teamId, team_memberships in memberships.items()
+                                  for membership in team_memberships])
+            self._db.execute("INSERT OR REPLACE INTO coverage (resource, date_from, date_to) VALUES ('teams', '', '')")
+        return len(teams)
+
+    def sync_accounts(self):
+        """
+        Replaces the mirrored accounts with the current ones.
+        :return: number of stored accounts
+        """
+        accounts = self._tempo.get_accounts()
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM accounts")
+            self._db.executemany("INSERT INTO accounts (id, key, data) VALUES (?, ?, ?)",
+                                 [(account["id"], account.get("key"), json.dumps(account)) for account in accounts])
+            self._db.execute("INSERT OR REPLACE INTO coverage (resource, date_from, date_to) "
+                             "VALUES ('accounts', '', '')")
+        return len(accounts)
+
+    def get_teams(self, teamId=None, as_records=False):
+        """
+        Same as ``Tempo.get_teams``, answered from the mirror once teams were synced.
+        """
+        if not self._answer(self.covers("teams", None, None)):
+            return self._tempo.get_teams(teamId=teamId, as_records=as_records)
+        if teamId:
+            rows = self._rows("SELECT data FROM teams WHERE id = ?", (teamId,))
+            if not rows:
+                return self._tempo.get_teams(teamId=teamId, as_records=as_records)
+            team = json.loads(rows[0][0])
+            return Team.from_dict(team) if as_records else team
+        teams = [json.loads(row[0]) for row in self._rows("SELECT data FROM teams ORDER BY id")]
+        return list(map(Team.from_dict, teams)) if as_records else teams
+
+    def get_team_memberships(self, teamId):
+        """
+        Same as ``Tempo.get_team_memberships``, answered from the mirror once teams were synced.
+        """
+        if not self._answer(self.covers("teams", None, None)):
+            return self._tempo.get_team_memberships(teamId)
+        rows = self._rows("SELECT data FROM team_memberships WHERE team_id = ? ORDER BY id", (teamId,))
+        return [json.loads(row[0]) for row in rows]
+
+    def get_accounts(self, as_records=False):
+        """
+        Same as ``Tempo.get_accounts``, answered from the mirror once accounts were synced.
+        """
+        if not self._answer(self.covers("accounts", None, None)):
+            return self._tempo.get_accounts(as_records=as_records)
+        accounts = [json.loads(row[0]) for row in self._rows("SELECT data FROM accounts ORDER BY id")]
+        return list(map(Account.from_dict, accounts)) if as_records else accounts
+
+
+class _MirrorWorklogSync(WorklogSync):
+    """
+    ``WorklogSync`` storing into the worklogs table and the coverage of a ``TempoMirror``.
+    """
+
+    def __init__(self, mirror):
+        self._mirror = mirror
+        super().__init__(mirror._tempo, mirror._db, parallel_pages=mirror._parallel_pages)
+
+    def _create_tables(self):
+        # created by the mirror
+        pass
+
+    def sync(self, dateFrom, dateTo, detect_deletions=False, deletion_interval=None):
+        # the worklogs are stored while they are downloaded, in one transaction of the shared connection
+        with self._mirror._lock:
+            return super().sync(dateFrom, dateTo, detect_deletions=detect_deletions,
+                                deletion_interval=deletion_interval)
+
+    def checkpoint(self, dateFrom, dateTo):
+        return self._mirror._checkpoint("worklogs", _isoformat(dateFrom), _isoformat(dateTo))
+
+    def _set_checkpoint(self, date_from, date_to, updated_from):
+        self._db.execute("INSERT OR REPLACE INTO coverage (resource, date_from, date_to, updated_from) "
+                         "VALUES ('worklogs', ?, ?, ?)", (date_from, date_to, updated_from))
+
+    def reset(self, dateFrom, dateTo):
+        with self._mirror._lock, self._db:
+            self._db.execute("DELETE FROM coverage WHERE resource = 'worklogs' AND date_from = ? AND date_to = ?",
+                             (_isoformat(dateFrom), _isoformat(dateTo)))
+
+    def _store(self, worklog):
+        self._db.execute("INSERT OR REPLACE INTO worklogs (id, start_date, author_account_id, issue_id, account_key, "
+                         "updated_at, data) VALUES (?, ?, ?, ?, ?, ?, ?)", self._mirror._worklog_row(worklog))
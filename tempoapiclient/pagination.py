@@ -0,0 +1,287 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#   http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Helpers for walking paginated Tempo responses (``{"results": [...], "metadata": {...}}``).
+"""
+
+import asyncio
+import threading
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+from .instrumentation import endpoint_template
+
+
+def has_next(resp):
+    """
+    Returns True if the page ``resp`` points to a following page.
+    """
+    return bool((resp.get('metadata') or {}).get('next'))
+
+
+def next_window(resp):
+    """
+    Returns ``(offset, limit)`` of the page following the page ``resp``.
+    """
+    metadata = resp.get('metadata') or {}
+    limit = int(metadata.get('limit') or len(resp['results']) or 1)
+    return int(metadata.get('offset') or 0) + limit, limit
+
+
+def with_paging(body, offset, limit):
+    """
+    Returns the serialized JSON object ``body`` (str or bytes) with ``offset`` and ``limit`` members appended,
+    so that a search body is serialized only once and reused for each of its pages.
+    """
+    if isinstance(body, bytes):
+        return with_paging(body.decode("utf-8"), offset, limit).encode("utf-8")
+    head = body.rstrip()[:-1].rstrip()
+    separator = ", " if head != "{" else ""
+    return '{}{}"offset": {}, "limit": {}}}'.format(head, separator, int(offset), int(limit))
+
+
+def iter_results(resp, fetch_next):
+    """
+    Yields the records of a paginated response page by page.
+    The following page is requested only once all records of the current page were consumed,
+    so at most one page is kept in memory.
+    :param resp: first page as returned by Tempo
+    :param fetch_next: callable returning the page following the page passed to it
+    """
+    while True:
+        yield from resp['results']
+        if not has_next(resp):
+            return
+        resp = fetch_next(resp)
+
+
+def iter_results_parallel(resp, fetch_page, parallel_pages):
+    """
+    Yields the records of a paginated response like ``iter_results``, but keeps up to ``parallel_pages``
+    following pages in flight at the same time.
+    Tempo's metadata carries no total count, so the following pages are requested by offset
+    (``metadata.offset + n * metadata.limit``) in a sliding window. Records are yielded in page order and
+    fetching stops at the first page without a ``next`` link, which wastes at most ``parallel_pages - 1``
+    requests past the last page.
+    :param resp: first page as returned by Tempo
+    :param fetch_page: callable taking ``offset`` and ``limit`` and returning that page
+    :param parallel_pages: maximum number of pages requested at the same time
+    """
+    metadata = resp.get('metadata') or {}
+    if not metadata.get('next'):
+        yield from resp['results']
+        return
+
+    offset, limit = next_window(resp)
+
+    executor = ThreadPoolExecutor(max_workers=parallel_pages)
+    try:
+        pending = deque()
+        for _ in range(parallel_pages):
+            pending.append(executor.submit(fetch_page, offset, limit))
+            offset += limit
+
+        yield from resp['results']
+        resp = None
+
+        while pending:
+            page = pending.popleft().result()
+            if has_next(page):
+                pending.append(executor.submit(fetch_page, offset, limit))
+                offset += limit
+            else:
+                pending.clear()
+            yield from page['results']
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+async def aiter_results(resp, fetch_next):
+    """
+    Asynchronous counterpart of ``iter_results``.
+    :param resp: first page as returned by Tempo
+    :param fetch_next: coroutine function returning the page following the page passed to it
+    """
+    while True:
+        for record in resp['results']:
+            yield record
+        if not has_next(resp):
+            return
+        resp = await fetch_next(resp)
+
+
+async def aiter_results_parallel(resp, fetch_page, parallel_pages):
+    """
+    Asynchronous counterpart of ``iter_results_parallel``, pages are fetched as concurrent tasks.
+    :param resp: first page as returned by Tempo
+    :param fetch_page: coroutine function taking ``offset`` and ``limit`` and returning that page
+    :param parallel_pages: maximum number of pages requested at the same time
+    """
+    metadata = resp.get('metadata') or {}
+    if not metadata.get('next'):
+        for record in resp['results']:
+            yield record
+        return
+
+    offset, limit = next_window(resp)
+
+    pending = deque()
+    try:
+        for _ in range(parallel_pages):
+            pending.append(asyncio.ensure_future(fetch_page(offset, limit)))
+            offset += limit
+
+        for record in resp['results']:
+            yield record
+        resp = None
+
+        while pending:
+            page = await pending.popleft()
+            if has_next(page):
+                pending.append(asyncio.ensure_future(fetch_page(offset, limit)))
+                offset += limit
+            else:
+                for task in pending:
+                    task.cancel()
+                pending.clear()
+            for record in page['results']:
+                yield record
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class AdaptivePageSize(object):
+    """
+    Picks the page size (``limit``) per endpoint template (e.g. ``/worklogs/user/{id}``) from the pages fetched
+    before: the largest size whose estimated server time stays below ``target_seconds`` and whose estimated body
+    stays below ``max_bytes``, so that few round trips are needed without pages slow enough to time out.
+
+    Sizes are picked from ``sizes`` only, which keeps URLs (and with them cached and conditional responses)
+    stable. A size grows at most one step per full page, and drops by half after a timeout or a 5xx response.
+    A ``limit`` the server answers with a smaller one is remembered as the endpoint's maximum.
+    ``state()`` returns the tuned sizes, which can be passed as ``state`` to a new controller.
+
+        tempo = Tempo(auth_token="<your_tempo_api_key>", adaptive_limit=AdaptivePageSize(target_seconds=3))
+    """
+
+    SIZES = (50, 100, 200, 500, 1000, 2000, 5000)
+
+    def __init__(self, max_limit=5000, initial=1000, target_seconds=5.0, max_bytes=16 * 2 ** 20, sizes=SIZES,
+                 smoothing=0.3, min_records=20, state=None):
+        """
+        :param max_limit: largest page size the server accepts (5000 for Tempo v4, 1000 for v3)
+        :param initial: page size of endpoints without observations
+        :param target_seconds: server time (until the response headers) one page should stay below
+        :param max_bytes: body size one page should stay below
+        :param sizes: page sizes to pick from
+        :param smoothing: weight of a cheaper latest page in the moving averages of time and bytes per record,
+            a more expensive one replaces them
+        :param min_records: pages with fewer records do not change the estimates, fixed costs dominate them
+        :param state: OPTIONAL: tuned sizes as returned by ``state()``
+        """
+        self.max_limit = max_limit
+        self.sizes = tuple(sorted(size for size in sizes if size <= max_limit)) or (max_limit,)
+        self.initial = self._size(initial)
+        self.target_seconds = target_seconds
+        self.max_bytes = max_bytes
+        self.smoothing = smoothing
+        self.min_records = min_records
+        self._endpoints = {endpoint: dict(values) for endpoint, values in (state or {}).items()}
+        self._lock = threading.Lock()
+
+    def _size(self, limit, cap=None):
+        """
+        Returns the largest of ``sizes`` not above ``limit`` (and ``cap``), or the smallest one.
+        """
+        limit = min(limit, cap or self.max_limit, self.max_limit)
+        index = bisect_right(self.sizes, limit)
+        if index:
+            return self.sizes[index - 1]
+        return min(self.sizes[0], cap) if cap else self.sizes[0]
+
+    def limit(self, path):
+        """
+        Returns the page size to request from the endpoint of ``path`` (a path or URL).
+        """
+        with self._lock:
+            state = self._endpoints.get(endpoint_template(path))
+            return self.initial if state is None else state["limit"]
+
+    def _state(self, endpoint):
+        state = self._endpoints.get(endpoint)
+        if state is None:
+            state = self._endpoints[endpoint] = {"limit": self.initial, "cap": None, "seconds_per_record": None,
+                                                 "bytes_per_record": None}
+        return state
+
+    def _average(self, previous, value):
+        # costs rising are taken over at once, costs falling only gradually
+        if previous is None or value >= previous:
+            return value
+        return previous + self.smoothing * (value - previous)
+
+    def observe(self, url, resp, size, seconds):
+        """
+        Records a page ``resp`` returned for ``url`` with a body of ``size`` bytes after ``seconds``.
+        """
+        metadata = resp.get('metadata') or {}
+        records = len(resp.get('results') or ())
+        requested = dict(parse_qsl(urlsplit(url).query)).get('limit')
+        requested = int(requested) if requested and requested.isdigit() else metadata.get('limit')
+        served = metadata.get('limit')
+
+        with self._lock:
+            state = self._state(endpoint_template(url))
+            if served and requested and int(served) < int(requested):
+                state["cap"] = int(served)
+            if records >= self.min_records:
+                state["seconds_per_record"] = self._average(state["seconds_per_record"], seconds / records)
+                state["bytes_per_record"] = self._average(state["bytes_per_record"], size / records)
+
+            target = state["cap"] or self.max_limit
+            if state["seconds_per_record"]:
+                target = min(target, self.target_seconds / state["seconds_per_record"])
+            if state["bytes_per_record"]:
+                target = min(target, self.max_bytes / state["bytes_per_record"])
+            limit = self._size(target, state["cap"])
+            if limit > state["limit"]:
+                # growing only pays off while pages are full, and only one step at a time; pages too small to
+                # measure (e.g. probes for a single record) do not count
+                if not metadata.get('next') or records < self.min_records:
+                    limit = state["limit"]
+                else:
+                    limit = self.sizes[min(self.sizes.index(state["limit"]) + 1, len(self.sizes) - 1)] \
+                        if state["limit"] in self.sizes else limit
+            state["limit"] = limit
+
+    def failed(self, url):
+        """
+        Halves the page size of the endpoint of ``url`` after a request timed out or the server failed.
+        """
+        endpoint = endpoint_template(url)
+        with self._lock:
+            if endpoint not in self._endpoints and 'limit' not in dict(parse_qsl(urlsplit(url).query)):
+                # not a paginated request
+                return
+            state = self._state(endpoint)
+            state["limit"] = self._size(state["limit"] // 2, state["cap"])
+
+    def state(self):
+        """
+        Returns the tuned sizes and estimates per endpoint template, JSON serializable.
+        """
+        with self._lock:
+            return {endpoint: dict(values) for endpoint, values in self._endpoints.items()}
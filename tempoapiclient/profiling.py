@@ -0,0 +1,314 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#   http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Per-page timelines of paginated calls, to tell network wait, download, JSON decoding and the consumption of
+records apart when tuning page size, ``parallel_pages`` and the codec.
+
+Every page of a profiled call records when its request was sent, when the response headers (first byte) and
+the body arrived, when the body was decoded, and when its last record was handed to the caller:
+
+    with tempo.profile() as profiler:
+        tempo.get_worklogs(dateFrom="2019-01-01", dateTo="2019-12-31", parallel_pages=4)
+
+    print(profiler.summary())
+    profiler.write_chrome_trace("worklogs.json")   # open in chrome://tracing or https://ui.perfetto.dev
+
+Pass ``profiler=PaginationProfiler()`` to the client to profile all of its calls instead.
+"""
+
+import contextvars
+import itertools
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from .instrumentation import endpoint_template
+
+_page = contextvars.ContextVar("tempoapiclient_profiled_page", default=None)
+_profiler = contextvars.ContextVar("tempoapiclient_profiler", default=None)
+
+
+def current_page():
+    """
+    Returns the ``PageTiming`` of the page being fetched by the current thread or task, or None.
+    """
+    return _page.get()
+
+
+def current_profiler():
+    """
+    Returns the profiler set with ``profiling`` for the current context, or None.
+    """
+    return _profiler.get()
+
+
+@contextmanager
+def profiling(profiler=None):
+    """
+    Profiles the paginated calls started in the current thread or task within the block.
+    :return: the ``PaginationProfiler``, a new one if none was given
+    """
+    profiler = profiler if profiler is not None else PaginationProfiler()
+    token = _profiler.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _profiler.reset(token)
+
+
+class PageTiming(object):
+    """
+    Timeline of one page, ``time.perf_counter`` values (None for the phases it did not get to).
+    ``first_byte`` is known for transports measuring ``Response.elapsed``, otherwise it equals ``body_complete``.
+    """
+
+    __slots__ = ("call", "page", "endpoint", "url", "start", "first_byte", "body_complete", "decode_done",
+                 "yielded", "records", "bytes", "retries", "_sent")
+
+    def __init__(self, call, page, endpoint):
+        self.call = call
+        self.page = page
+        self.endpoint = endpoint
+        self.url = None
+        self.start = None
+        self.first_byte = None
+        self.body_complete = None
+        self.decode_done = None
+        self.yielded = None
+        self.records = 0
+        self.bytes = 0
+        self.retries = 0
+        self._sent = None
+
+    def sent(self, url):
+        """
+        Called right before every attempt of the request is sent.
+        """
+        self._sent = time.perf_counter()
+        if self.start is None:
+            self.start = self._sent
+            self.url = url
+        else:
+            self.retries += 1
+        self.first_byte = None
+
+    def header_received(self):
+        self.first_byte = time.perf_counter()
+
+    async def trace(self, event_name, info):
+        # httpx/httpcore trace extension
+        if event_name.endswith("receive_response_headers.complete"):
+            self.header_received()
+
+    def received(self, content, elapsed=None):
+        """
+        Called once the body of the response arrived, ``elapsed`` is the time from sending to the headers.
+        """
+        self.body_complete = time.perf_counter()
+        self.bytes = len(content) if content else 0
+        if elapsed:
+            self.first_byte = min(self._sent + elapsed.total_seconds(), self.body_complete)
+        elif self.first_byte is None:
+            self.first_byte = self.body_complete
+
+    def decoded(self):
+        self.decode_done = time.perf_counter()
+
+    @property
+    def end(self):
+        return self.yielded or self.decode_done or self.body_complete or self.start
+
+    def phases(self):
+        """
+        Returns ``(name, start, end)`` of the phases the page went through.
+        """
+        points = [("wait", self.start), ("download", self.first_byte), ("decode", self.body_complete),
+                  ("consume", self.decode_done), (None, self.yielded)]
+        points = [(name, at) for name, at in points if at is not None]
+        return [(name, at, following) for (name, at), (_, following) in zip(points, points[1:])]
+
+
+class _ProfiledResults(list):
+    """
+    Records of a page, marking the page as yielded once the caller iterated past the last of them.
+    """
+
+    __slots__ = ("_timing",)
+
+    def __init__(self, records, timing):
+        super().__init__(records)
+        self._timing = timing
+
+    def __iter__(self):
+        yield from list.__iter__(self)
+        self._timing.yielded = time.perf_counter()
+
+
+class ProfiledCall(object):
+    """
+    One paginated call (``get``, ``iter_get``, ``search`` ...) of a profiled client.
+    """
+
+    def __init__(self, profiler, call_id, path):
+        self.profiler = profiler
+        self.id = call_id
+        self.endpoint = endpoint_template(path)
+        self._pages = itertools.count()
+
+    def _begin(self):
+        timing = PageTiming(self.id, next(self._pages), self.endpoint)
+        self.profiler._add(timing)
+        return timing, _page.set(timing)
+
+    @staticmethod
+    def _finish(timing, resp):
+        if timing.decode_done is None:
+            # served without a request, e.g. from a cache
+            timing.decoded()
+        if isinstance(resp, dict) and isinstance(resp.get('results'), list):
+            timing.records = len(resp['results'])
+            # the response may be shared (conditional requests, coalescing), so it is copied and not modified
+            return dict(resp, results=_ProfiledResults(resp['results'], timing))
+        timing.yielded = timing.decode_done
+        return resp
+
+    def fetch(self, fetch):
+        """
+        Returns ``fetch`` recording the page it returns.
+        """
+        def profiled(*args, **kwargs):
+            timing, token = self._begin()
+            try:
+                resp = fetch(*args, **kwargs)
+            finally:
+                _page.reset(token)
+            return self._finish(timing, resp)
+
+        return profiled
+
+    def afetch(self, fetch):
+        """
+        Same as ``fetch`` for coroutine functions.
+        """
+        async def profiled(*args, **kwargs):
+            timing, token = self._begin()
+            try:
+                resp = await fetch(*args, **kwargs)
+            finally:
+                _page.reset(token)
+            return self._finish(timing, resp)
+
+        return profiled
+
+
+def profiled(call, fetch):
+    """
+    Returns ``fetch`` recorded by ``call``, or ``fetch`` itself if the call is not profiled.
+    """
+    return fetch if call is None else call.fetch(fetch)
+
+
+def aprofiled(call, fetch):
+    return fetch if call is None else call.afetch(fetch)
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+
+class PaginationProfiler(object):
+    """
+    Collects the ``PageTiming`` of the pages of profiled calls. Thread safe.
+    """
+
+    PHASES = ("wait", "download", "decode", "consume")
+
+    def __init__(self):
+        self.pages = []
+        self._calls = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def call(self, path):
+        return ProfiledCall(self, next(self._calls), path)
+
+    def _add(self, timing):
+        with self._lock:
+            self.pages.append(timing)
+
+    def clear(self):
+        with self._lock:
+            self.pages = []
+
+    def _started(self):
+        with self._lock:
+            return [page for page in self.pages if page.start is not None]
+
+    def summary(self):
+        """
+        Returns totals over all pages: ``calls``, ``pages``, ``records``, ``bytes`` and ``retries``; ``seconds``
+        from the first request to the last record; the seconds spent per phase (``wait`` for the first byte,
+        ``download`` of the body, ``decode`` of the JSON, ``consume`` until the caller took the last record);
+        ``page_p50``/``page_p95`` seconds from request to decoded page; and ``concurrency``, the average number
+        of pages in flight.
+        """
+        pages = self._started()
+        summary = {"calls": len({page.call for page in pages}), "pages": len(pages),
+                   "records": sum(page.records for page in pages), "bytes": sum(page.bytes for page in pages),
+                   "retries": sum(page.retries for page in pages), "seconds": 0.0}
+        summary.update((phase, 0.0) for phase in self.PHASES)
+        if not pages:
+            summary.update(page_p50=0.0, page_p95=0.0, concurrency=0.0)
+            return summary
+
+        for page in pages:
+            for name, start, end in page.phases():
+                summary[name] += end - start
+        fetches = [page.decode_done - page.start for page in pages if page.decode_done is not None]
+        seconds = max(page.end for page in pages) - min(page.start for page in pages)
+        summary.update(seconds=seconds, page_p50=_percentile(fetches, 0.5), page_p95=_percentile(fetches, 0.95),
+                       concurrency=sum(fetches) / seconds if seconds else 0.0)
+        return summary
+
+    def chrome_trace(self):
+        """
+        Returns the timeline in Chrome's trace event format: one process per call, one thread per page in
+        flight at the same time, and one event per phase of a page.
+        """
+        pages = sorted(self._started(), key=lambda page: page.start)
+        if not pages:
+            return {"traceEvents": [], "displayTimeUnit": "ms"}
+        origin = pages[0].start
+        events, lanes, names = [], {}, {}
+        for page in pages:
+            names[page.call] = page.endpoint
+            # pages overlapping in time get their own lanes
+            call_lanes = lanes.setdefault(page.call, [])
+            lane = next((n for n, free_at in enumerate(call_lanes) if free_at <= page.start), len(call_lanes))
+            if lane == len(call_lanes):
+                call_lanes.append(0.0)
+            call_lanes[lane] = page.end
+            for name, start, end in page.phases():
+                events.append({"name": name, "cat": "page", "ph": "X", "pid": page.call, "tid": lane,
+                               "ts": (start - origin) * 1e6, "dur": (end - start) * 1e6,
+                               "args": {"page": page.page, "url": page.url, "records": page.records,
+                                        "bytes": page.bytes, "retries": page.retries}})
+        for call, endpoint in names.items():
+            events.append({"name": "process_name", "ph": "M", "pid": call,
+                           "args": {"name": "{} #{}".format(endpoint, call)}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path):
+        with open(path, "w") as fh:
+            json.dump(self.chrome_trace(), fh)
@@ -0,0 +1,147 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#   http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Client side rate limiting and retrying of throttled or failed requests.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+
+class TokenBucket(object):
+    """
+    Token bucket shared by all threads (and tasks) sending requests through one client.
+
+    Every request takes one token, tokens are refilled at ``rate`` per second up to ``capacity``.
+    When the server answers ``429 Too Many Requests`` the bucket is paused for the ``Retry-After`` period,
+    so all requests wait, not only the throttled one.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        """
+        :param rate: requests per second allowed for the tenant
+        :param capacity: maximum burst, defaults to ``rate``
+        :param clock: function returning the current time in seconds
+        :param sleep: function used by ``acquire`` to wait
+        """
+        self._rate = float(rate)
+        self._capacity = float(capacity or rate)
+        self._tokens = self._capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def reserve(self, tokens=1):
+        """
+        Takes ``tokens`` and returns the number of seconds to wait before the request may be sent.
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self._rate, self._paused_until - now)
+
+    def acquire(self, tokens=1):
+        """
+        Blocks until ``tokens`` are available.
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            self._sleep(wait)
+
+    def pause(self, seconds):
+        """
+        Stops handing out tokens for ``seconds``.
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens = min(self._tokens, 0.0)
+            self._paused_until = max(self._paused_until, now + seconds)
+
+
+class RetryPolicy(object):
+    """
+    Decides whether a response is retried and how long to wait before.
+
+    ``429 Too Many Requests`` is retried for every method, since the request was not processed.
+    Server errors are retried only for idempotent methods and for the read-only ``POST .../search`` endpoints
+    (e.g. ``/worklogs/search``, ``/plans/search``), which page like a GET. The wait honours ``Retry-After`` and
+    otherwise grows exponentially with full jitter: ``uniform(0, min(max_backoff, backoff_factor * 2 ** attempt))``.
+    """
+
+    IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+
+    def __init__(self, max_retries=5, backoff_factor=0.5, max_backoff=60.0, statuses=(429, 500, 502, 503, 504),
+                 respect_retry_after=True):
+        """
+        :param max_retries: maximum number of retries of one request
+        :param backoff_factor: base of the exponential backoff in seconds
+        :param max_backoff: upper bound of one wait in seconds
+        :param statuses: HTTP status codes which are retried
+        :param respect_retry_after: wait as long as the ``Retry-After`` header asks for
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.respect_retry_after = respect_retry_after
+
+    def is_retry(self, method, status_code, attempt, path=None):
+        """
+        Returns True if a response with ``status_code`` to the ``attempt``-th retry (0 for the first request)
+        should be retried.
+        :param path: OPTIONAL: path or URL of the request, tells searches from other POSTs
+        """
+        if attempt >= self.max_retries or status_code not in self.statuses:
+            return False
+        if status_code == 429 or method.upper() in self.IDEMPOTENT_METHODS:
+            return True
+        return method.upper() == "POST" and path is not None and urlsplit(path).path.rstrip("/").endswith("/search")
+
+    @staticmethod
+    def retry_after(headers):
+        """
+        Returns the ``Retry-After`` header (seconds or HTTP date) in seconds, or None.
+        """
+        value = headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def delay(self, attempt, headers=None):
+        """
+        Returns the number of seconds to wait before the ``attempt``-th retry.
+        """
+        if self.respect_retry_after and headers is not None:
+            retry_after = self.retry_after(headers)
+            if retry_after is not None:
+                return retry_after
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
@@ -1,25 +1,80 @@
 # coding=utf-8
 import logging
-import requests
+import time
 from requests.exceptions import HTTPError
-from json import dumps
 from urllib.parse import urlencode
 
-log = logging.getLogger()
+from .cache import ValidatorStore
+from .codec import get_codec
+from .instrumentation import Instrumentation
+from .profiling import current_page
+from .singleflight import SingleFlight
+from .transport import RequestsTransport
+
+log = logging.getLogger(__name__)
+
+
+class TempoError(Exception):
+    """
+    Raised by ``client_v4_async.AsyncTempo`` for a failed request, where ``SystemExit`` would stop the event loop.
+    ``args[0]`` is the error the request failed with, as for the ``SystemExit`` raised by the other clients.
+    """
+
+    @property
+    def status_code(self):
+        return status_code(self)
+
+
+def status_code(error):
+    """
+    Returns the HTTP status of the ``SystemExit`` or ``TempoError`` raised for a failed request, or None.
+    """
+    cause = error.args[0] if getattr(error, "args", None) else None
+    response = getattr(cause, "response", None)
+    return getattr(response, "status_code", None)
 
 
 class RestAPIClient(object):
     default_headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
     response = None
 
-    def __init__(self, url="", auth_token=None, timeout=None, verify_ssl=None, proxies=None, advanced_mode=None):
+    def __init__(self, url="", auth_token=None, timeout=None, verify_ssl=None, proxies=None, advanced_mode=None,
+                 conditional_requests=None, rate_limiter=None, retry=None, transport_config=None, transport=None,
+                 codec=None, coalesce_requests=None, instrumentation=None):
+        """
+        :param conditional_requests: OPTIONAL: True or a ``cache.ValidatorStore`` to send conditional GET requests
+            (``If-None-Match``/``If-Modified-Since``) and serve the stored payload on ``304 Not Modified``
+        :param rate_limiter: OPTIONAL: ``ratelimit.TokenBucket`` shared by all requests of this client
+        :param retry: OPTIONAL: ``ratelimit.RetryPolicy`` for throttled (429) and failed (5xx) responses
+        :param transport_config: OPTIONAL: ``transport.TransportConfig`` with pooling, keep-alive, TCP options and
+            connect/read timeouts (used when ``timeout`` is not given)
+        :param transport: OPTIONAL: ``transport.Transport`` sending the requests, defaults to a
+            ``transport.RequestsTransport`` configured with ``transport_config``
+        :param codec: OPTIONAL: JSON codec, "orjson", "msgspec" or "json" (see ``codec.get_codec``), defaults to
+            the fastest one installed
+        :param coalesce_requests: OPTIONAL: True or a ``singleflight.SingleFlight`` to let identical GET requests
+            running at the same time share one HTTP request and its decoded (read-only) result
+        :param instrumentation: OPTIONAL: True or an ``instrumentation.Instrumentation`` recording request hooks and
+            metrics (latency per endpoint, bytes, retries, decode time, pages, cache hits)
+        """
         self._url = url
         self._auth_token = auth_token
-        self._timeout = timeout
+        self._timeout = timeout if timeout is not None or transport_config is None else transport_config.timeout
         self._verify_ssl = verify_ssl
         self._proxies = proxies
         self._advanced_mode = advanced_mode
-        self._session = requests.Session()
+        if conditional_requests is True:
+            conditional_requests = ValidatorStore()
+        # an empty ValidatorStore is falsy
+        self._validators = conditional_requests if conditional_requests is not False else None
+        self._rate_limiter = rate_limiter
+        self._retry = retry
+        self._codec = get_codec(codec)
+        self._single_flight = SingleFlight() if coalesce_requests is True else coalesce_requests or None
+        self._instrumentation = Instrumentation() if instrumentation is True else instrumentation or None
+        self._transport = transport if transport is not None else RequestsTransport(config=transport_config)
+        # kept for code which used the session of the default transport directly
+        self._session = getattr(self._transport, "session", None)
         self._update_header("Authorization", "Bearer {}".format(auth_token))
 
     def __enter__(self):
@@ -35,7 +90,7 @@ class RestAPIClient(object):
         :param value:
         :return:
         """
-        self._session.headers.update({key: value})
+        self._transport.headers.update({key: value})
 
     def _response_handler(self, response):
 
@@ -45,7 +100,19 @@ class RestAPIClient(object):
         try:
             # If the response was successful, no Exception will be raised
             response.raise_for_status()
-            return response.json() if response.content else {}
+            if not response.content:
+                payload = {}
+            elif self._instrumentation is None:
+                # decoded straight from the received bytes, without decoding them to text first
+                payload = self._codec.loads(response.content)
+            else:
+                start = time.perf_counter()
+                payload = self._codec.loads(response.content)
+                self._instrumentation.decoded(response.request.method, str(response.url), time.perf_counter() - start)
+            page = current_page()
+            if page is not None:
+                page.decoded()
+            return payload
 
         except HTTPError as http_err:
             log.error(f'HTTP error occurred: {http_err.response.text}')
@@ -64,7 +131,32 @@ class RestAPIClient(object):
         return url_link
 
     def close(self):
-        return self._session.close()
+        return self._transport.close()
+
+    def _retry_delay(self, method, path, status_code, response_headers, attempt):
+        delay = self._retry.delay(attempt, response_headers)
+        log.warning("HTTP: %s %s -> %s, retrying in %.2fs (retry %s of %s)", method, path, status_code, delay,
+                    attempt + 1, self._retry.max_retries)
+        # a throttled request holds back all requests sharing the rate limiter, not only this one
+        if status_code == 429 and self._rate_limiter is not None:
+            self._rate_limiter.pause(delay)
+            return 0
+        return delay
+
+    def _wait_before_retry(self, method, path, status_code, response_headers, attempt):
+        delay = self._retry_delay(method, path, status_code, response_headers, attempt)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _build_url(self, path, flags=None, params=None, trailing=None):
+        url = self.url_joiner(self._url, path, trailing)
+        if params or flags:
+            url += '?'
+        if params:
+            url += urlencode(params or {})
+        if flags:
+            url += ('&' if params else '') + '&'.join(flags or [])
+        return url
 
     def _request(self, method='GET', path='/', data=None, json=None, flags=None, params=None, headers=None,
                  files=None, trailing=None):
@@ -81,33 +173,52 @@ class RestAPIClient(object):
         :param trailing: bool
         :return:
         """
-        url = self.url_joiner(self._url, path, trailing)
-        if params or flags:
-            url += '?'
-        if params:
-            url += urlencode(params or {})
-        if flags:
-            url += ('&' if params else '') + '&'.join(flags or [])
+        url = self._build_url(path, flags=flags, params=params, trailing=trailing)
         json_dump = None
         if files is None:
-            data = None if not data else dumps(data)
-            json_dump = None if not json else dumps(json)
+            # bodies which are already serialized (e.g. reused for every page of a search) are sent as they are
+            data = None if not data else data if isinstance(data, (str, bytes)) else self._codec.dumps(data)
+            json_dump = None if not json else self._codec.dumps(json)
 
         headers = headers or self.default_headers
-        response = self._session.request(
-            method=method,
-            url=url,
-            headers=headers,
-            data=data,
-            json=json,
-            timeout=self._timeout,
-            verify=self._verify_ssl,
-            files=files,
-            proxies=self._proxies
-        )
+        instrumentation = self._instrumentation
+        event = None if instrumentation is None else instrumentation.request_started(method, url, data or json_dump)
+        page = current_page()
+        attempt = 0
+        try:
+            while True:
+                if self._rate_limiter is not None:
+                    self._rate_limiter.acquire()
+                if page is not None:
+                    page.sent(url)
+                response = self._transport.request(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    data=data,
+                    json=json,
+                    timeout=self._timeout,
+                    verify=self._verify_ssl,
+                    files=files,
+                    proxies=self._proxies
+                )
+                if page is not None:
+                    page.received(response.content, response.elapsed)
+                if self._retry is None or not self._retry.is_retry(method, response.status_code, attempt, url):
+                    break
+                if event is not None:
+                    instrumentation.request_retried(event, response.status_code)
+                self._wait_before_retry(method, path, response.status_code, response.headers, attempt)
+                attempt += 1
+        except Exception as e:
+            if event is not None:
+                instrumentation.request_failed(event, e)
+            raise
         response.encoding = 'utf-8'
+        if event is not None:
+            instrumentation.request_finished(event, response.status_code, response.content)
 
-        log.debug("HTTP: {} {} -> {} {}".format(method, path, response.status_code, response.reason))
+        log.debug("HTTP: %s %s -> %s %s", method, path, response.status_code, response.reason)
         return response
 
     def get(self, path, data=None, flags=None, params=None, headers=None, not_json_response=None, trailing=None):
@@ -122,10 +233,42 @@ class RestAPIClient(object):
         :param trailing: OPTIONAL: for wrap slash symbol in the end of string
         :return:
         """
-        response = self._request('GET', path=path, flags=flags, params=params, data=data, headers=headers,
-                                 trailing=trailing)
+        if self._single_flight is None or self._advanced_mode:
+            return self._get(path, data=data, flags=flags, params=params, headers=headers, trailing=trailing)
 
-        return self._response_handler(response)
+        key = self._single_flight.key('GET', self._build_url(path, flags=flags, params=params, trailing=trailing),
+                                      data, headers)
+        return self._single_flight.do(key, lambda: self._get(path, data=data, flags=flags, params=params,
+                                                             headers=headers, trailing=trailing))
+
+    def _get(self, path, data=None, flags=None, params=None, headers=None, trailing=None):
+        if self._validators is None or self._advanced_mode:
+            response = self._request('GET', path=path, flags=flags, params=params, data=data, headers=headers,
+                                     trailing=trailing)
+            return self._response_handler(response)
+
+        url = self._build_url(path, flags=flags, params=params, trailing=trailing)
+        conditional_headers = self._validators.headers(url)
+        response = self._request('GET', path=path, flags=flags, params=params, data=data,
+                                 headers=dict(headers or self.default_headers, **conditional_headers)
+                                 if conditional_headers else headers, trailing=trailing)
+
+        if response.status_code == 304:
+            stored, payload = self._validators.get(url)
+            if stored:
+                if self._instrumentation is not None:
+                    self._instrumentation.cache_lookup(path, True, cache="conditional")
+                return payload
+            # the payload was evicted after the request was sent, the 304 has nothing to be served from
+            response = self._request('GET', path=path, flags=flags, params=params, data=data, headers=headers,
+                                     trailing=trailing)
+
+        if self._instrumentation is not None and conditional_headers:
+            self._instrumentation.cache_lookup(path, False, cache="conditional")
+
+        payload = self._response_handler(response)
+        self._validators.set(url, response.headers, payload)
+        return payload
 
     def post(self, path, data=None, json=None, headers=None, files=None, params=None, trailing=None):
         headers = self.default_headers
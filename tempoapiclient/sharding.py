@@ -0,0 +1,164 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#   http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Splitting of large date range queries into sub-ranges (shards) which are fetched concurrently.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from .rest_client import TempoError, status_code
+from .transport import TRANSPORT_ERRORS
+
+log = logging.getLogger(__name__)
+
+PERIODS = ("day", "week", "month", "year")
+
+
+def _period_end(start, period):
+    if period == "day":
+        return start
+    if period == "week":
+        return start + timedelta(days=6 - start.weekday())
+    if period == "month":
+        next_month = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return next_month - timedelta(days=1)
+    if period == "year":
+        return start.replace(month=12, day=31)
+    raise ValueError(f"Unknown shard period '{period}', use one of {', '.join(PERIODS)}")
+
+
+def split_date_range(dateFrom, dateTo, period="month"):
+    """
+    Splits the inclusive date range into consecutive sub-ranges aligned to calendar periods.
+    :param dateFrom: first day of the range
+    :param dateTo: last day of the range
+    :param period: "day", "week" (Monday to Sunday), "month" or "year"
+    :return: list of ``(dateFrom, dateTo)`` tuples
+    """
+    shards = []
+    start = dateFrom
+    while start <= dateTo:
+        end = min(_period_end(start, period), dateTo)
+        shards.append((start, end))
+        start = end + timedelta(days=1)
+    return shards
+
+
+def halve_date_range(dateFrom, dateTo):
+    """
+    Splits the inclusive date range into two halves.
+    """
+    middle = dateFrom + timedelta(days=(dateTo - dateFrom).days // 2)
+    return [(dateFrom, middle), (middle + timedelta(days=1), dateTo)]
+
+
+def is_transient(error):
+    """
+    Returns True for errors a retry may get past: lost connections, timeouts, 429 and server errors.
+    """
+    if isinstance(error, TRANSPORT_ERRORS):
+        return True
+    status = status_code(error) if isinstance(error, (SystemExit, TempoError)) else None
+    return status is not None and (status == 429 or status >= 500)
+
+
+def _fetch_shard(fetch_shard, shard, retries):
+    attempt = 0
+    while True:
+        try:
+            return fetch_shard(shard[0], shard[1], shard[0] < shard[1])
+        except (Exception, SystemExit) as err:
+            if attempt >= retries or not is_transient(err):
+                raise
+            attempt += 1
+            log.warning("Retrying shard %s..%s (attempt %s) after error: %s", shard[0], shard[1], attempt, err)
+
+
+def fetch_sharded(fetch_shard, dateFrom, dateTo, period="month", max_workers=4, retries=2):
+    """
+    Fetches the date range shard by shard with bounded concurrency and merges the results in date order.
+    :param fetch_shard: callable taking ``dateFrom``, ``dateTo`` and ``splittable``; it returns the records
+        of the shard, or None if the shard is too large and should be split into halves (only when splittable)
+    :param dateFrom: first day of the range
+    :param dateTo: last day of the range
+    :param period: initial shard size, see ``split_date_range``
+    :param max_workers: number of shards fetched at the same time
+    :param retries: number of times a shard failing with a transient error (see ``is_transient``) is retried
+        on its own before the error is raised, the shards which did not start yet are cancelled
+    """
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(_fetch_shard, fetch_shard, shard, retries): shard
+                   for shard in split_date_range(dateFrom, dateTo, period)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                shard = pending.pop(future)
+                try:
+                    records = future.result()
+                except BaseException:
+                    # leaving the executor waits for every submitted shard, including the queued ones
+                    for other in pending:
+                        other.cancel()
+                    raise
+                if records is None:
+                    for half in halve_date_range(*shard):
+                        pending[executor.submit(_fetch_shard, fetch_shard, half, retries)] = half
+                else:
+                    results[shard[0]] = records
+
+    return [record for start in sorted(results) for record in results[start]]
+
+
+async def _afetch_shard(fetch_shard, shard, retries, semaphore):
+    attempt = 0
+    while True:
+        try:
+            async with semaphore:
+                records = await fetch_shard(shard[0], shard[1], shard[0] < shard[1])
+        except (Exception, SystemExit) as err:
+            if attempt >= retries or not is_transient(err):
+                raise
+            attempt += 1
+            log.warning("Retrying shard %s..%s (attempt %s) after error: %s", shard[0], shard[1], attempt, err)
+            continue
+
+        if records is None:
+            halves = await _gather_or_cancel([_afetch_shard(fetch_shard, half, retries, semaphore)
+                                              for half in halve_date_range(*shard)])
+            return [record for half in halves for record in half]
+        return records
+
+
+async def _gather_or_cancel(coroutines):
+    # gather leaves the other tasks running when one of them fails
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+
+async def afetch_sharded(fetch_shard, dateFrom, dateTo, period="month", max_workers=4, retries=2):
+    """
+    Asynchronous counterpart of ``fetch_sharded``, ``fetch_shard`` is a coroutine function.
+    """
+    semaphore = asyncio.Semaphore(max_workers)
+    shards = await _gather_or_cancel([_afetch_shard(fetch_shard, shard, retries, semaphore)
+                                      for shard in split_date_range(dateFrom, dateTo, period)])
+    return [record for shard in shards for record in shard]
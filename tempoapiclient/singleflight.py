@@ -0,0 +1,113 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#   http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Coalescing of identical requests in flight at the same time.
+"""
+
+import asyncio
+import threading
+
+
+class _Call(object):
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Runs one call per key at a time: callers asking for a key which is already in flight wait for that call and
+    share its result (or exception) instead of starting their own. Nothing is kept once the call is finished.
+
+    Shared results are the same objects for all waiting callers and should be treated as read-only.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+
+    @staticmethod
+    def key(method, url, data=None, headers=None):
+        """
+        Returns the key of a request, ``url`` includes the query string.
+        """
+        return method, url, repr(data), tuple(sorted((headers or {}).items()))
+
+    def do(self, key, func):
+        """
+        Returns ``func()``, or the result of the call of ``func`` for ``key`` already running in another thread.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = func()
+            return call.value
+        # SystemExit is what the client raises on HTTP errors, waiting callers get it as well
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key, func):
+        """
+        Asynchronous counterpart of ``do`` for the tasks of one event loop, ``func`` is a coroutine function.
+        """
+        while key in self._futures:
+            future = self._futures[key]
+            self.shared += 1
+            try:
+                # shielded, so a cancelled waiter does not cancel the call the others wait for
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # the caller running the call was cancelled, run it again
+
+        future = self._futures[key] = asyncio.get_running_loop().create_future()
+        try:
+            value = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        # the call runs in the caller's task rather than a task of its own, as tasks do not contain SystemExit
+        except BaseException as err:
+            future.set_exception(err)
+            # retrieved, so nobody waiting is not reported as an unhandled error
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            del self._futures[key]
@@ -0,0 +1,194 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#   http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Incremental synchronisation of Tempo worklogs into a local SQLite database.
+"""
+
+import json
+import sqlite3
+import time
+from collections import namedtuple
+from datetime import date, datetime
+
+SyncResult = namedtuple("SyncResult", ["created", "updated", "deleted"])
+
+
+class WorklogSync(object):
+    """
+    Keeps a local copy of worklogs up to date using ``updatedFrom``.
+
+    The first run for a date range downloads all of its worklogs, every following run only the worklogs
+    changed since the high-water mark stored for that range. Checkpoints are kept per exact ``(dateFrom, dateTo)``
+    pair: a range which was not synced before, even one within or overlapping a synced range, is downloaded
+    completely on its first run. Sync the same ranges every time, e.g. calendar months.
+
+    Tempo does not report deletions through ``updatedFrom`` and has no listing of worklog IDs, so with
+    ``detect_deletions`` all worklogs of the range are downloaded again and compared with the stored ones.
+    This costs as much as the first run of the range; pass ``deletion_interval`` to run that pass at most once
+    per interval. A worklog whose date was moved out of the range is not returned by the runs of the range any
+    more: it stays stored with its old date until the range it was moved to is synced or a deletion pass of the
+    old range removes it.
+
+        with WorklogSync(tempo, "worklogs.db") as sync:
+            result = sync.sync("2019-11-01", "2019-11-30")
+            worklogs = sync.get_worklogs("2019-11-01", "2019-11-30")
+    """
+
+    def __init__(self, tempo, path, parallel_pages=None):
+        """
+        :param tempo: ``client_v4.Tempo`` instance used to fetch the worklogs
+        :param path: path of the SQLite database, created if it does not exist, or an open ``sqlite3.Connection``
+            which is left open by ``close``
+        :param parallel_pages: number of pages fetched at the same time
+        """
+        self._tempo = tempo
+        self._parallel_pages = parallel_pages
+        self._owns_db = not isinstance(path, sqlite3.Connection)
+        self._db = sqlite3.connect(path) if self._owns_db else path
+        self._create_tables()
+
+    def _create_tables(self):
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS worklogs (
+                id INTEGER PRIMARY KEY,
+                start_date TEXT NOT NULL,
+                updated_at TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS worklogs_start_date ON worklogs (start_date);
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                date_from TEXT NOT NULL,
+                date_to TEXT NOT NULL,
+                updated_from TEXT,
+                PRIMARY KEY (date_from, date_to)
+            );
+            CREATE TABLE IF NOT EXISTS deletion_passes (
+                date_from TEXT NOT NULL,
+                date_to TEXT NOT NULL,
+                passed_at REAL NOT NULL,
+                PRIMARY KEY (date_from, date_to)
+            );
+        """)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        if self._owns_db:
+            self._db.close()
+
+    @staticmethod
+    def _isoformat(value):
+        if isinstance(value, datetime):
+            return value.date().isoformat()
+        if isinstance(value, date):
+            return value.isoformat()
+        return value
+
+    def checkpoint(self, dateFrom, dateTo):
+        """
+        Returns the high-water mark (the latest ``updatedAt`` seen) stored for the date range, or None.
+        """
+        row = self._db.execute("SELECT updated_from FROM checkpoints WHERE date_from = ? AND date_to = ?",
+                               (self._isoformat(dateFrom), self._isoformat(dateTo))).fetchone()
+        return row[0] if row else None
+
+    def _set_checkpoint(self, date_from, date_to, updated_from):
+        self._db.execute("INSERT OR REPLACE INTO checkpoints (date_from, date_to, updated_from) VALUES (?, ?, ?)",
+                         (date_from, date_to, updated_from))
+
+    def reset(self, dateFrom, dateTo):
+        """
+        Forgets the checkpoint of the date range, so the next run downloads it completely.
+        """
+        with self._db:
+            self._db.execute("DELETE FROM checkpoints WHERE date_from = ? AND date_to = ?",
+                             (self._isoformat(dateFrom), self._isoformat(dateTo)))
+
+    def _deletion_pass_due(self, date_from, date_to, deletion_interval):
+        if deletion_interval is None:
+            return True
+        row = self._db.execute("SELECT passed_at FROM deletion_passes WHERE date_from = ? AND date_to = ?",
+                               (date_from, date_to)).fetchone()
+        return row is None or row[0] + deletion_interval <= time.time()
+
+    def sync(self, dateFrom, dateTo, detect_deletions=False, deletion_interval=None):
+        """
+        Fetches the worklogs of the date range changed since the last run and merges them into the local copy.
+        :param dateFrom:
+        :param dateTo:
+        :param detect_deletions: also download all worklogs of the range again to find worklogs deleted in Tempo
+        :param deletion_interval: OPTIONAL: seconds, skip the deletion pass if the last one of the range is
+            more recent
+        :return: ``SyncResult`` with the IDs of created, updated and deleted worklogs
+        """
+        date_from, date_to = self._isoformat(dateFrom), self._isoformat(dateTo)
+        updated_from = self.checkpoint(date_from, date_to)
+
+        # updatedFrom has a granularity of days, worklogs of the last day are fetched again and merged idempotently
+        worklogs = self._tempo.iter_worklogs(date_from, date_to,
+                                             updatedFrom=updated_from[:10] if updated_from else None,
+                                             parallel_pages=self._parallel_pages)
+
+        known = self._known(date_from, date_to)
+        created, updated = [], []
+        high_water_mark = updated_from
+        with self._db:
+            for worklog in worklogs:
+                worklog_id = worklog["tempoWorklogId"]
+                updated_at = worklog.get("updatedAt")
+                if worklog_id not in known:
+                    created.append(worklog_id)
+                elif known[worklog_id] != updated_at:
+                    updated.append(worklog_id)
+                else:
+                    continue
+                self._store(worklog)
+                if updated_at and (high_water_mark is None or updated_at > high_water_mark):
+                    high_water_mark = updated_at
+
+            deleted = []
+            if detect_deletions and self._deletion_pass_due(date_from, date_to, deletion_interval):
+                present = {worklog["tempoWorklogId"] for worklog in
+                           self._tempo.iter_worklogs(date_from, date_to, parallel_pages=self._parallel_pages)}
+                deleted = sorted((set(known) | set(created)) - present)
+                self._db.executemany("DELETE FROM worklogs WHERE id = ?", [(i,) for i in deleted])
+                self._db.execute("INSERT OR REPLACE INTO deletion_passes (date_from, date_to, passed_at) "
+                                 "VALUES (?, ?, ?)", (date_from, date_to, time.time()))
+
+            self._set_checkpoint(date_from, date_to, high_water_mark)
+
+        return SyncResult(created, updated, deleted)
+
+    def _known(self, date_from, date_to):
+        """
+        Returns the ``updatedAt`` of the stored worklogs of the date range by their IDs.
+        """
+        return dict(self._db.execute("SELECT id, updated_at FROM worklogs WHERE start_date BETWEEN ? AND ?",
+                                     (date_from, date_to)))
+
+    def _store(self, worklog):
+        self._db.execute("INSERT OR REPLACE INTO worklogs (id, start_date, updated_at, data) VALUES (?, ?, ?, ?)",
+                         (worklog["tempoWorklogId"], worklog["startDate"], worklog.get("updatedAt"),
+                          json.dumps(worklog)))
+
+    def get_worklogs(self, dateFrom, dateTo):
+        """
+        Returns the locally stored worklogs of the date range, ordered by date.
+        """
+        rows = self._db.execute("SELECT data FROM worklogs WHERE start_date BETWEEN ? AND ? ORDER BY start_date, id",
+                                (self._isoformat(dateFrom), self._isoformat(dateTo)))
+        return [json.loads(row[0]) for row in rows]
@@ -0,0 +1,332 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#   http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+HTTP engines (transports) the clients send requests through, and the configuration of their connections.
+"""
+
+import json as jsonlib
+import socket
+from abc import ABC, abstractmethod
+import threading
+import time
+from datetime import timedelta
+from http.client import responses
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.connection import HTTPConnection
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+
+# raised by the transports when a request timed out
+TIMEOUT_ERRORS = (requests.exceptions.Timeout,) + ((httpx.TimeoutException,) if httpx is not None else ())
+# raised by the transports when a request failed without a response, e.g. lost connections and timeouts
+TRANSPORT_ERRORS = (requests.exceptions.RequestException,) + ((httpx.TransportError,) if httpx is not None else ())
+
+
+class TransportConfig(object):
+    """
+    Connection pooling, keep-alive, TCP and timeout settings of a client.
+
+        tempo = Tempo(auth_token="<your_tempo_api_key>",
+                      transport_config=TransportConfig(pool_maxsize=32, connect_timeout=3.05, read_timeout=60))
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False, max_retries=0, keep_alive=True,
+                 tcp_nodelay=True, tcp_keepalive=False, tcp_keepidle=60, tcp_keepintvl=10, tcp_keepcnt=6,
+                 connect_timeout=None, read_timeout=None):
+        """
+        :param pool_connections: number of hosts connection pools are kept for
+        :param pool_maxsize: number of connections kept open per host, set it to the number of concurrent requests
+        :param pool_block: wait for a free connection instead of opening (and discarding) extra connections
+        :param max_retries: retries of failed connection attempts (DNS lookups, refused connections)
+        :param keep_alive: reuse connections between requests, False sends ``Connection: close``
+        :param tcp_nodelay: disable Nagle's algorithm
+        :param tcp_keepalive: send TCP keep-alive probes on idle pooled connections
+        :param tcp_keepidle: seconds of idleness before the first keep-alive probe
+        :param tcp_keepintvl: seconds between keep-alive probes
+        :param tcp_keepcnt: number of unanswered probes before the connection is dropped
+        :param connect_timeout: seconds to wait for a connection to be established
+        :param read_timeout: seconds to wait for the server between bytes of the response
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.max_retries = max_retries
+        self.keep_alive = keep_alive
+        self.tcp_nodelay = tcp_nodelay
+        self.tcp_keepalive = tcp_keepalive
+        self.tcp_keepidle = tcp_keepidle
+        self.tcp_keepintvl = tcp_keepintvl
+        self.tcp_keepcnt = tcp_keepcnt
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+    @property
+    def timeout(self):
+        """
+        Timeout as accepted by requests: None, or a ``(connect, read)`` tuple.
+        """
+        if self.connect_timeout is None and self.read_timeout is None:
+            return None
+        return self.connect_timeout, self.read_timeout
+
+    def socket_options(self):
+        """
+        Returns the socket options set on every new connection.
+        """
+        options = [option for option in HTTPConnection.default_socket_options
+                   if option[:2] != (socket.IPPROTO_TCP, socket.TCP_NODELAY)]
+        options.append((socket.IPPROTO_TCP, socket.TCP_NODELAY, int(self.tcp_nodelay)))
+        if self.tcp_keepalive:
+            options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+            # not every platform allows tuning the probes
+            for name, value in (("TCP_KEEPIDLE", self.tcp_keepidle), ("TCP_KEEPINTVL", self.tcp_keepintvl),
+                                ("TCP_KEEPCNT", self.tcp_keepcnt)):
+                if hasattr(socket, name):
+                    options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+        return options
+
+    def mount(self, session):
+        """
+        Applies the configuration to a ``requests.Session``.
+        """
+        adapter = _SocketOptionsAdapter(socket_options=self.socket_options(), pool_connections=self.pool_connections,
+                                        pool_maxsize=self.pool_maxsize, pool_block=self.pool_block,
+                                        max_retries=self.max_retries)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+
+
+class _SocketOptionsAdapter(HTTPAdapter):
+    """
+    HTTPAdapter passing socket options to the connection pools it creates.
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["_socket_options"]
+
+    def __init__(self, socket_options=None, **kwargs):
+        # must be set before HTTPAdapter.__init__, which creates the pool manager
+        self._socket_options = socket_options
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self._socket_options is not None:
+            kwargs["socket_options"] = self._socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+
+def build_response(method, url, status_code=200, content=b"", headers=None, reason=None, elapsed=None):
+    """
+    Returns a ``requests.Response``, the response type ``RestAPIClient`` works with, for any transport.
+    :param elapsed: OPTIONAL: ``timedelta`` from sending the request to receiving the response headers
+    """
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = reason if reason is not None else responses.get(status_code, "")
+    response.headers = CaseInsensitiveDict(headers or {})
+    response._content = content
+    response.url = url
+    if elapsed is not None:
+        response.elapsed = elapsed
+    response.request = requests.Request(method, url).prepare()
+    return response
+
+
+class Transport(ABC):
+    """
+    Interface of the HTTP engines ``RestAPIClient`` sends its requests through.
+
+    ``headers`` holds the headers sent with every request (e.g. ``Authorization``), ``request`` sends one
+    request and returns a ``requests.Response`` (see ``build_response``).
+    """
+
+    headers = None
+
+    @abstractmethod
+    def request(self, method, url, headers=None, data=None, json=None, files=None, timeout=None, verify=None,
+                proxies=None):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class RequestsTransport(Transport):
+    """
+    Transport on top of a pooled ``requests.Session`` (HTTP/1.1), the default.
+    """
+
+    def __init__(self, session=None, config=None):
+        """
+        :param session: OPTIONAL: ``requests.Session`` to use, a new one is created otherwise
+        :param config: OPTIONAL: ``TransportConfig`` applied to the session
+        """
+        self.session = session or requests.Session()
+        if config is not None:
+            config.mount(self.session)
+        self.headers = self.session.headers
+
+    def request(self, method, url, headers=None, data=None, json=None, files=None, timeout=None, verify=None,
+                proxies=None):
+        return self.session.request(method=method, url=url, headers=headers, data=data, json=json, files=files,
+                                    timeout=timeout, verify=verify, proxies=proxies)
+
+    def close(self):
+        self.session.close()
+
+
+class HTTPXTransport(Transport):
+    """
+    Transport on top of ``httpx.Client``, which multiplexes concurrent requests over one HTTP/2 connection
+    (requires ``pip install tempo-api-python-client[http2]``).
+    TLS verification and proxies are settings of the connection here, per request values are ignored.
+    """
+
+    def __init__(self, http2=True, config=None, verify=True, proxy=None, client=None):
+        """
+        :param http2: negotiate HTTP/2 with the server
+        :param config: OPTIONAL: ``TransportConfig`` providing pool size, keep-alive and timeouts
+        :param verify: verify TLS certificates
+        :param proxy: OPTIONAL: proxy URL
+        :param client: OPTIONAL: ``httpx.Client`` to use instead of creating one
+        """
+        if httpx is None:
+            raise ImportError("HTTPXTransport requires httpx, install it with "
+                              "`pip install tempo-api-python-client[http2]`")
+        if client is None:
+            kwargs = {}
+            if config is not None:
+                kwargs["limits"] = httpx.Limits(max_connections=config.pool_maxsize,
+                                                max_keepalive_connections=config.pool_maxsize if config.keep_alive
+                                                else 0)
+                if config.timeout is not None:
+                    kwargs["timeout"] = httpx.Timeout(None, connect=config.connect_timeout, read=config.read_timeout)
+            client = httpx.Client(http2=http2, verify=verify, proxy=proxy, **kwargs)
+        self.client = client
+        self.headers = self.client.headers
+
+    def request(self, method, url, headers=None, data=None, json=None, files=None, timeout=None, verify=None,
+                proxies=None):
+        kwargs = {}
+        if timeout is not None:
+            kwargs["timeout"] = httpx.Timeout(None, connect=timeout[0], read=timeout[1]) \
+                if isinstance(timeout, tuple) else timeout
+        if isinstance(data, (str, bytes)):
+            kwargs["content"] = data
+        elif data is not None:
+            kwargs["data"] = data
+        start = time.perf_counter()
+        # streamed to tell the arrival of the headers from the arrival of the body, like requests does
+        with self.client.stream(method, url, headers=headers, json=json, files=files, **kwargs) as response:
+            elapsed = timedelta(seconds=time.perf_counter() - start)
+            content = response.read()
+        return build_response(method, url, response.status_code, content, response.headers,
+                              response.reason_phrase, elapsed=elapsed)
+
+    def close(self):
+        self.client.close()
+
+
+class InMemoryTransport(Transport):
+    """
+    Transport answering requests from registered responses, without any network. Used to replay recorded
+    traffic and in tests. Every request is appended to ``requests`` as ``(method, url, headers, data)``.
+
+        transport = InMemoryTransport()
+        transport.add("GET", "https://api.tempo.io/4/teams", json={"results": [], "metadata": {"count": 0}})
+        tempo = Tempo(auth_token="token", transport=transport)
+    """
+
+    def __init__(self):
+        self.headers = CaseInsensitiveDict()
+        self.requests = []
+        self._routes = []
+        self._lock = threading.Lock()
+
+    def add(self, method, url, status_code=200, json=None, content=b"", headers=None, callback=None, exact=False):
+        """
+        Registers the response to requests with ``method`` to ``url``. Routes added later take precedence.
+        :param exact: match the URL including its query string, otherwise a ``url`` without a query string
+            matches any query string
+        :param callback: OPTIONAL: callable taking ``method``, ``url``, ``headers`` and ``data`` and returning
+            ``(status_code, content, headers)``, used instead of a fixed response
+        """
+        if json is not None:
+            content = jsonlib.dumps(json).encode()
+        with self._lock:
+            self._routes.insert(0, (method.upper(), url, exact, status_code, content, headers, callback))
+
+    @staticmethod
+    def _matches(route_url, exact, url):
+        if exact or "?" in route_url:
+            return route_url == url
+        return route_url == urlsplit(url)._replace(query="").geturl()
+
+    def request(self, method, url, headers=None, data=None, json=None, files=None, timeout=None, verify=None,
+                proxies=None):
+        if json is not None:
+            data = jsonlib.dumps(json)
+        headers = dict(self.headers, **(headers or {}))
+        with self._lock:
+            self.requests.append((method, url, headers, data))
+            route = next((route for route in self._routes if route[0] == method.upper()
+                          and self._matches(route[1], route[2], url)), None)
+
+        if route is None:
+            return build_response(method, url, 404, b"", {})
+        status_code, content, response_headers, callback = route[3:]
+        if callback is not None:
+            status_code, content, response_headers = callback(method, url, headers, data)
+        return build_response(method, url, status_code, content, response_headers)
+
+
+class RecordingTransport(Transport):
+    """
+    Transport passing requests to another transport and recording the exchanged responses, which can be
+    replayed later with ``replay()``.
+    """
+
+    def __init__(self, transport):
+        self.transport = transport
+        self.headers = transport.headers
+        self.records = []
+        self._lock = threading.Lock()
+
+    def request(self, method, url, headers=None, data=None, json=None, files=None, timeout=None, verify=None,
+                proxies=None):
+        response = self.transport.request(method, url, headers=headers, data=data, json=json, files=files,
+                                          timeout=timeout, verify=verify, proxies=proxies)
+        with self._lock:
+            self.records.append((method, url, response.status_code, response.content, dict(response.headers)))
+        return response
+
+    def replay(self):
+        """
+        Returns an ``InMemoryTransport`` answering the recorded requests with the recorded responses.
+        """
+        transport = InMemoryTransport()
+        for method, url, status_code, content, headers in reversed(self.records):
+            transport.add(method, url, status_code=status_code, content=content, headers=headers, exact=True)
+        return transport
+
+    def close(self):
+        self.transport.close()
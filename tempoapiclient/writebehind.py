@@ -0,0 +1,400 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#   http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Write-behind queue for worklog mutations, spooled to a local SQLite database.
+
+Creates, updates and deletes return as soon as they are stored in the spool. A background thread sends them
+to Tempo in batches, so writes survive restarts of the process and outages of the API:
+
+    with WriteBehindQueue(tempo, "spool.db") as queue:
+        queue.create_worklog(accountId="5b10ac8d82e05b22cc7d4ef5", issueId=10001, dateFrom="2019-11-10",
+                             timeSpentSeconds=3600)
+        queue.update_worklog(1234, accountId="5b10ac8d82e05b22cc7d4ef5", dateFrom="2019-11-10",
+                             timeSpentSeconds=7200)
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from collections import namedtuple
+from datetime import date, datetime, time as dtime
+
+from .batch import run_batch
+from .idempotency import IdempotentMutations
+from .rest_client import status_code
+
+log = logging.getLogger(__name__)
+
+Mutation = namedtuple("Mutation", ["seq", "key", "op", "worklogId", "data", "attempts", "error", "sentAt"])
+
+# client errors worth retrying, any other 4xx will not succeed on a later attempt either
+_RETRYABLE_STATUS = (408, 429)
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime, dtime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class WriteBehindQueue(object):
+    """
+    Durable queue of ``create_worklog``, ``update_worklog`` and ``delete_worklog`` calls.
+
+    Mutations of the same Worklog are sent one after the other in the order they were queued, mutations of
+    different Worklogs at the same time. Updates of a Worklog waiting in the queue are coalesced: the latest
+    update replaces the earlier ones, a delete drops them. Creates are sent together through
+    ``Tempo.create_worklogs``.
+
+    A failed mutation is retried with an exponential backoff and holds back the later mutations of its Worklog.
+    Mutations rejected with a client error (4xx other than 408 and 429) are moved aside, see ``failed``.
+    Updates and deletes are delivered at least once: one sent right before the process stopped is sent again
+    after the restart, which does no harm. The time a create is first sent is stored before sending it. A create
+    sent before, by an earlier attempt or an earlier run of the process, is first looked up in Tempo with
+    ``IdempotentMutations.find_worklog`` and only sent again if no matching Worklog created since was found.
+    """
+
+    def __init__(self, tempo, path, max_workers=4, batch_size=100, flush_interval=1.0, use_bulk_endpoint=False,
+                 retry_delay=1.0, max_retry_delay=300.0, clock_skew=300.0, start=True):
+        """
+        :param tempo: ``client_v4.Tempo`` instance used to send the mutations
+        :param path: path of the SQLite spool, created if it does not exist
+        :param max_workers: number of requests running at the same time
+        :param batch_size: maximum number of mutations sent per round, a full batch wakes the worker early
+        :param flush_interval: seconds between the rounds of the background worker
+        :param use_bulk_endpoint: send creates through ``/worklogs/issue/{issueId}/bulk``
+        :param retry_delay: seconds before the first retry of a failed mutation, doubled on every failure
+        :param max_retry_delay: upper bound of the retry delay
+        :param clock_skew: seconds the clocks of the client and Tempo may differ by when looking up creates
+        :param start: start the background worker, otherwise mutations are only sent by ``flush``
+        """
+        self._tempo = tempo
+        self._max_workers = max_workers
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._use_bulk_endpoint = use_bulk_endpoint
+        self._retry_delay = retry_delay
+        self._max_retry_delay = max_retry_delay
+        self._reconciler = IdempotentMutations(tempo, clock_skew=clock_skew)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._in_flight = set()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._worker = None
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS mutations (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL,
+                op TEXT NOT NULL,
+                worklog_id TEXT,
+                data TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                not_before REAL NOT NULL DEFAULT 0,
+                sent_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS mutations_key ON mutations (key, seq);
+            CREATE TABLE IF NOT EXISTS failed_mutations (
+                seq INTEGER PRIMARY KEY,
+                key TEXT NOT NULL,
+                op TEXT NOT NULL,
+                worklog_id TEXT,
+                data TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                error TEXT
+            );
+        """)
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(mutations)")]
+        if "sent_at" not in columns:
+            # spool written by a version without it
+            self._db.execute("ALTER TABLE mutations ADD COLUMN sent_at REAL")
+        if start:
+            self.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM mutations").fetchone()[0]
+
+    def start(self):
+        """
+        Starts the background worker, mutations left in the spool by an earlier run are sent first.
+        """
+        if self._worker is not None:
+            return
+        self._stopped.clear()
+        self._worker = threading.Thread(target=self._run, name="tempo-write-behind", daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        """
+        Stops the background worker after its current round, mutations left in the spool stay there.
+        """
+        if self._worker is None:
+            return
+        self._stopped.set()
+        self._wake.set()
+        self._worker.join()
+        self._worker = None
+
+    def close(self, flush=True):
+        """
+        Stops the background worker and closes the spool.
+        :param flush: send the queued mutations before, the ones that fail stay in the spool
+        """
+        self.stop()
+        try:
+            if flush:
+                self.flush()
+        finally:
+            self._db.close()
+
+    # Queueing
+
+    def _insert(self, key, op, worklogId, data):
+        cursor = self._db.execute("INSERT INTO mutations (key, op, worklog_id, data) VALUES (?, ?, ?, ?)",
+                                  (key, op, worklogId, json.dumps(data, default=_json_default)))
+        return cursor.lastrowid
+
+    def _queued(self, seq):
+        if len(self) >= self._batch_size:
+            self._wake.set()
+        return seq
+
+    @staticmethod
+    def _arguments(**kwargs):
+        return {name: value for name, value in kwargs.items() if value is not None}
+
+    def create_worklog(self, accountId, issueId, dateFrom, timeSpentSeconds, billableSeconds=None, description=None,
+                       remainingEstimateSeconds=None, startTime=None, attributes=None):
+        """
+        Queues ``Tempo.create_worklog``.
+        :return: sequence number of the queued mutation
+        """
+        data = self._arguments(accountId=accountId, issueId=issueId, dateFrom=dateFrom,
+                               timeSpentSeconds=timeSpentSeconds, billableSeconds=billableSeconds,
+                               description=description, remainingEstimateSeconds=remainingEstimateSeconds,
+                               startTime=startTime, attributes=attributes)
+        with self._lock, self._db:
+            # every create is a Worklog of its own, it does not wait for any other mutation
+            seq = self._insert(f"create:{uuid.uuid4().hex}", "create", None, data)
+        return self._queued(seq)
+
+    def update_worklog(self, id, accountId, dateFrom, timeSpentSeconds, billableSeconds=None, description=None,
+                       remainingEstimateSeconds=None, startTime=None):
+        """
+        Queues ``Tempo.update_worklog``, replacing an update of the Worklog still waiting in the queue.
+        :return: sequence number of the queued mutation
+        """
+        key = f"worklog:{id}"
+        data = self._arguments(id=id, accountId=accountId, dateFrom=dateFrom, timeSpentSeconds=timeSpentSeconds,
+                               billableSeconds=billableSeconds, description=description,
+                               remainingEstimateSeconds=remainingEstimateSeconds, startTime=startTime)
+        with self._lock, self._db:
+            last = self._db.execute("SELECT seq, op FROM mutations WHERE key = ? ORDER BY seq DESC LIMIT 1",
+                                    (key,)).fetchone()
+            if last and last[1] == "update" and last[0] not in self._in_flight:
+                # updates replace the whole Worklog, only the latest one matters
+                self._db.execute("UPDATE mutations SET data = ? WHERE seq = ?",
+                                 (json.dumps(data, default=_json_default), last[0]))
+                seq = last[0]
+            else:
+                seq = self._insert(key, "update", str(id), data)
+        return self._queued(seq)
+
+    def delete_worklog(self, id):
+        """
+        Queues ``Tempo.delete_worklog``, dropping the updates of the Worklog still waiting in the queue.
+        :return: sequence number of the queued mutation
+        """
+        key = f"worklog:{id}"
+        with self._lock, self._db:
+            pending = self._db.execute("SELECT seq, op FROM mutations WHERE key = ? ORDER BY seq",
+                                       (key,)).fetchall()
+            # a delete makes the updates before it pointless, unless they are being sent already
+            dropped = {seq for seq, op in pending if op == "update" and seq not in self._in_flight}
+            self._db.executemany("DELETE FROM mutations WHERE seq = ?", [(seq,) for seq in dropped])
+            pending = [(seq, op) for seq, op in pending if seq not in dropped]
+            if pending and pending[-1][1] == "delete":
+                seq = pending[-1][0]
+            else:
+                seq = self._insert(key, "delete", str(id), {"id": id})
+        return self._queued(seq)
+
+    # Inspection
+
+    @staticmethod
+    def _mutation(row):
+        seq, key, op, worklogId, data, attempts, error, sentAt = row
+        return Mutation(seq, key, op, worklogId, json.loads(data), attempts, error, sentAt)
+
+    def pending(self):
+        """
+        Returns the queued ``Mutation`` tuples in the order they were queued.
+        """
+        with self._lock:
+            rows = self._db.execute("SELECT seq, key, op, worklog_id, data, attempts, error, sent_at FROM mutations "
+                                    "ORDER BY seq").fetchall()
+        return [self._mutation(row) for row in rows]
+
+    def failed(self):
+        """
+        Returns the ``Mutation`` tuples rejected by Tempo, with the error in ``error``.
+        """
+        with self._lock:
+            rows = self._db.execute("SELECT seq, key, op, worklog_id, data, attempts, error, NULL "
+                                    "FROM failed_mutations ORDER BY seq").fetchall()
+        return [self._mutation(row) for row in rows]
+
+    def requeue_failed(self):
+        """
+        Moves the rejected mutations back into the queue, e.g. after fixing what Tempo complained about.
+        :return: number of mutations requeued
+        """
+        with self._lock, self._db:
+            # requeued at the end, after the mutations queued in the meantime
+            count = self._db.execute("INSERT INTO mutations (key, op, worklog_id, data) "
+                                     "SELECT key, op, worklog_id, data FROM failed_mutations "
+                                     "ORDER BY seq").rowcount
+            self._db.execute("DELETE FROM failed_mutations")
+        self._wake.set()
+        return count
+
+    # Sending
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.flush()
+            except Exception:
+                log.exception("Write-behind round failed")
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+
+    def _ready(self, failed):
+        """
+        Claims the first queued mutation of every Worklog that is due, at most ``batch_size`` of them, except
+        the mutations in ``failed``. Creates sent for the first time are marked as sent before they are.
+        """
+        now = time.time()
+        with self._lock, self._db:
+            rows = self._db.execute("""
+                SELECT seq, key, op, worklog_id, data, attempts, error, sent_at FROM mutations
+                WHERE seq IN (SELECT MIN(seq) FROM mutations GROUP BY key) AND not_before <= ?
+                ORDER BY seq
+            """, (now,)).fetchall()
+            mutations = [self._mutation(row) for row in rows
+                         if row[0] not in self._in_flight and row[0] not in failed][:self._batch_size]
+            self._in_flight.update(mutation.seq for mutation in mutations)
+            self._db.executemany("UPDATE mutations SET sent_at = ? WHERE seq = ?",
+                                 [(now, mutation.seq) for mutation in mutations
+                                  if mutation.op == "create" and mutation.sentAt is None])
+        return mutations
+
+    def _reconcile(self, mutation):
+        """
+        Returns the Worklog created by an earlier attempt of a create, or None if it has to be sent again.
+        """
+        worklog = self._reconciler.find_worklog(mutation.sentAt, **mutation.data)
+        if worklog is not None:
+            log.info("Found Worklog %s created by an earlier attempt of %s", worklog.get("tempoWorklogId"),
+                     mutation.key)
+        return worklog
+
+    def _apply(self, mutation):
+        if mutation.op == "update":
+            return self._tempo.update_worklog(**mutation.data)
+        try:
+            return self._tempo.delete_worklog(mutation.data["id"])
+        except SystemExit as e:
+            if status_code(e) == 404:
+                # already gone
+                return None
+            raise
+
+    def _send(self, mutations):
+        creates = [mutation for mutation in mutations if mutation.op == "create" and mutation.sentAt is None]
+        others = [mutation for mutation in mutations if mutation.op != "create"]
+        results = []
+        for result in run_batch(self._reconcile, [mutation for mutation in mutations if mutation.sentAt is not None],
+                                max_workers=self._max_workers):
+            if result.ok and result.value is None:
+                creates.append(result.item)
+            else:
+                results.append((result.item, result))
+        results += zip(creates, self._tempo.create_worklogs([mutation.data for mutation in creates],
+                                                            max_workers=self._max_workers,
+                                                            use_bulk_endpoint=self._use_bulk_endpoint))
+        results += [(result.item, result) for result in run_batch(self._apply, others,
+                                                                  max_workers=self._max_workers)]
+        return results
+
+    def _done(self, results):
+        now = time.time()
+        sent = 0
+        with self._lock, self._db:
+            for mutation, result in results:
+                self._in_flight.discard(mutation.seq)
+                if result.ok:
+                    self._db.execute("DELETE FROM mutations WHERE seq = ?", (mutation.seq,))
+                    sent += 1
+                    continue
+                attempts, error = mutation.attempts + 1, repr(result.error)
+                status = status_code(result.error)
+                if status is not None and 400 <= status < 500 and status not in _RETRYABLE_STATUS:
+                    log.warning("Tempo rejected %s of %s: %s", mutation.op, mutation.key, error)
+                    self._db.execute("INSERT INTO failed_mutations (seq, key, op, worklog_id, data, attempts, error) "
+                                     "SELECT seq, key, op, worklog_id, data, ?, ? FROM mutations WHERE seq = ?",
+                                     (attempts, error, mutation.seq))
+                    self._db.execute("DELETE FROM mutations WHERE seq = ?", (mutation.seq,))
+                    continue
+                delay = min(self._retry_delay * 2 ** mutation.attempts, self._max_retry_delay)
+                self._db.execute("UPDATE mutations SET attempts = ?, error = ?, not_before = ? WHERE seq = ?",
+                                 (attempts, error, now + delay, mutation.seq))
+                if status == 429:
+                    # not processed, the create is not looked up before the next attempt unless sent before
+                    self._db.execute("UPDATE mutations SET sent_at = ? WHERE seq = ?", (mutation.sentAt, mutation.seq))
+        return sent
+
+    def flush(self):
+        """
+        Sends the queued mutations that are due, round after round, until none is left that could be sent.
+        Every mutation is tried at most once per call.
+        :return: number of mutations sent
+        """
+        sent = 0
+        failed = set()
+        with self._flush_lock:
+            while True:
+                mutations = self._ready(failed)
+                if not mutations:
+                    return sent
+                try:
+                    results = self._send(mutations)
+                except BaseException:
+                    with self._lock:
+                        self._in_flight.difference_update(mutation.seq for mutation in mutations)
+                    raise
+                sent += self._done(results)
+                failed.update(mutation.seq for mutation, result in results if not result.ok)
@@ -0,0 +1,72 @@
+from unittest import TestCase, main, skipUnless
+
+from tempoapiclient import aggregation, client_v4, columnar
+from tempoapiclient.transport import InMemoryTransport
+
+from .test_models import WORKLOG
+
+
+def _worklog(i, day, author, account=None):
+    attributes = {"values": [{"key": "_Account_", "value": account}]} if account else {}
+    return dict(WORKLOG, tempoWorklogId=i, startDate=day, author={"accountId": author}, attributes=attributes)
+
+
+WORKLOGS = [
+    _worklog(1, "2019-11-04", "alice", "ACC-1"),
+    _worklog(2, "2019-11-04", "alice", "ACC-2"),
+    _worklog(3, "2019-11-10", "bob", "ACC-1"),
+    _worklog(4, "2019-12-02", "alice", "ACC-1"),
+    _worklog(5, "2019-12-03", "bob"),
+]
+
+
+@skipUnless(columnar.numpy is not None, "numpy is not installed")
+class TestAggregation(TestCase):
+
+    def test_by_user_day(self):
+        totals = aggregation.by_user_day(WORKLOGS)
+
+        self.assertEqual(totals["authorAccountId"].tolist(), ["alice", "alice", "bob", "bob"])
+        self.assertEqual([str(day) for day in totals["day"]], ["2019-11-04", "2019-12-02", "2019-11-10", "2019-12-03"])
+        self.assertEqual(totals["timeSpentSeconds"].tolist(), [7200, 3600, 3600, 3600])
+        self.assertEqual(totals["count"].tolist(), [2, 1, 1, 1])
+
+    def test_by_account_month(self):
+        totals = aggregation.by_account_month(WORKLOGS)
+
+        self.assertEqual(totals["attribute:_Account_"].tolist(), ["ACC-1", "ACC-1", "ACC-2", None])
+        self.assertEqual([str(month) for month in totals["month"]],
+                         ["2019-11-01", "2019-12-01", "2019-11-01", "2019-12-01"])
+        self.assertEqual(totals["billableSeconds"].tolist(), [10400, 5200, 5200, 5200])
+
+    def test_weeks_start_on_monday(self):
+        totals = aggregation.aggregate(WORKLOGS, ("week",))
+
+        self.assertEqual([str(week) for week in totals["week"]], ["2019-11-04", "2019-12-02"])
+        self.assertEqual(totals["count"].tolist(), [3, 2])
+
+    def test_pivot(self):
+        columns = columnar.to_numpy(WORKLOGS, columns=("authorAccountId", "startDate", "timeSpentSeconds"))
+        table = aggregation.pivot(columns, "authorAccountId", "month")
+
+        self.assertEqual(table.index.tolist(), ["alice", "bob"])
+        self.assertEqual(table.values.tolist(), [[7200, 3600], [3600, 3600]])
+
+    def test_by_team_period(self):
+        transport = InMemoryTransport()
+        transport.add("GET", "https://api.tempo.io/4/periods",
+                      json={"periods": [{"from": "2019-11-01", "to": "2019-11-30"},
+                                        {"from": "2019-12-01", "to": "2019-12-31"}]})
+        for teamId, worklogs in ((1, WORKLOGS[:3]), (2, WORKLOGS[3:])):
+            transport.add("GET", f"https://api.tempo.io/4/worklogs/team/{teamId}",
+                          json={"results": worklogs, "metadata": {"count": len(worklogs)}})
+        tempo = client_v4.Tempo(auth_token="token", transport=transport)
+
+        totals = aggregation.by_team_period(tempo, "2019-11-01", "2019-12-31", [1, 2])
+
+        self.assertEqual(totals["teamId"].tolist(), [1, 1, 2, 2])
+        self.assertEqual(totals["timeSpentSeconds"].tolist(), [10800, 0, 0, 7200])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import json
+from unittest import IsolatedAsyncioTestCase, TestCase, main
+
+from tempoapiclient import client_v4
+from tempoapiclient.batch import afan_out, arun_batch, fan_out, run_batch
+from tempoapiclient.transport import InMemoryTransport
+
+
+def _check(item):
+    if item == 3:
+        raise SystemExit("HTTP error")
+    return item * 2
+
+
+class TestRunBatch(TestCase):
+
+    def test_results_in_input_order_with_errors(self):
+        results = run_batch(_check, range(6), max_workers=3)
+
+        self.assertEqual([r.item for r in results], list(range(6)))
+        self.assertEqual([r.value for r in results if r.ok], [0, 2, 4, 8, 10])
+        self.assertIsInstance(results[3].error, SystemExit)
+        self.assertFalse(results[3].ok)
+
+    def test_fan_out_maps_distinct_ids(self):
+        batch = fan_out(_check, [1, 3, 2, 1], max_workers=2)
+
+        self.assertEqual(batch.results, {1: 2, 2: 4})
+        self.assertEqual(list(batch.errors), [3])
+        self.assertFalse(batch.ok)
+
+    def test_client_fan_out_collects_errors_per_id(self):
+        transport = InMemoryTransport()
+        transport.add("GET", "https://api.tempo.io/4/teams/1/members", json={"results": [{"id": 1}],
+                                                                             "metadata": {"count": 1}})
+        tempo = client_v4.Tempo(auth_token="token", transport=transport)
+
+        batch = tempo.get_team_members_many([1, 2])
+
+        self.assertEqual(batch.results, {1: [{"id": 1}]})
+        self.assertIsInstance(batch.errors[2], SystemExit)
+
+
+class TestAsyncRunBatch(IsolatedAsyncioTestCase):
+
+    async def test_results_in_input_order_with_errors(self):
+        async def check(item):
+            return _check(item)
+
+        results = await arun_batch(check, range(6), max_workers=2)
+
+        self.assertEqual([r.value for r in results], [0, 2, 4, None, 8, 10])
+        self.assertIsInstance(results[3].error, SystemExit)
+
+    async def test_fan_out_maps_distinct_ids(self):
+        async def check(item):
+            return _check(item)
+
+        batch = await afan_out(check, [3, 1, 1], max_workers=2)
+
+        self.assertEqual(batch.results, {1: 2})
+        self.assertEqual(list(batch.errors), [3])
+
+
+BASE_URL = "https://api.tempo.io/4"
+AUTHOR = "5b10ac8d82e05b22cc7d4ef5"
+
+
+def _worklog(issueId, timeSpentSeconds=3600, **kwargs):
+    return dict(accountId=AUTHOR, issueId=issueId, dateFrom="2019-11-10", timeSpentSeconds=timeSpentSeconds,
+                **kwargs)
+
+
+def _bulk(method, url, headers, data):
+    # echoes the posted Worklogs with their duration as id
+    return 200, json.dumps([{"tempoWorklogId": w["timeSpentSeconds"]} for w in json.loads(data)]).encode(), {}
+
+
+class TestCreateWorklogs(TestCase):
+
+    def setUp(self):
+        self.transport = InMemoryTransport()
+        self.tempo = client_v4.Tempo(auth_token="token", transport=self.transport)
+
+    def _posted(self, path):
+        return [json.loads(data) for method, url, _, data in self.transport.requests
+                if method == "POST" and url == BASE_URL + path]
+
+    def test_one_request_per_worklog(self):
+        def create(method, url, headers, data):
+            worklog = json.loads(data)
+            if worklog["issueId"] == 2:
+                return 400, b'{"errors": []}', {}
+            return 200, json.dumps({"tempoWorklogId": worklog["timeSpentSeconds"]}).encode(), {}
+
+        self.transport.add("POST", BASE_URL + "/worklogs", callback=create)
+
+        results = self.tempo.create_worklogs([_worklog(1, 60), _worklog(2, 120), _worklog(1, 180)], max_workers=2)
+
+        self.assertEqual([r.item["timeSpentSeconds"] for r in results], [60, 120, 180])
+        self.assertEqual([r.value["tempoWorklogId"] for r in results if r.ok], [60, 180])
+        self.assertIsInstance(results[1].error, SystemExit)
+
+    def test_bulk_chunks_by_issue_in_input_order(self):
+        self.transport.add("POST", BASE_URL + "/worklogs/issue/1/bulk", callback=_bulk)
+        self.transport.add("POST", BASE_URL + "/worklogs/issue/2/bulk", callback=_bulk)
+        worklogs = [_worklog(1, 60), _worklog(2, 120), _worklog(1, 180), _worklog(1, 240)]
+
+        results = self.tempo.create_worklogs(worklogs, use_bulk_endpoint=True, bulk_size=2)
+
+        self.assertEqual([r.value["tempoWorklogId"] for r in results], [60, 120, 180, 240])
+        self.assertEqual([r.item for r in results], worklogs)
+        chunks = self._posted("/worklogs/issue/1/bulk")
+        self.assertEqual(sorted([w["timeSpentSeconds"] for w in chunk] for chunk in chunks), [[60, 180], [240]])
+        self.assertEqual([[w["timeSpentSeconds"] for w in chunk] for chunk in self._posted("/worklogs/issue/2/bulk")],
+                         [[120]])
+        self.assertFalse(any("issueId" in w for chunk in chunks for w in chunk))
+
+    def test_unexpected_bulk_response_fails_the_chunk(self):
+        self.transport.add("POST", BASE_URL + "/worklogs/issue/1/bulk", json=[{"tempoWorklogId": 1}])
+        self.transport.add("POST", BASE_URL + "/worklogs/issue/2/bulk", callback=_bulk)
+
+        results = self.tempo.create_worklogs([_worklog(1, 60), _worklog(2, 120), _worklog(1, 180)],
+                                             use_bulk_endpoint=True)
+
+        self.assertIsInstance(results[0].error, ValueError)
+        self.assertIsInstance(results[2].error, ValueError)
+        self.assertEqual(results[1].value, {"tempoWorklogId": 120})
+
+    def test_invalid_worklog_does_not_fail_its_chunk(self):
+        self.transport.add("POST", BASE_URL + "/worklogs/issue/1/bulk", callback=_bulk)
+        worklogs = [_worklog(1, 60), _worklog(1, 120, startTime="late"), {"issueId": 1}, _worklog(1, 180)]
+
+        results = self.tempo.create_worklogs(worklogs, use_bulk_endpoint=True)
+
+        self.assertEqual([r.ok for r in results], [True, False, False, True])
+        self.assertIsInstance(results[1].error, ValueError)
+        self.assertIsInstance(results[2].error, TypeError)
+        self.assertEqual([[w["timeSpentSeconds"] for w in chunk] for chunk in self._posted("/worklogs/issue/1/bulk")],
+                         [[60, 180]])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import json
+from unittest import TestCase, main
+
+from tempoapiclient import client_v4
+from tempoapiclient.cache import ResponseCache, ValidatorStore
+from tempoapiclient.transport import InMemoryTransport
+
+BASE_URL = "https://api.tempo.io/4"
+
+
+class TestResponseCache(TestCase):
+
+    def setUp(self):
+        self.now = 0
+        self.cache = ResponseCache(maxsize=2, ttls={"/accounts": 10, "/teams": 20, "/teams/1/members": 5},
+                                   clock=lambda: self.now)
+
+    def test_ttl_by_longest_prefix(self):
+        self.assertEqual(self.cache.ttl("/accounts"), 10)
+        self.assertEqual(self.cache.ttl("teams/2/members"), 20)
+        self.assertEqual(self.cache.ttl("/teams/1/members"), 5)
+        self.assertIsNone(self.cache.ttl("/accounts-x"))
+        self.assertIsNone(self.cache.ttl("/worklogs"))
+
+    def test_get_returns_copy(self):
+        self.cache.set("/accounts", None, [{"key": "A"}])
+        hit, value = self.cache.get("/accounts")
+        self.assertTrue(hit)
+        value.append({"key": "B"})
+        self.assertEqual(self.cache.get("/accounts")[1], [{"key": "A"}])
+
+    def test_params_are_part_of_key(self):
+        self.cache.set("/accounts", {"year": 2020}, [1])
+        self.assertFalse(self.cache.get("/accounts", {"year": 2021})[0])
+        self.assertTrue(self.cache.get("/accounts", {"year": 2020})[0])
+
+    def test_expiry(self):
+        self.cache.set("/accounts", None, [1])
+        self.now = 10
+        self.assertFalse(self.cache.get("/accounts")[0])
+        self.assertEqual(len(self.cache), 0)
+
+    def test_lru_eviction(self):
+        self.cache.set("/accounts", None, [1])
+        self.cache.set("/teams", None, [2])
+        self.cache.get("/accounts")
+        self.cache.set("/teams/3", None, [3])
+        self.assertTrue(self.cache.get("/accounts")[0])
+        self.assertFalse(self.cache.get("/teams")[0])
+
+    def test_invalidate_resource(self):
+        self.cache.set("/teams", None, [1])
+        self.cache.set("/accounts", None, [2])
+        self.cache.invalidate("/teams/1")
+        self.assertFalse(self.cache.get("/teams")[0])
+        self.assertTrue(self.cache.get("/accounts")[0])
+        self.cache.invalidate()
+        self.assertEqual(len(self.cache), 0)
+
+    def test_related_resources_are_invalidated(self):
+        self.cache.set("/teams/1/members", None, [1])
+        self.cache.invalidate("/team-memberships/5")
+        self.assertFalse(self.cache.get("/teams/1/members")[0])
+
+    def test_responses_requested_before_an_invalidation_are_not_stored(self):
+        generation = self.cache.generation("/teams")
+        self.cache.invalidate("/teams/1")
+        self.cache.set("/teams", None, [1], generation=generation)
+        self.assertFalse(self.cache.get("/teams")[0])
+        self.cache.set("/teams", None, [1], generation=self.cache.generation("/teams"))
+        self.assertTrue(self.cache.get("/teams")[0])
+
+
+class TestClientCache(TestCase):
+
+    def test_write_evicts_responses_cached_during_the_write(self):
+        teams = [{"id": 1, "name": "old"}]
+        transport = InMemoryTransport()
+        transport.add("GET", BASE_URL + "/teams",
+                      callback=lambda *_: (200, json.dumps({"results": teams, "metadata": {"count": 1}}).encode(), {}))
+        tempo = client_v4.Tempo(auth_token="token", transport=transport, cache=ResponseCache())
+
+        def update(method, url, headers, data):
+            # a read running while the write is in flight still sees the old team
+            self.assertEqual(tempo.get_teams(), [{"id": 1, "name": "old"}])
+            teams[0] = {"id": 1, "name": "new"}
+            return 200, b'{"id": 1, "name": "new"}', {}
+
+        transport.add("PUT", BASE_URL + "/teams/1", callback=update)
+        tempo.put("/teams/1", data={"name": "new"})
+
+        self.assertEqual(tempo.get_teams(), [{"id": 1, "name": "new"}])
+        self.assertEqual([method for method, _, _, _ in transport.requests], ["PUT", "GET", "GET"])
+
+    def test_failed_write_invalidates(self):
+        transport = InMemoryTransport()
+        transport.add("GET", BASE_URL + "/teams", json={"results": [], "metadata": {"count": 0}})
+        transport.add("POST", BASE_URL + "/teams", status_code=503)
+        tempo = client_v4.Tempo(auth_token="token", transport=transport, cache=ResponseCache())
+        tempo.get_teams()
+
+        with self.assertRaises(SystemExit):
+            tempo.post("/teams", data={"name": "new"})
+        self.assertEqual(len(tempo._cache), 0)
+
+
+class TestValidatorStore(TestCase):
+
+    def test_conditional_headers(self):
+        store = ValidatorStore()
+        self.assertEqual(store.headers("https://api.tempo.io/4/teams"), {})
+        store.set("https://api.tempo.io/4/teams", {"ETag": '"1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"},
+                  [{"id": 1}])
+        self.assertEqual(store.headers("https://api.tempo.io/4/teams"),
+                         {"If-None-Match": '"1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"})
+        self.assertEqual(store.get("https://api.tempo.io/4/teams"), (True, [{"id": 1}]))
+
+    def test_responses_without_validators_are_not_stored(self):
+        store = ValidatorStore()
+        store.set("https://api.tempo.io/4/teams", {}, [{"id": 1}])
+        self.assertEqual(store.get("https://api.tempo.io/4/teams"), (False, None))
+
+    def test_lru_eviction(self):
+        store = ValidatorStore(maxsize=1)
+        store.set("a", {"ETag": "1"}, 1)
+        store.set("b", {"ETag": "2"}, 2)
+        self.assertEqual(len(store), 1)
+        self.assertFalse(store.get("a")[0])
+
+
+class TestConditionalRequests(TestCase):
+
+    def setUp(self):
+        self.transport = InMemoryTransport()
+        self.transport.add("GET", BASE_URL + "/teams", callback=self._teams)
+        self.store = ValidatorStore(maxsize=1)
+        self.tempo = client_v4.Tempo(auth_token="token", transport=self.transport, conditional_requests=self.store)
+
+    def _teams(self, method, url, headers, data):
+        if headers.get("If-None-Match") == '"1"':
+            return 304, b"", {"ETag": '"1"'}
+        return 200, json.dumps({"results": [{"id": 1}], "metadata": {"count": 1}}).encode(), {"ETag": '"1"'}
+
+    def test_not_modified_is_served_from_the_store(self):
+        self.assertEqual(self.tempo.get_teams(), [{"id": 1}])
+        self.assertEqual(self.tempo.get_teams(), [{"id": 1}])
+
+        self.assertEqual([headers.get("If-None-Match") for _, _, headers, _ in self.transport.requests], [None, '"1"'])
+
+    def test_not_modified_of_an_evicted_payload_is_fetched_again(self):
+        self.tempo.get_teams()
+
+        def evict(method, url, headers, data):
+            # another URL takes the only place in the store while the conditional request is on its way
+            self.store.set(BASE_URL + "/accounts", {"ETag": '"2"'}, [])
+            return self._teams(method, url, headers, data)
+
+        self.transport.add("GET", BASE_URL + "/teams", callback=evict)
+
+        self.assertEqual(self.tempo.get_teams(), [{"id": 1}])
+        self.assertEqual([headers.get("If-None-Match") for _, _, headers, _ in self.transport.requests],
+                         [None, '"1"', None])
+
+
+if __name__ == "__main__":
+    main()
@@ -195,6 +195,43 @@ class TestClient(TestCase):
 
         self.assertIsInstance(worklogs, list)
 
+    def test_iter_worklogs(self):
+        """
+        Tests streaming worklogs page by page
+        """
+        worklogs = self.tempo.iter_worklogs(self.dateFrom, self.dateTo)
+
+        self.assertNotIsInstance(worklogs, list)
+        self.assertEqual(len(list(worklogs)), len(self.tempo.get_worklogs(self.dateFrom, self.dateTo)))
+
+    def test_get_worklogs_parallel_pages(self):
+        """
+        Tests that fetching pages in parallel returns the same worklogs in the same order
+        """
+        worklogs = self.tempo.get_worklogs(self.dateFrom, self.dateTo)
+        parallel_worklogs = self.tempo.get_worklogs(self.dateFrom, self.dateTo, parallel_pages=4)
+
+        self.assertEqual([i["tempoWorklogId"] for i in worklogs], [i["tempoWorklogId"] for i in parallel_worklogs])
+
+    def test_search_worklogs(self):
+        """
+        Tests that searching worklogs retrieves all pages
+        """
+        worklogs = self.tempo.search_worklogs(self.dateFrom, self.dateTo, limit=10)
+
+        self.assertIsInstance(worklogs, list)
+        self.assertEqual(len(worklogs), len(self.tempo.get_worklogs(self.dateFrom, self.dateTo)))
+
+    def test_get_worklogs_sharded(self):
+        """
+        Tests that fetching worklogs by date sub-ranges returns the same worklogs
+        """
+        worklogs = self.tempo.get_worklogs(self.dateFrom, self.dateTo)
+        sharded_worklogs = self.tempo.get_worklogs_sharded(self.dateFrom, self.dateTo, shard="week")
+
+        self.assertEqual(sorted(i["tempoWorklogId"] for i in worklogs),
+                         sorted(i["tempoWorklogId"] for i in sharded_worklogs))
+
     #def test_get_team_memberships(self):
         # l = self.tempo.get_team_memberships(membershipId=)
         # display(l)
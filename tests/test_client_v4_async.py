@@ -0,0 +1,140 @@
+from unittest import IsolatedAsyncioTestCase, main
+import asyncio
+import os
+
+import httpx
+
+from tempoapiclient.client_v4_async import AsyncTempo
+from tempoapiclient.ratelimit import RetryPolicy
+from tempoapiclient.rest_client import TempoError
+from tempoapiclient.transport import InMemoryTransport
+
+BASE_URL = "https://api.tempo.io/4"
+
+# please set TEMPO_AUTH_TOKEN to environment before running this test
+
+
+class TestAsyncClient(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tempo = AsyncTempo(auth_token=os.environ.get('TEMPO_AUTH_TOKEN'))
+        self.dateFrom = "2020-09-01"
+        self.dateTo = "2020-10-01"
+
+    def test_client_creation(self):
+        self.assertTrue(isinstance(self.tempo, AsyncTempo))
+
+    async def test_get_teams(self):
+        l = await self.tempo.get_teams()
+        print("get_teams: ", len(l))
+
+    async def test_get_worklogs(self):
+        worklogs = await self.tempo.get_worklogs(self.dateFrom, self.dateTo)
+        print(f"get_worklogs: {len(worklogs)}")
+
+        self.assertIsInstance(worklogs, list)
+
+    async def test_iter_worklogs(self):
+        worklogs = [i async for i in self.tempo.iter_worklogs(self.dateFrom, self.dateTo)]
+
+        self.assertEqual(len(worklogs), len(await self.tempo.get_worklogs(self.dateFrom, self.dateTo)))
+
+    async def asyncTearDown(self):
+        await self.tempo.close()
+
+
+class TestAsyncClientOffline(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.requests = []
+        self.responses = {}
+        self.tempo = AsyncTempo(auth_token="token", transport=httpx.MockTransport(self._handle),
+                                retry=RetryPolicy(backoff_factor=0))
+
+    def _handle(self, request):
+        self.requests.append(request)
+        responses = self.responses[request.method, request.url.path]
+        return responses.pop(0) if len(responses) > 1 else responses[0]
+
+    def _respond(self, method, path, *responses):
+        self.responses[method, "/4" + path] = list(responses)
+
+    async def test_follows_next_pages(self):
+        self._respond("GET", "/teams",
+                      httpx.Response(200, json={"results": [{"id": 1}],
+                                                "metadata": {"count": 1, "next": BASE_URL + "/teams?offset=1"}}),
+                      httpx.Response(200, json={"results": [{"id": 2}], "metadata": {"count": 1}}))
+
+        teams = await self.tempo.get_teams()
+
+        self.assertEqual(teams, [{"id": 1}, {"id": 2}])
+        self.assertEqual(str(self.requests[1].url), BASE_URL + "/teams?offset=1")
+        self.assertEqual(self.requests[0].headers["Authorization"], "Bearer token")
+
+    async def test_fan_out_bounds_concurrent_requests(self):
+        in_flight = []
+        most = 0
+
+        async def handle(request):
+            nonlocal most
+            in_flight.append(request)
+            most = max(most, len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.remove(request)
+            return httpx.Response(200, json={"results": [{"id": 1}], "metadata": {"count": 1}})
+
+        tempo = AsyncTempo(auth_token="token", transport=httpx.MockTransport(handle))
+        try:
+            batch = await tempo.get_team_members_many(range(6), max_workers=2)
+        finally:
+            await tempo.close()
+
+        self.assertEqual(sorted(batch.results), list(range(6)))
+        self.assertEqual(most, 2)
+
+    async def test_retries_transient_errors(self):
+        self._respond("GET", "/teams", httpx.Response(503),
+                      httpx.Response(200, json={"results": [{"id": 1}], "metadata": {"count": 1}}))
+
+        self.assertEqual(await self.tempo.get_teams(), [{"id": 1}])
+        self.assertEqual(len(self.requests), 2)
+
+    async def test_http_error_raises_tempo_error(self):
+        self._respond("GET", "/teams/1", httpx.Response(404))
+        self._respond("GET", "/teams/2", httpx.Response(200, json={"id": 2}))
+
+        results = await asyncio.gather(self.tempo.get("/teams/1"), self.tempo.get("/teams/2"), return_exceptions=True)
+
+        self.assertIsInstance(results[0], TempoError)
+        self.assertEqual(results[0].status_code, 404)
+        self.assertIsInstance(results[0].__cause__, httpx.HTTPStatusError)
+        self.assertEqual(results[1], {"id": 2})
+
+    async def test_conditional_requests_serve_not_modified(self):
+        await self.tempo.close()
+        self.tempo = AsyncTempo(auth_token="token", transport=httpx.MockTransport(self._handle),
+                                conditional_requests=True)
+        self._respond("GET", "/teams/1", httpx.Response(200, json={"id": 1}, headers={"ETag": '"v1"'}),
+                      httpx.Response(304))
+
+        self.assertEqual(await self.tempo.get("/teams/1"), {"id": 1})
+        self.assertEqual(await self.tempo.get("/teams/1"), {"id": 1})
+        self.assertEqual(self.requests[1].headers["If-None-Match"], '"v1"')
+
+    async def test_flags_are_rejected(self):
+        with self.assertRaises(ValueError):
+            await self.tempo.get("/teams", flags={"expand": True})
+
+    def test_no_requests_session(self):
+        self.assertIsNone(self.tempo._session)
+
+    async def test_transport_must_be_httpx(self):
+        with self.assertRaises(TypeError):
+            AsyncTempo(auth_token="token", transport=InMemoryTransport())
+
+    async def asyncTearDown(self):
+        await self.tempo.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+from unittest import TestCase, main
+
+from tempoapiclient.codec import CODECS, JSONCodec, get_codec
+from tempoapiclient.pagination import with_paging
+
+
+def _installed_codecs():
+    codecs = []
+    for codec in CODECS.values():
+        try:
+            codecs.append(codec())
+        except ImportError:
+            pass
+    return codecs
+
+
+class TestCodecs(TestCase):
+
+    def test_round_trip(self):
+        body = {"authorAccountId": "abc", "description": "Zürich", "timeSpentSeconds": 3600, "issueIds": [1, 2]}
+        for codec in _installed_codecs():
+            with self.subTest(codec=codec.name):
+                serialized = codec.dumps(body)
+                self.assertIsInstance(serialized, bytes)
+                self.assertEqual(codec.loads(serialized), body)
+                self.assertEqual(JSONCodec().loads(serialized), body)
+
+    def test_get_codec(self):
+        self.assertIsInstance(get_codec("json"), JSONCodec)
+        codec = JSONCodec()
+        self.assertIs(get_codec(codec), codec)
+        self.assertIn(get_codec().name, CODECS)
+        with self.assertRaises(ValueError):
+            get_codec("yaml")
+
+    def test_with_paging_keeps_bytes(self):
+        for codec in _installed_codecs():
+            with self.subTest(codec=codec.name):
+                body = with_paging(codec.dumps({"teamIds": [1]}), 50, 25)
+                self.assertEqual(JSONCodec().loads(body), {"teamIds": [1], "offset": 50, "limit": 25})
+                self.assertEqual(JSONCodec().loads(with_paging(codec.dumps({}), 0, 25)), {"offset": 0, "limit": 25})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import os
+import tempfile
+from unittest import TestCase, main, skipUnless
+
+from tempoapiclient import columnar
+from tempoapiclient.models import Worklog
+
+from .test_models import WORKLOG
+
+WORKLOGS = [dict(WORKLOG, tempoWorklogId=i, author={"accountId": f"user-{i % 3}"},
+                 billableSeconds=None if i == 4 else 1800) for i in range(7)]
+
+
+@skipUnless(columnar.pyarrow is not None, "pyarrow is not installed")
+class TestArrow(TestCase):
+
+    def test_record_batches(self):
+        columns = columnar.DEFAULT_COLUMNS + ("attribute:_EXTERNALREF_",)
+        batches = list(columnar.iter_record_batches(WORKLOGS, columns=columns, batch_size=3))
+
+        self.assertEqual([batch.num_rows for batch in batches], [3, 3, 1])
+        table = columnar.to_arrow(WORKLOGS, columns=columns, batch_size=3)
+        self.assertEqual(table.column("id").to_pylist(), list(range(7)))
+        self.assertEqual(str(table.schema.field("authorAccountId").type),
+                         "dictionary<values=string, indices=int32, ordered=0>")
+        self.assertEqual(table.column("billableSeconds").null_count, 1)
+        self.assertEqual(set(table.column("attribute:_EXTERNALREF_").to_pylist()), {"EXT-44556"})
+
+    def test_records_and_dicts_give_the_same_table(self):
+        self.assertTrue(columnar.to_arrow(WORKLOGS).equals(columnar.to_arrow(map(Worklog.from_dict, WORKLOGS))))
+
+    def test_write_parquet(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "worklogs.parquet")
+
+            self.assertEqual(columnar.write_parquet(iter(WORKLOGS), path, batch_size=2), 7)
+            written = columnar.pyarrow.parquet.read_table(path)
+            self.assertEqual(written.to_pylist(), columnar.to_arrow(WORKLOGS).to_pylist())
+
+    def test_unknown_column(self):
+        with self.assertRaises(ValueError):
+            columnar.arrow_schema(["issueKey"])
+
+
+@skipUnless(columnar.numpy is not None, "numpy is not installed")
+class TestNumpy(TestCase):
+
+    def test_to_numpy(self):
+        arrays = columnar.to_numpy(WORKLOGS, batch_size=4)
+
+        self.assertEqual(arrays["id"].tolist(), list(range(7)))
+        self.assertEqual(int(arrays["billableSeconds"].sum()), 6 * 1800)
+        authors = arrays["authorAccountId"]
+        self.assertEqual(authors.categories[authors.codes].tolist(), [f"user-{i % 3}" for i in range(7)])
+        self.assertEqual(str(arrays["startDate"].dtype), "datetime64[D]")
+
+
+if __name__ == "__main__":
+    main()
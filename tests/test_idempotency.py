@@ -0,0 +1,126 @@
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from unittest import TestCase, main
+
+import requests
+
+from tempoapiclient import client_v4
+from tempoapiclient.idempotency import IdempotentMutations
+from tempoapiclient.ratelimit import RetryPolicy
+from tempoapiclient.transport import InMemoryTransport
+
+BASE_URL = "https://api.tempo.io/4"
+AUTHOR = "5b10ac8d82e05b22cc7d4ef5"
+
+
+def _worklog(worklogId, createdAt=None, timeSpentSeconds=3600):
+    return {"tempoWorklogId": worklogId, "issue": {"id": 10001}, "author": {"accountId": AUTHOR},
+            "startDate": "2019-11-10", "startTime": "09:00:00", "timeSpentSeconds": timeSpentSeconds,
+            "createdAt": createdAt or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")}
+
+
+class TestIdempotentMutations(TestCase):
+
+    def setUp(self):
+        self.transport = InMemoryTransport()
+        self.tempo = client_v4.Tempo(auth_token="token", transport=self.transport)
+        self.mutations = IdempotentMutations(self.tempo, retry=RetryPolicy(max_retries=3, backoff_factor=0))
+
+    def _creates(self):
+        return [url for method, url, _, _ in self.transport.requests
+                if method == "POST" and url == BASE_URL + "/worklogs"]
+
+    def _create_worklog(self, **kwargs):
+        return self.mutations.create_worklog(accountId=AUTHOR, issueId=10001, dateFrom="2019-11-10",
+                                             timeSpentSeconds=3600, startTime="09:00:00", **kwargs)
+
+    def _search_returns(self, *worklogs):
+        self.transport.add("POST", BASE_URL + "/worklogs/search",
+                           json={"results": list(worklogs), "metadata": {"count": len(worklogs)}})
+
+    def test_timed_out_create_is_found_instead_of_repeated(self):
+        def timeout(method, url, headers, data):
+            raise requests.exceptions.ReadTimeout()
+
+        self.transport.add("POST", BASE_URL + "/worklogs", callback=timeout)
+        # an older worklog with the same values and one with another duration do not match
+        self._search_returns(_worklog(1, createdAt="2019-11-10T09:00:00Z"), _worklog(2, timeSpentSeconds=60),
+                             _worklog(3))
+
+        self.assertEqual(self._create_worklog()["tempoWorklogId"], 3)
+        self.assertEqual(len(self._creates()), 1)
+
+    def test_create_is_repeated_when_nothing_was_created(self):
+        failures = []
+
+        def flaky(method, url, headers, data):
+            if not failures:
+                failures.append(url)
+                return 503, b"", {}
+            return 200, b'{"tempoWorklogId": 4}', {}
+
+        self.transport.add("POST", BASE_URL + "/worklogs", callback=flaky)
+        self._search_returns()
+
+        self.assertEqual(self._create_worklog()["tempoWorklogId"], 4)
+        self.assertEqual(len(self._creates()), 2)
+
+    def test_client_errors_are_not_retried(self):
+        self.transport.add("POST", BASE_URL + "/worklogs", status_code=400, json={"errors": []})
+
+        with self.assertRaises(SystemExit):
+            self._create_worklog()
+        self.assertEqual(len(self._creates()), 1)
+
+    def test_idempotency_keys_and_duplicates_in_flight(self):
+        def slow(method, url, headers, data):
+            time.sleep(0.05)
+            return 200, b'{"tempoWorklogId": 5}', {}
+
+        self.transport.add("POST", BASE_URL + "/worklogs", callback=slow)
+        threads = [threading.Thread(target=self._create_worklog, kwargs={"idempotencyKey": "import-1"})
+                   for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self._create_worklog(idempotencyKey="import-1")["tempoWorklogId"], 5)
+        self.assertEqual(len(self._creates()), 1)
+
+    def test_retry_after_is_honoured(self):
+        throttled = []
+
+        def throttle(method, url, headers, data):
+            if not throttled:
+                throttled.append(time.monotonic())
+                return 429, b"", {"Retry-After": "0.2"}
+            return 200, json.dumps({"tempoWorklogId": 6, "retried": time.monotonic() - throttled[0]}).encode(), {}
+
+        self.transport.add("POST", BASE_URL + "/worklogs", callback=throttle)
+
+        worklog = self._create_worklog()
+        self.assertEqual(worklog["tempoWorklogId"], 6)
+        self.assertGreaterEqual(worklog["retried"], 0.2)
+        # a throttled create was not processed, so nothing is looked up
+        self.assertEqual(len(self._creates()), 2)
+        self.assertFalse(any("/search" in url for _, url, _, _ in self.transport.requests))
+
+    def test_claimed_records_are_bounded(self):
+        mutations = IdempotentMutations(self.tempo, remember=2)
+        for worklogId in range(5):
+            mutations._claim("worklog", "tempoWorklogId", {"tempoWorklogId": worklogId})
+
+        self.assertEqual(list(mutations._claimed), [("worklog", 3), ("worklog", 4)])
+
+    def test_customer_is_matched_by_key(self):
+        self.transport.add("POST", BASE_URL + "/customers", status_code=502)
+        self.transport.add("GET", BASE_URL + "/customers/CLOUDBAY", json={"id": 7, "key": "CLOUDBAY"})
+
+        self.assertEqual(self.mutations.create_customer(key="CLOUDBAY", name="Cloudbay")["id"], 7)
+
+
+if __name__ == "__main__":
+    main()
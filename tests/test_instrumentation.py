@@ -0,0 +1,122 @@
+from unittest import TestCase, main
+
+import requests
+
+from tempoapiclient import client_v4
+from tempoapiclient.cache import ResponseCache
+from tempoapiclient.instrumentation import Histogram, Instrumentation, endpoint_template
+from tempoapiclient.ratelimit import RetryPolicy
+from tempoapiclient.transport import InMemoryTransport
+
+from .test_models import WORKLOG
+
+BASE_URL = "https://api.tempo.io/4"
+
+
+class TestEndpointTemplate(TestCase):
+
+    def test_ids_and_keys_are_replaced(self):
+        self.assertEqual(endpoint_template(BASE_URL + "/worklogs/user/5b10ac8d82e05b22cc7d4ef5?from=2019-11-10"),
+                         "/worklogs/user/{id}")
+        self.assertEqual(endpoint_template(BASE_URL + "/teams/12/members/abc"), "/teams/{id}/members/{id}")
+        self.assertEqual(endpoint_template("/accounts/CLOUDBAY"), "/accounts/{id}")
+        self.assertEqual(endpoint_template("https://api.tempo.io/core/3/worklogs/search"), "/worklogs/search")
+
+    def test_histogram_quantile(self):
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.05, 0.5, 5.0):
+            histogram.observe(value)
+
+        self.assertEqual((histogram.quantile(0.5), histogram.quantile(0.75), histogram.quantile(1.0)),
+                         (0.1, 1.0, float("inf")))
+
+
+class TestInstrumentation(TestCase):
+
+    def test_requests_pages_and_retries(self):
+        throttled = []
+
+        def worklogs(method, url, headers, data):
+            if not throttled:
+                throttled.append(url)
+                return 429, b"", {"Retry-After": "0"}
+            return 200, b'{"results": [], "metadata": {"count": 0}}', {}
+
+        transport = InMemoryTransport()
+        transport.add("GET", BASE_URL + "/worklogs",
+                      json={"results": [WORKLOG], "metadata": {"count": 1, "offset": 0, "limit": 1,
+                                                               "next": BASE_URL + "/worklogs?offset=1&limit=1"}})
+        transport.add("GET", BASE_URL + "/worklogs?offset=1&limit=1", callback=worklogs)
+        events = []
+        instrumentation = Instrumentation(after_request=events.append)
+        tempo = client_v4.Tempo(auth_token="token", transport=transport, retry=RetryPolicy(),
+                                instrumentation=instrumentation)
+
+        self.assertEqual(len(tempo.get_worklogs("2019-11-10", "2019-11-11")), 1)
+
+        metrics = instrumentation.metrics
+        self.assertEqual(metrics.counter("tempo_requests_total", endpoint="/worklogs"), 2)
+        self.assertEqual(metrics.counter("tempo_retries_total", status="429"), 1)
+        self.assertEqual(metrics.histogram("tempo_pages", endpoint="/worklogs").sum, 2)
+        self.assertEqual(metrics.histogram("tempo_decode_seconds", method="GET", endpoint="/worklogs").count, 2)
+        self.assertEqual([event.retries for event in events], [0, 1])
+        [row] = metrics.summary()
+        self.assertEqual((row["method"], row["endpoint"], row["requests"], row["retries"]),
+                         ("GET", "/worklogs", 2, 1))
+        self.assertGreater(row["bytes_in"], 0)
+
+    def test_failed_requests_are_recorded(self):
+        def timeout(method, url, headers, data):
+            raise requests.exceptions.ReadTimeout()
+
+        transport = InMemoryTransport()
+        transport.add("GET", BASE_URL + "/teams", callback=timeout)
+        events = []
+        tempo = client_v4.Tempo(auth_token="token", transport=transport,
+                                instrumentation=Instrumentation(after_request=events.append))
+
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            tempo.get_teams()
+
+        [event] = events
+        self.assertIsInstance(event.error, requests.exceptions.ReadTimeout)
+        self.assertIsNone(event.status_code)
+        self.assertIsNotNone(event.seconds)
+        metrics = tempo._instrumentation.metrics
+        self.assertEqual(metrics.counter("tempo_requests_total", endpoint="/teams", status="error"), 1)
+        self.assertEqual(metrics.histogram("tempo_request_seconds", method="GET", endpoint="/teams").count, 1)
+
+    def test_decode_time_is_attributed_per_method(self):
+        transport = InMemoryTransport()
+        transport.add("GET", BASE_URL + "/worklogs/search", json={"results": [], "metadata": {"count": 0}})
+        transport.add("POST", BASE_URL + "/worklogs/search", json={"results": [], "metadata": {"count": 0}})
+        tempo = client_v4.Tempo(auth_token="token", transport=transport, instrumentation=True)
+        metrics = tempo._instrumentation.metrics
+
+        tempo.get("/worklogs/search")
+        tempo.post("/worklogs/search", data={})
+
+        rows = {row["method"]: row for row in metrics.summary()}
+        for method in ("GET", "POST"):
+            decode = metrics.histogram("tempo_decode_seconds", method=method, endpoint="/worklogs/search")
+            self.assertEqual(decode.count, 1)
+            self.assertEqual(rows[method]["decode_seconds"], decode.sum)
+
+    def test_cache_lookups(self):
+        transport = InMemoryTransport()
+        transport.add("GET", BASE_URL + "/teams", json={"results": [], "metadata": {"count": 0}})
+        transport.add("GET", BASE_URL + "/periods", json={"periods": []})
+        tempo = client_v4.Tempo(auth_token="token", transport=transport, cache=ResponseCache(),
+                                instrumentation=True)
+
+        tempo.get_teams()
+        tempo.get_teams()
+        tempo.get_periods("2019-11-01", "2019-11-30")
+
+        metrics = tempo._instrumentation.metrics
+        self.assertEqual(metrics.counter("tempo_cache_total", result="hit"), 1)
+        self.assertEqual(metrics.counter("tempo_cache_total", result="miss"), 1)
+
+
+if __name__ == "__main__":
+    main()
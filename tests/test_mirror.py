@@ -0,0 +1,157 @@
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase, main
+
+from tempoapiclient import client_v4
+from tempoapiclient.mirror import TempoMirror
+from tempoapiclient.models import Worklog
+from tempoapiclient.transport import InMemoryTransport
+
+from .test_models import PLAN, WORKLOG
+
+BASE_URL = "https://api.tempo.io/4"
+
+
+def _worklog(i, day, author, issueId=112, updatedAt="2019-11-10T08:12:43Z"):
+    return dict(WORKLOG, tempoWorklogId=i, startDate=day, author={"accountId": author}, issue={"id": issueId},
+                updatedAt=updatedAt)
+
+
+class TestTempoMirror(TestCase):
+
+    def setUp(self):
+        self.transport = InMemoryTransport()
+        self.worklogs = [_worklog(1, "2019-11-04", "alice"), _worklog(2, "2019-11-05", "bob", issueId=113),
+                         _worklog(3, "2019-11-20", "alice")]
+        self.transport.add("GET", f"{BASE_URL}/worklogs", callback=self._worklogs)
+        self.transport.add("GET", f"{BASE_URL}/worklogs/project/10000", callback=self._worklogs)
+        self.transport.add("GET", f"{BASE_URL}/teams", json={"results": [{"id": 1, "name": "Team 1"}],
+                                                             "metadata": {"count": 1}})
+        self.transport.add("GET", f"{BASE_URL}/team-memberships/team/1",
+                           json={"results": [{"id": 7, "member": {"accountId": "alice"}}], "metadata": {"count": 1}})
+        self.tempo = client_v4.Tempo(auth_token="token", transport=self.transport)
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.mirror = TempoMirror(self.tempo, os.path.join(self.directory.name, "tempo.db"))
+
+    def tearDown(self):
+        self.mirror.close()
+        self.directory.cleanup()
+
+    def _worklogs(self, method, url, headers, data):
+        query = dict(part.split("=") for part in url.split("?")[1].split("&"))
+        results = [worklog for worklog in self.worklogs if query["from"] <= worklog["startDate"] <= query["to"]
+                   and worklog["updatedAt"][:10] >= query.get("updatedFrom", "")]
+        return 200, self.tempo._codec.dumps({"results": results, "metadata": {"count": len(results)}}), {}
+
+    def test_covered_reads_are_answered_locally(self):
+        self.assertEqual(self.mirror.sync_worklogs("2019-11-01", "2019-11-15").created, [1, 2])
+        self.assertEqual(self.mirror.sync_worklogs("2019-11-16", "2019-11-30").created, [3])
+        requests = len(self.transport.requests)
+
+        self.assertEqual([w["tempoWorklogId"] for w in self.mirror.get_worklogs("2019-11-01", "2019-11-30")],
+                         [1, 2, 3])
+        self.assertEqual([w["tempoWorklogId"] for w in self.mirror.get_worklogs("2019-11-03", "2019-11-25",
+                                                                                accountId="alice")], [1, 3])
+        worklogs = list(self.mirror.iter_worklogs("2019-11-01", "2019-11-30", issueId=113, as_records=True))
+        self.assertEqual(worklogs, [Worklog.from_dict(self.worklogs[1])])
+        self.assertEqual(len(self.transport.requests), requests)
+
+        self.mirror.get_worklogs("2019-11-01", "2019-12-31")
+        self.mirror.get_worklogs("2019-11-01", "2019-11-30", projectId=10000)
+        self.assertEqual(len(self.transport.requests), requests + 2)
+        self.assertEqual((self.mirror.hits, self.mirror.misses), (3, 2))
+
+    def test_uncovered_iteration_streams_from_tempo(self):
+        self.mirror.sync_worklogs("2019-11-01", "2019-11-15")
+        requests = len(self.transport.requests)
+
+        worklogs = self.mirror.iter_worklogs("2019-11-01", "2019-11-30")
+
+        # nothing is downloaded before the first worklog is asked for
+        self.assertEqual(len(self.transport.requests), requests)
+        self.assertEqual([w["tempoWorklogId"] for w in worklogs], [1, 2, 3])
+        self.assertEqual(len(self.transport.requests), requests + 1)
+        self.assertEqual(self.mirror.misses, 1)
+
+    def test_reads_from_threads(self):
+        self.mirror.sync_worklogs("2019-11-01", "2019-11-30")
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            counts = list(executor.map(lambda accountId: len(self.mirror.get_worklogs("2019-11-01", "2019-11-30",
+                                                                                      accountId=accountId)),
+                                       ["alice", "bob"] * 4))
+
+        self.assertEqual(counts, [2, 1] * 4)
+
+    def test_incremental_sync(self):
+        self.mirror.sync_worklogs("2019-11-01", "2019-11-30")
+        self.worklogs[0] = _worklog(1, "2019-11-04", "alice", updatedAt="2019-11-12T10:00:00Z")
+        self.worklogs.append(_worklog(4, "2019-11-06", "bob", updatedAt="2019-11-12T11:00:00Z"))
+
+        result = self.mirror.sync_worklogs("2019-11-01", "2019-11-30")
+
+        self.assertEqual((result.created, result.updated), ([4], [1]))
+        self.assertIn("updatedFrom=2019-11-10", self.transport.requests[-1][1])
+
+    def test_teams(self):
+        self.assertEqual(self.mirror.sync_teams(), 1)
+        requests = len(self.transport.requests)
+
+        self.assertEqual(self.mirror.get_teams(as_records=True)[0].name, "Team 1")
+        self.assertEqual(self.mirror.get_team_memberships(1)[0]["member"]["accountId"], "alice")
+        self.assertEqual(len(self.transport.requests), requests)
+
+    def test_detect_deletions(self):
+        self.mirror.sync_worklogs("2019-11-01", "2019-11-30")
+        del self.worklogs[1]
+
+        self.assertEqual(self.mirror.sync_worklogs("2019-11-01", "2019-11-30").deleted, [])
+        self.assertEqual(self.mirror.sync_worklogs("2019-11-01", "2019-11-30", detect_deletions=True).deleted, [2])
+        self.assertEqual([w["tempoWorklogId"] for w in self.mirror.get_worklogs("2019-11-01", "2019-11-30")], [1, 3])
+        self.assertEqual(self.mirror.sync_worklogs("2019-11-01", "2019-11-30", detect_deletions=True,
+                                                   deletion_interval=3600).deleted, [])
+
+    def test_worklog_moved_out_of_a_range_stays_until_its_new_range_is_synced(self):
+        self.mirror.sync_worklogs("2019-11-01", "2019-11-30")
+        self.mirror.sync_worklogs("2019-12-01", "2019-12-31")
+        self.worklogs[0] = _worklog(1, "2019-12-02", "alice", updatedAt="2019-11-12T10:00:00Z")
+
+        self.assertEqual(self.mirror.sync_worklogs("2019-11-01", "2019-11-30"), ([], [], []))
+        self.assertEqual([w["tempoWorklogId"] for w in self.mirror.get_worklogs("2019-11-01", "2019-11-05")], [1, 2])
+
+        self.assertEqual(self.mirror.sync_worklogs("2019-12-01", "2019-12-31").created, [1])
+        self.assertEqual([w["tempoWorklogId"] for w in self.mirror.get_worklogs("2019-11-01", "2019-11-05")], [2])
+        self.assertEqual([w["tempoWorklogId"] for w in self.mirror.get_worklogs("2019-12-01", "2019-12-31")], [1])
+
+    def test_sync_plans(self):
+        plans = [dict(PLAN, updatedAt="2019-11-10T08:00:00Z"),
+                 dict(PLAN, id=8, assignee={"id": "bob", "type": "USER"}, startDate="2019-11-20",
+                      endDate="2019-11-21", updatedAt="2019-11-11T08:00:00Z")]
+        searches = []
+
+        def search(method, url, headers, data):
+            searches.append(json.loads(data))
+            results = [plan for plan in plans if plan["updatedAt"][:10] >= searches[-1].get("updatedFrom", "")]
+            return 200, self.tempo._codec.dumps({"results": results, "metadata": {"count": len(results)}}), {}
+
+        self.transport.add("POST", f"{BASE_URL}/plans/search", callback=search)
+
+        self.assertEqual(self.mirror.sync_plans("2019-11-01", "2019-11-30"), 2)
+        plans[0] = dict(plans[0], plannedSecondsPerDay=7200, updatedAt="2019-11-12T08:00:00Z")
+        # plan 8 was updated on the day of the checkpoint and is fetched again
+        self.assertEqual(self.mirror.sync_plans("2019-11-01", "2019-11-30"), 2)
+        self.assertEqual(searches[-1]["updatedFrom"], "2019-11-11")
+        requests = len(self.transport.requests)
+
+        self.assertEqual([p["plannedSecondsPerDay"] for p in self.mirror.get_plans("2019-11-01", "2019-11-15")],
+                         [7200])
+        self.assertEqual(self.mirror.get_plan_for_user("bob", dateFrom="2019-11-01", dateTo="2019-11-30",
+                                                       as_records=True)[0].id, 8)
+        self.assertEqual(len(self.transport.requests), requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+from unittest import TestCase, main
+
+from tempoapiclient import client_v4
+from tempoapiclient.models import Account, Plan, Worklog
+from tempoapiclient.transport import InMemoryTransport
+
+WORKLOG = {
+    "self": "https://api.tempo.io/4/worklogs/126",
+    "tempoWorklogId": 126,
+    "issue": {"self": "https://your-domain.atlassian.net/rest/api/2/issue/112", "id": 112},
+    "timeSpentSeconds": 3600,
+    "billableSeconds": 5200,
+    "startDate": "2019-11-10",
+    "startTime": "08:00:00",
+    "description": "Investigating a problem with our external database system",
+    "createdAt": "2019-11-10T08:12:43Z",
+    "updatedAt": "2019-11-10T08:12:43Z",
+    "author": {"self": "https://your-domain.atlassian.net/rest/api/2/user?accountId=1111aaaa2222bbbb3333cccc",
+               "accountId": "1111aaaa2222bbbb3333cccc"},
+    "attributes": {"self": "https://api.tempo.io/4/worklogs/126/work-attribute-values",
+                   "values": [{"key": "_EXTERNALREF_", "value": "EXT-44556"}]},
+}
+
+PLAN = {
+    "id": 7,
+    "assignee": {"id": "1111aaaa2222bbbb3333cccc", "type": "USER"},
+    "planItem": {"id": "10100", "type": "PROJECT"},
+    "startDate": "2019-11-10",
+    "endDate": "2019-11-12",
+    "plannedSecondsPerDay": 3600,
+}
+
+
+class TestModels(TestCase):
+
+    def test_worklog_from_dict(self):
+        worklog = Worklog.from_dict(WORKLOG)
+
+        self.assertEqual(worklog.id, 126)
+        self.assertEqual(worklog.issueId, 112)
+        self.assertEqual(worklog.authorAccountId, "1111aaaa2222bbbb3333cccc")
+        self.assertEqual(worklog.attributes, {"_EXTERNALREF_": "EXT-44556"})
+        self.assertFalse(hasattr(worklog, "__dict__"))
+
+    def test_missing_members(self):
+        account = Account.from_dict({"id": 1, "key": "CLOUDBAY", "global": False})
+
+        self.assertEqual((account.key, account.isGlobal, account.leadAccountId), ("CLOUDBAY", False, None))
+
+    def test_get_worklogs_as_records(self):
+        transport = InMemoryTransport()
+        transport.add("GET", "https://api.tempo.io/4/worklogs",
+                      json={"results": [WORKLOG, dict(WORKLOG, tempoWorklogId=127)], "metadata": {"count": 2}})
+        tempo = client_v4.Tempo(auth_token="token", transport=transport)
+
+        worklogs = tempo.get_worklogs("2019-11-10", "2019-11-11", as_records=True)
+
+        self.assertEqual([worklog.id for worklog in worklogs], [126, 127])
+        self.assertIsInstance(next(tempo.iter_worklogs("2019-11-10", "2019-11-11", as_records=True)), Worklog)
+        self.assertIsInstance(tempo.get_worklogs("2019-11-10", "2019-11-11")[0], dict)
+
+    def _plans_client(self, url):
+        transport = InMemoryTransport()
+        transport.add("GET", url, json={"results": [PLAN], "metadata": {"count": 1}})
+        return client_v4.Tempo(auth_token="token", transport=transport)
+
+    def test_get_plan_for_user_as_records(self):
+        tempo = self._plans_client("https://api.tempo.io/4/plans/user/1111aaaa2222bbbb3333cccc")
+
+        [plan] = tempo.get_plan_for_user("1111aaaa2222bbbb3333cccc", as_records=True)
+
+        self.assertIsInstance(plan, Plan)
+        self.assertEqual((plan.id, plan.assigneeId, plan.planItemType), (7, "1111aaaa2222bbbb3333cccc", "PROJECT"))
+        batch = tempo.get_plans_for_users(["1111aaaa2222bbbb3333cccc"], as_records=True)
+        self.assertIsInstance(batch.results["1111aaaa2222bbbb3333cccc"][0], Plan)
+
+    def test_get_plan_for_resource_as_records(self):
+        tempo = self._plans_client("https://api.tempo.io/4/plans/generic-resource/12")
+
+        [plan] = tempo.get_plan_for_resource(12, as_records=True)
+
+        self.assertIsInstance(plan, Plan)
+        self.assertIsInstance(tempo.get_plan_for_resource(12)[0], dict)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+from unittest import TestCase, main
+
+from tempoapiclient import client_v4
+from tempoapiclient.pagination import AdaptivePageSize
+from tempoapiclient.transport import InMemoryTransport
+
+BASE_URL = "https://api.tempo.io/4"
+
+
+def _page(records, limit, has_next=True):
+    metadata = {"count": records, "offset": 0, "limit": limit}
+    if has_next:
+        metadata["next"] = BASE_URL + "/worklogs?offset={}".format(limit)
+    return {"results": [{}] * records, "metadata": metadata}
+
+
+class TestAdaptivePageSize(TestCase):
+
+    def test_grows_one_step_per_full_page_within_limits(self):
+        controller = AdaptivePageSize(initial=500, target_seconds=1.0)
+        url = BASE_URL + "/worklogs/user/123abc?limit=500"
+
+        controller.observe(url, _page(500, 500), 500 * 1000, 0.05)
+        self.assertEqual(controller.limit("/worklogs/user/456def"), 1000)
+        controller.observe(url, _page(1000, 1000), 1000 * 1000, 0.1)
+        controller.observe(url, _page(1000, 1000), 1000 * 1000, 0.1)
+        self.assertEqual(controller.limit(url), 5000)
+        # slow pages bring it down to the largest size within the target
+        controller.observe(url, _page(5000, 5000), 5000 * 1000, 20.0)
+        self.assertEqual(controller.limit(url), 200)
+
+    def test_last_page_does_not_grow(self):
+        controller = AdaptivePageSize(initial=500)
+
+        controller.observe(BASE_URL + "/teams?limit=500", _page(30, 500, has_next=False), 3000, 0.01)
+
+        self.assertEqual(controller.limit("/teams"), 500)
+
+    def test_single_record_probes_do_not_grow(self):
+        controller = AdaptivePageSize(initial=500)
+
+        controller.observe(BASE_URL + "/worklogs?offset=500&limit=1", _page(1, 1), 100, 0.01)
+
+        self.assertEqual(controller.limit("/worklogs"), 500)
+
+    def test_server_cap_failures_and_state(self):
+        controller = AdaptivePageSize(initial=5000)
+
+        controller.observe(BASE_URL + "/worklogs?limit=5000", _page(1000, 1000), 1000 * 100, 0.01)
+        self.assertEqual(controller.limit("/worklogs"), 1000)
+        controller.failed(BASE_URL + "/worklogs?limit=1000")
+        self.assertEqual(controller.limit("/worklogs"), 500)
+        controller.failed(BASE_URL + "/worklogs/126")
+        self.assertNotIn("/worklogs/{id}", controller.state())
+
+        restored = AdaptivePageSize(state=controller.state())
+        self.assertEqual(restored.limit("/worklogs"), 500)
+
+
+class TestAdaptiveLimitClient(TestCase):
+
+    def test_limit_follows_server_cap(self):
+        transport = InMemoryTransport()
+        transport.add("GET", BASE_URL + "/worklogs", json=_page(2, 2, has_next=False))
+        tempo = client_v4.Tempo(auth_token="token", transport=transport, adaptive_limit=True)
+
+        tempo.get_worklogs("2019-11-10", "2019-11-11")
+        tempo.get_worklogs("2019-11-10", "2019-11-11")
+
+        self.assertIn("limit=5000", transport.requests[0][1])
+        self.assertIn("limit=2", transport.requests[1][1])
+
+    def test_gateway_timeout_halves_limit(self):
+        transport = InMemoryTransport()
+        transport.add("GET", BASE_URL + "/worklogs", status_code=504)
+        tempo = client_v4.Tempo(auth_token="token", transport=transport, adaptive_limit=AdaptivePageSize())
+
+        with self.assertRaises(SystemExit):
+            tempo.get_worklogs("2019-11-10", "2019-11-11")
+
+        self.assertEqual(tempo._adaptive_limit.limit("/worklogs"), 500)
+
+    def test_only_page_requests_change_the_limit(self):
+        transport = InMemoryTransport()
+        transport.add("GET", BASE_URL + "/worklogs", json=_page(1, 1000, has_next=False))
+        transport.add("POST", BASE_URL + "/worklogs", status_code=504)
+        transport.add("POST", BASE_URL + "/worklogs/search", status_code=504)
+        tempo = client_v4.Tempo(auth_token="token", transport=transport, adaptive_limit=AdaptivePageSize())
+        tempo.get_worklogs("2019-11-10", "2019-11-11")
+
+        with self.assertRaises(SystemExit):
+            tempo.create_worklog("5b10ac8d82e05b22cc7d4ef5", 10001, "2019-11-10", 3600)
+        self.assertEqual(tempo._adaptive_limit.limit("/worklogs"), 1000)
+
+        with self.assertRaises(SystemExit):
+            tempo.search_worklogs("2019-11-10", "2019-11-11", issueIds=[10001])
+        self.assertEqual(tempo._adaptive_limit.limit("/worklogs/search"), 500)
+
+
+if __name__ == "__main__":
+    main()
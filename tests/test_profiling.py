@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+from unittest import TestCase, main
+
+from tempoapiclient import client_v4
+from tempoapiclient.profiling import PaginationProfiler
+from tempoapiclient.transport import InMemoryTransport
+
+from .test_models import WORKLOG
+
+BASE_URL = "https://api.tempo.io/4"
+
+
+def _transport():
+    transport = InMemoryTransport()
+    transport.add("GET", BASE_URL + "/worklogs",
+                  json={"results": [WORKLOG, WORKLOG], "metadata": {
+                      "count": 2, "offset": 0, "limit": 2, "next": BASE_URL + "/worklogs?offset=2&limit=2"}})
+    transport.add("GET", BASE_URL + "/worklogs?offset=2&limit=2",
+                  json={"results": [WORKLOG], "metadata": {"count": 1, "offset": 2, "limit": 2}})
+    return transport
+
+
+class TestPaginationProfiler(TestCase):
+
+    def test_profile_records_page_timeline(self):
+        tempo = client_v4.Tempo(auth_token="token", transport=_transport())
+
+        with tempo.profile() as profiler:
+            worklogs = tempo.get_worklogs("2019-11-10", "2019-11-11")
+        tempo.get_worklogs("2019-11-10", "2019-11-11")
+
+        self.assertEqual(len(worklogs), 3)
+        self.assertIsInstance(worklogs[0], dict)
+        self.assertEqual([(page.page, page.records) for page in profiler.pages], [(0, 2), (1, 1)])
+        for page in profiler.pages:
+            self.assertTrue(page.start <= page.first_byte <= page.body_complete <= page.decode_done <= page.yielded)
+        summary = profiler.summary()
+        self.assertEqual((summary["calls"], summary["pages"], summary["records"]), (1, 2, 3))
+        self.assertGreater(summary["bytes"], 0)
+
+    def test_client_profiler_and_chrome_trace(self):
+        profiler = PaginationProfiler()
+        tempo = client_v4.Tempo(auth_token="token", transport=_transport(), profiler=profiler)
+
+        self.assertEqual(len(list(tempo.iter_worklogs("2019-11-10", "2019-11-11"))), 3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.json")
+            profiler.write_chrome_trace(path)
+            with open(path) as fh:
+                events = json.load(fh)["traceEvents"]
+        self.assertEqual({event["name"] for event in events if event["ph"] == "X"},
+                         {"wait", "download", "decode", "consume"})
+        self.assertIn({"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "/worklogs #1"}}, events)
+
+
+if __name__ == "__main__":
+    main()
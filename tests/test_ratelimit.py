@@ -0,0 +1,75 @@
+import json
+from unittest import TestCase, main
+
+from tempoapiclient import client_v4
+from tempoapiclient.ratelimit import RetryPolicy, TokenBucket
+from tempoapiclient.transport import InMemoryTransport
+
+
+class TestTokenBucket(TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.bucket = TokenBucket(rate=2, capacity=2, clock=lambda: self.now)
+
+    def test_burst_then_rate(self):
+        self.assertEqual(self.bucket.reserve(), 0)
+        self.assertEqual(self.bucket.reserve(), 0)
+        self.assertAlmostEqual(self.bucket.reserve(), 0.5)
+        self.assertAlmostEqual(self.bucket.reserve(), 1.0)
+
+    def test_refill(self):
+        self.bucket.reserve()
+        self.bucket.reserve()
+        self.now = 1.0
+        self.assertEqual(self.bucket.reserve(), 0)
+
+    def test_pause(self):
+        self.bucket.pause(3)
+        self.assertAlmostEqual(self.bucket.reserve(), 3)
+        self.now = 3.0
+        self.assertEqual(self.bucket.reserve(), 0)
+
+
+class TestRetryPolicy(TestCase):
+
+    def test_is_retry(self):
+        policy = RetryPolicy(max_retries=2)
+        self.assertTrue(policy.is_retry("GET", 503, 0))
+        self.assertTrue(policy.is_retry("POST", 429, 1))
+        self.assertFalse(policy.is_retry("POST", 503, 0))
+        self.assertFalse(policy.is_retry("POST", 503, 0, "https://api.tempo.io/4/worklogs"))
+        self.assertTrue(policy.is_retry("POST", 503, 0, "https://api.tempo.io/4/worklogs/search?offset=5000"))
+        self.assertTrue(policy.is_retry("POST", 502, 1, "/plans/search"))
+        self.assertFalse(policy.is_retry("GET", 404, 0))
+        self.assertFalse(policy.is_retry("GET", 429, 2))
+
+    def test_delay_honours_retry_after(self):
+        policy = RetryPolicy()
+        self.assertEqual(policy.delay(0, {"Retry-After": "7"}), 7)
+        self.assertEqual(policy.delay(0, {"Retry-After": "Mon, 01 Jan 2001 00:00:00 GMT"}), 0)
+
+    def test_delay_backoff_is_bounded(self):
+        policy = RetryPolicy(backoff_factor=1, max_backoff=5)
+        for attempt in range(10):
+            self.assertLessEqual(policy.delay(attempt, {}), min(5, 2 ** attempt))
+
+
+class TestClientRetries(TestCase):
+
+    def test_search_pages_are_retried_after_server_errors(self):
+        statuses = [503, 200]
+
+        def search(method, url, headers, data):
+            return statuses.pop(0), json.dumps({"results": [{"tempoWorklogId": 1}], "metadata": {"count": 1}}), {}
+
+        transport = InMemoryTransport()
+        transport.add("POST", "https://api.tempo.io/4/worklogs/search", callback=search)
+        tempo = client_v4.Tempo(auth_token="token", transport=transport, retry=RetryPolicy(backoff_factor=0))
+
+        self.assertEqual(len(tempo.search_worklogs("2019-11-10", "2019-11-11")), 1)
+        self.assertEqual(len(transport.requests), 2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import asyncio
+from datetime import date
+from unittest import IsolatedAsyncioTestCase, TestCase, main
+
+import requests
+from requests.exceptions import HTTPError
+
+from tempoapiclient import client_v4
+from tempoapiclient.rest_client import TempoError
+from tempoapiclient.sharding import afetch_sharded, fetch_sharded, halve_date_range, is_transient, split_date_range
+from tempoapiclient.transport import InMemoryTransport, build_response
+
+from .test_models import WORKLOG
+
+BASE_URL = "https://api.tempo.io/4"
+
+
+def _http_error(status):
+    return SystemExit(HTTPError(response=build_response("GET", BASE_URL + "/worklogs", status, b"", {})))
+
+
+class _Shards(object):
+    """
+    Fake ``fetch_shard`` with one record per day, asking to split shards of more than ``max_days`` days.
+    """
+
+    def __init__(self, max_days=10, errors=()):
+        self.max_days = max_days
+        self.errors = list(errors)
+        self.calls = []
+
+    def __call__(self, dateFrom, dateTo, splittable):
+        self.calls.append((dateFrom, dateTo))
+        if self.errors:
+            raise self.errors.pop(0)
+        if splittable and (dateTo - dateFrom).days >= self.max_days:
+            return None
+        return [date.fromordinal(day) for day in range(dateFrom.toordinal(), dateTo.toordinal() + 1)]
+
+
+class TestDateRanges(TestCase):
+
+    def test_split_date_range(self):
+        self.assertEqual(split_date_range(date(2019, 1, 30), date(2019, 3, 2), "month"),
+                         [(date(2019, 1, 30), date(2019, 1, 31)), (date(2019, 2, 1), date(2019, 2, 28)),
+                          (date(2019, 3, 1), date(2019, 3, 2))])
+        self.assertEqual(split_date_range(date(2019, 11, 6), date(2019, 11, 12), "week"),
+                         [(date(2019, 11, 6), date(2019, 11, 10)), (date(2019, 11, 11), date(2019, 11, 12))])
+        self.assertEqual(len(split_date_range(date(2019, 12, 31), date(2020, 1, 1), "year")), 2)
+        with self.assertRaises(ValueError):
+            split_date_range(date(2019, 1, 1), date(2019, 1, 2), "quarter")
+
+    def test_halve_date_range(self):
+        self.assertEqual(halve_date_range(date(2019, 1, 1), date(2019, 1, 31)),
+                         [(date(2019, 1, 1), date(2019, 1, 16)), (date(2019, 1, 17), date(2019, 1, 31))])
+        self.assertEqual(halve_date_range(date(2019, 1, 1), date(2019, 1, 2)),
+                         [(date(2019, 1, 1), date(2019, 1, 1)), (date(2019, 1, 2), date(2019, 1, 2))])
+
+
+class TestFetchSharded(TestCase):
+
+    def test_large_shards_are_split_recursively(self):
+        fetch = _Shards(max_days=10)
+
+        records = fetch_sharded(fetch, date(2019, 1, 1), date(2019, 2, 28), period="month", max_workers=2)
+
+        self.assertEqual(records, [date.fromordinal(day) for day in range(date(2019, 1, 1).toordinal(),
+                                                                          date(2019, 2, 28).toordinal() + 1)])
+        self.assertIn((date(2019, 1, 1), date(2019, 1, 16)), fetch.calls)
+        self.assertIn((date(2019, 1, 1), date(2019, 1, 8)), fetch.calls)
+
+    def test_transient_errors_are_retried(self):
+        fetch = _Shards(errors=[_http_error(503), requests.exceptions.ConnectionError()])
+
+        self.assertEqual(len(fetch_sharded(fetch, date(2019, 1, 1), date(2019, 1, 5), retries=2)), 5)
+        self.assertEqual(len(fetch.calls), 3)
+
+    def test_client_errors_are_not_retried(self):
+        fetch = _Shards(errors=[_http_error(404)])
+
+        with self.assertRaises(SystemExit):
+            fetch_sharded(fetch, date(2019, 1, 1), date(2019, 1, 5), retries=2)
+        self.assertEqual(len(fetch.calls), 1)
+
+    def test_failed_shard_cancels_queued_shards(self):
+        fetch = _Shards(errors=[_http_error(404)])
+
+        with self.assertRaises(SystemExit):
+            fetch_sharded(fetch, date(2019, 1, 1), date(2019, 12, 31), max_workers=1)
+        self.assertEqual(len(fetch.calls), 1)
+
+    def test_is_transient(self):
+        self.assertTrue(is_transient(_http_error(429)))
+        self.assertTrue(is_transient(requests.exceptions.ReadTimeout()))
+        self.assertFalse(is_transient(_http_error(401)))
+        self.assertFalse(is_transient(SystemExit("invalid JSON")))
+        self.assertFalse(is_transient(ValueError()))
+
+
+class TestAsyncFetchSharded(IsolatedAsyncioTestCase):
+
+    async def test_large_shards_are_split_recursively(self):
+        shards = _Shards(max_days=10)
+
+        async def fetch(dateFrom, dateTo, splittable):
+            return shards(dateFrom, dateTo, splittable)
+
+        records = await afetch_sharded(fetch, date(2019, 1, 1), date(2019, 1, 31))
+
+        self.assertEqual(len(records), 31)
+        self.assertEqual(records, sorted(records))
+
+    async def test_failed_shard_cancels_other_shards(self):
+        shards = _Shards(errors=[TempoError(*_http_error(404).args)])
+
+        async def fetch(dateFrom, dateTo, splittable):
+            await asyncio.sleep(0)
+            return shards(dateFrom, dateTo, splittable)
+
+        with self.assertRaises(TempoError):
+            await afetch_sharded(fetch, date(2019, 1, 1), date(2019, 12, 31), max_workers=1)
+        await asyncio.sleep(0.01)
+        # the next shard was woken by the released semaphore before the failure was seen
+        self.assertEqual(len(shards.calls), 2)
+
+
+class TestClientSharding(TestCase):
+
+    def test_split_is_decided_without_downloading_full_pages(self):
+        worklogs = [dict(WORKLOG, tempoWorklogId=i, startDate="2019-11-{:02d}".format(day))
+                    for i, day in enumerate((1, 2, 3, 20))]
+        transport = InMemoryTransport()
+
+        def pages(method, url, headers, data):
+            query = dict(part.split("=") for part in url.split("?")[1].split("&"))
+            offset, limit = int(query["offset"]), int(query["limit"])
+            matching = [w for w in worklogs if query["from"] <= w["startDate"] <= query["to"]]
+            metadata = {"count": len(matching[offset:offset + limit]), "offset": offset, "limit": limit}
+            if offset + limit < len(matching):
+                metadata["next"] = f"{BASE_URL}/worklogs?from={query['from']}&to={query['to']}" \
+                                   f"&offset={offset + limit}&limit={limit}"
+            body = {"results": matching[offset:offset + limit], "metadata": metadata}
+            return 200, tempo._codec.dumps(body), {}
+
+        transport.add("GET", BASE_URL + "/worklogs", callback=pages)
+        tempo = client_v4.Tempo(auth_token="token", transport=transport, limit=2)
+
+        records = tempo.get_worklogs_sharded("2019-11-01", "2019-11-30", shard="month")
+
+        self.assertEqual([w["tempoWorklogId"] for w in records], [0, 1, 2, 3])
+        # the month needs more than one page: only a single record was downloaded to find that out
+        first_query = dict(part.split("=") for part in transport.requests[0][1].split("?")[1].split("&"))
+        self.assertEqual((first_query["offset"], first_query["limit"]), ("2", "1"))
+        self.assertFalse(any("offset=0" in url and "from=2019-11-01&to=2019-11-30" in url
+                             for _, url, _, _ in transport.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import IsolatedAsyncioTestCase, TestCase, main
+
+from tempoapiclient import client_v4
+from tempoapiclient.singleflight import SingleFlight
+from tempoapiclient.transport import InMemoryTransport
+
+
+def _fail():
+    raise SystemExit("HTTP error")
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError(f"condition not met within {timeout} seconds")
+        time.sleep(0.001)
+
+
+class TestSingleFlight(TestCase):
+
+    def test_concurrent_calls_share_one_call(self):
+        single_flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            release.wait(5)
+            return {"periods": []}
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(single_flight.do, "key", fetch) for _ in range(4)]
+            try:
+                _wait_for(lambda: single_flight.shared == 3)
+            finally:
+                release.set()
+            results = [future.result() for future in futures]
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(single_flight.do("key", lambda: "again"), "again")
+
+    def test_errors_are_shared(self):
+        single_flight = SingleFlight()
+
+        with self.assertRaises(SystemExit):
+            single_flight.do("key", _fail)
+        self.assertEqual(single_flight.do("key", lambda: 1), 1)
+
+    def test_client_coalesces_identical_gets(self):
+        release = threading.Event()
+        transport = InMemoryTransport()
+        transport.add("GET", "https://api.tempo.io/4/periods",
+                      callback=lambda *_: (release.wait(5) and 200, b'{"periods": []}', {}))
+        tempo = client_v4.Tempo(auth_token="token", transport=transport, coalesce_requests=True)
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(tempo.get_periods, "2019-11-01", "2019-11-30") for _ in range(3)]
+            try:
+                _wait_for(lambda: tempo._single_flight.shared == 2)
+            finally:
+                release.set()
+            self.assertEqual([future.result() for future in futures], [{"periods": []}] * 3)
+        self.assertEqual(len(transport.requests), 1)
+
+
+class TestAsyncSingleFlight(IsolatedAsyncioTestCase):
+
+    async def test_concurrent_tasks_share_one_call(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return [1, 2]
+
+        results = await asyncio.gather(*[single_flight.ado("key", fetch) for _ in range(5)])
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [[1, 2]] * 5)
+        self.assertEqual(single_flight.shared, 4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import os
+import tempfile
+from unittest import TestCase, main
+
+from tempoapiclient import client_v4
+from tempoapiclient.sync import WorklogSync
+from tempoapiclient.transport import InMemoryTransport
+
+from .test_models import WORKLOG
+
+BASE_URL = "https://api.tempo.io/4"
+
+
+def _worklog(i, day, updatedAt="2019-11-10T08:12:43Z"):
+    return dict(WORKLOG, tempoWorklogId=i, startDate=day, updatedAt=updatedAt)
+
+
+class TestWorklogSync(TestCase):
+
+    def setUp(self):
+        self.transport = InMemoryTransport()
+        self.worklogs = [_worklog(1, "2019-11-04"), _worklog(2, "2019-11-05"), _worklog(3, "2019-12-20")]
+        self.transport.add("GET", f"{BASE_URL}/worklogs", callback=self._worklogs)
+        self.tempo = client_v4.Tempo(auth_token="token", transport=self.transport)
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "worklogs.db")
+        self.sync = WorklogSync(self.tempo, self.path)
+
+    def tearDown(self):
+        self.sync.close()
+        self.directory.cleanup()
+
+    def _worklogs(self, method, url, headers, data):
+        query = dict(part.split("=") for part in url.split("?")[1].split("&"))
+        results = [worklog for worklog in self.worklogs if query["from"] <= worklog["startDate"] <= query["to"]
+                   and worklog["updatedAt"][:10] >= query.get("updatedFrom", "")]
+        return 200, self.tempo._codec.dumps({"results": results, "metadata": {"count": len(results)}}), {}
+
+    def _requested(self):
+        return [url for _, url, _, _ in self.transport.requests]
+
+    def test_first_sync_downloads_the_range(self):
+        result = self.sync.sync("2019-11-01", "2019-11-30")
+
+        self.assertEqual(result, ([1, 2], [], []))
+        self.assertNotIn("updatedFrom", self._requested()[0])
+        self.assertEqual([w["tempoWorklogId"] for w in self.sync.get_worklogs("2019-11-01", "2019-11-30")], [1, 2])
+        self.assertEqual(self.sync.checkpoint("2019-11-01", "2019-11-30"), "2019-11-10T08:12:43Z")
+
+    def test_delta_sync_sends_updated_from(self):
+        self.sync.sync("2019-11-01", "2019-11-30")
+        self.worklogs[0] = _worklog(1, "2019-11-04", updatedAt="2019-11-12T10:00:00Z")
+        self.worklogs.append(_worklog(4, "2019-11-06", updatedAt="2019-11-12T11:00:00Z"))
+
+        result = self.sync.sync("2019-11-01", "2019-11-30")
+
+        self.assertEqual(result, ([4], [1], []))
+        self.assertIn("updatedFrom=2019-11-10", self._requested()[-1])
+        self.assertEqual(self.sync.checkpoint("2019-11-01", "2019-11-30"), "2019-11-12T11:00:00Z")
+
+    def test_checkpoints_persist_and_are_kept_per_range(self):
+        self.sync.sync("2019-11-01", "2019-11-30")
+        self.sync.close()
+
+        self.sync = WorklogSync(self.tempo, self.path)
+        self.assertEqual(self.sync.sync("2019-11-01", "2019-11-30"), ([], [], []))
+        self.assertIn("updatedFrom=2019-11-10", self._requested()[-1])
+
+        # another range starts from scratch
+        self.sync.sync("2019-11-01", "2019-12-31")
+        self.assertNotIn("updatedFrom", self._requested()[-1])
+
+    def test_detect_deletions(self):
+        self.sync.sync("2019-11-01", "2019-11-30")
+        del self.worklogs[1]
+
+        self.assertEqual(self.sync.sync("2019-11-01", "2019-11-30").deleted, [])
+        result = self.sync.sync("2019-11-01", "2019-11-30", detect_deletions=True)
+
+        self.assertEqual(result.deleted, [2])
+        self.assertNotIn("updatedFrom", self._requested()[-1])
+        self.assertEqual([w["tempoWorklogId"] for w in self.sync.get_worklogs("2019-11-01", "2019-11-30")], [1])
+
+    def test_deletion_interval_skips_recent_passes(self):
+        self.sync.sync("2019-11-01", "2019-11-30", detect_deletions=True)
+        del self.worklogs[1]
+        requests = len(self.transport.requests)
+
+        result = self.sync.sync("2019-11-01", "2019-11-30", detect_deletions=True, deletion_interval=3600)
+
+        self.assertEqual(result.deleted, [])
+        self.assertEqual(len(self.transport.requests), requests + 1)
+        self.assertEqual(self.sync.sync("2019-11-01", "2019-11-30", detect_deletions=True,
+                                        deletion_interval=0).deleted, [2])
+
+
+if __name__ == "__main__":
+    main()
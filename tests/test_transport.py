@@ -0,0 +1,128 @@
+import pickle
+import socket
+from unittest import TestCase, main
+
+import requests
+
+from tempoapiclient import client_v4
+from tempoapiclient.transport import (InMemoryTransport, RecordingTransport, RequestsTransport, Transport,
+                                      TransportConfig)
+
+BASE_URL = "https://api.tempo.io/4"
+
+
+def _page(offset, limit, count):
+    results = [{"id": i} for i in range(offset, min(offset + limit, count))]
+    metadata = {"count": len(results), "offset": offset, "limit": limit}
+    if offset + limit < count:
+        metadata["next"] = f"{BASE_URL}/teams?offset={offset + limit}&limit={limit}"
+    return {"results": results, "metadata": metadata}
+
+
+class TestInMemoryTransport(TestCase):
+
+    def setUp(self):
+        self.transport = InMemoryTransport()
+        self.transport.add("GET", f"{BASE_URL}/teams", json=_page(0, 2, 5))
+        for offset in (2, 4):
+            self.transport.add("GET", f"{BASE_URL}/teams?offset={offset}&limit=2", json=_page(offset, 2, 5))
+        self.tempo = client_v4.Tempo(auth_token="token", limit=2, transport=self.transport)
+
+    def test_pages_are_served_from_registered_responses(self):
+        self.assertEqual([team["id"] for team in self.tempo.get_teams()], list(range(5)))
+        self.assertEqual(len(self.transport.requests), 3)
+        self.assertEqual(self.transport.headers["Authorization"], "Bearer token")
+
+    def test_parallel_pages(self):
+        teams = self.tempo.get("/teams", parallel_pages=3)
+
+        self.assertEqual([team["id"] for team in teams], list(range(5)))
+
+    def test_unknown_url_is_not_found(self):
+        with self.assertRaises(SystemExit):
+            self.tempo.get_accounts()
+
+    def test_transports_must_implement_request(self):
+        class Incomplete(Transport):
+            pass
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_replay_of_recorded_requests(self):
+        recorder = RecordingTransport(self.transport)
+        client_v4.Tempo(auth_token="token", limit=2, transport=recorder).get_teams()
+
+        replayed = client_v4.Tempo(auth_token="token", limit=2, transport=recorder.replay())
+        self.assertEqual([team["id"] for team in replayed.get_teams()], list(range(5)))
+
+
+class _TimeoutsTransport(InMemoryTransport):
+    """
+    Records the timeout every request was sent with.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.timeouts = []
+
+    def request(self, method, url, headers=None, data=None, json=None, files=None, timeout=None, verify=None,
+                proxies=None):
+        self.timeouts.append(timeout)
+        return super().request(method, url, headers=headers, data=data, json=json, files=files, timeout=timeout,
+                               verify=verify, proxies=proxies)
+
+
+class TestTransportConfig(TestCase):
+
+    def test_timeout(self):
+        self.assertIsNone(TransportConfig().timeout)
+        self.assertEqual(TransportConfig(connect_timeout=3.05, read_timeout=60).timeout, (3.05, 60))
+        self.assertEqual(TransportConfig(read_timeout=60).timeout, (None, 60))
+
+    def test_socket_options(self):
+        options = TransportConfig(tcp_nodelay=False).socket_options()
+        self.assertIn((socket.IPPROTO_TCP, socket.TCP_NODELAY, 0), options)
+        self.assertNotIn((socket.IPPROTO_TCP, socket.TCP_NODELAY, 1), options)
+        self.assertNotIn((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1), options)
+
+        options = TransportConfig(tcp_keepalive=True, tcp_keepidle=30).socket_options()
+        self.assertIn((socket.IPPROTO_TCP, socket.TCP_NODELAY, 1), options)
+        self.assertIn((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1), options)
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            self.assertIn((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30), options)
+
+    def test_mount(self):
+        config = TransportConfig(pool_maxsize=32, pool_block=True, tcp_keepalive=True)
+        session = requests.Session()
+
+        config.mount(session)
+
+        adapter = session.get_adapter(f"{BASE_URL}/teams")
+        self.assertIs(session.get_adapter("http://localhost/"), adapter)
+        pool_kw = adapter.poolmanager.connection_pool_kw
+        self.assertEqual(pool_kw["socket_options"], config.socket_options())
+        self.assertEqual((pool_kw["maxsize"], pool_kw["block"]), (32, True))
+        self.assertEqual(session.headers["Connection"], "keep-alive")
+        # the options survive pickling, which rebuilds the pool manager
+        self.assertEqual(pickle.loads(pickle.dumps(adapter)).poolmanager.connection_pool_kw["socket_options"],
+                         config.socket_options())
+
+    def test_keep_alive_disabled(self):
+        transport = RequestsTransport(config=TransportConfig(keep_alive=False))
+
+        self.assertEqual(transport.headers["Connection"], "close")
+
+    def test_timeout_is_passed_to_the_transport(self):
+        transport = _TimeoutsTransport()
+        transport.add("GET", f"{BASE_URL}/teams", json=_page(0, 2, 1))
+        config = TransportConfig(connect_timeout=3.05, read_timeout=60)
+
+        client_v4.Tempo(auth_token="token", transport=transport, transport_config=config).get_teams()
+        client_v4.Tempo(auth_token="token", transport=transport, transport_config=config, timeout=5).get_teams()
+
+        self.assertEqual(transport.timeouts, [(3.05, 60), 5])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import json
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timezone
+from unittest import TestCase, main
+
+from tempoapiclient import client_v4
+from tempoapiclient.transport import InMemoryTransport
+from tempoapiclient.writebehind import WriteBehindQueue
+
+BASE_URL = "https://api.tempo.io/4"
+AUTHOR = "5b10ac8d82e05b22cc7d4ef5"
+
+
+class TestWriteBehindQueue(TestCase):
+
+    def setUp(self):
+        self.transport = InMemoryTransport()
+        self.transport.add("POST", BASE_URL + "/worklogs", json={"tempoWorklogId": 1})
+        self.transport.add("PUT", BASE_URL + "/worklogs/7", json={"tempoWorklogId": 7})
+        self.transport.add("DELETE", BASE_URL + "/worklogs/8", status_code=204)
+        self.tempo = client_v4.Tempo(auth_token="token", transport=self.transport)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "spool.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _queue(self):
+        return WriteBehindQueue(self.tempo, self.path, start=False, retry_delay=0)
+
+    def _sent(self, method):
+        return [(url, json.loads(data) if data else None) for m, url, _, data in self.transport.requests
+                if m == method]
+
+    def test_updates_are_coalesced_and_deletes_drop_them(self):
+        with self._queue() as queue:
+            queue.update_worklog(7, accountId=AUTHOR, dateFrom="2019-11-10", timeSpentSeconds=3600)
+            queue.update_worklog(7, accountId=AUTHOR, dateFrom="2019-11-10", timeSpentSeconds=7200)
+            queue.update_worklog(8, accountId=AUTHOR, dateFrom="2019-11-10", timeSpentSeconds=60)
+            queue.delete_worklog(8)
+            queue.delete_worklog(8)
+            queue.create_worklog(accountId=AUTHOR, issueId=10001, dateFrom="2019-11-10", timeSpentSeconds=60)
+
+            self.assertEqual([(m.op, m.worklogId) for m in queue.pending()],
+                             [("update", "7"), ("delete", "8"), ("create", None)])
+            self.assertEqual(queue.flush(), 3)
+            self.assertEqual(len(queue), 0)
+
+        [(url, data)] = self._sent("PUT")
+        self.assertEqual((url, data["timeSpentSeconds"]), (BASE_URL + "/worklogs/7", 7200))
+        self.assertEqual([url for url, _ in self._sent("DELETE")], [BASE_URL + "/worklogs/8"])
+        self.assertEqual(len(self._sent("POST")), 1)
+
+    def test_mutations_survive_restarts_and_outages(self):
+        self.transport.add("PUT", BASE_URL + "/worklogs/7", status_code=503)
+        queue = self._queue()
+        queue.update_worklog(7, accountId=AUTHOR, dateFrom="2019-11-10", timeSpentSeconds=3600)
+        queue.create_worklog(accountId=AUTHOR, issueId=10001, dateFrom="2019-11-10", timeSpentSeconds=60)
+        self.assertEqual(queue.flush(), 1)
+        queue.close(flush=False)
+
+        self.transport.add("PUT", BASE_URL + "/worklogs/7", json={"tempoWorklogId": 7})
+        with self._queue() as queue:
+            [update] = queue.pending()
+            self.assertEqual((update.op, update.attempts, update.data["timeSpentSeconds"]), ("update", 1, 3600))
+            self.assertEqual(queue.flush(), 1)
+
+        self.assertEqual([m for m, url, _, _ in self.transport.requests], ["POST", "PUT", "PUT"])
+
+    def test_rejected_mutations_are_moved_aside(self):
+        self.transport.add("POST", BASE_URL + "/worklogs", status_code=400, json={"errors": []})
+        with self._queue() as queue:
+            queue.create_worklog(accountId=AUTHOR, issueId=10001, dateFrom="2019-11-10", timeSpentSeconds=60)
+            queue.flush()
+
+            [failed] = queue.failed()
+            self.assertEqual((failed.op, failed.data["issueId"]), ("create", 10001))
+            self.assertEqual(len(queue), 0)
+            self.assertEqual(queue.requeue_failed(), 1)
+            self.assertEqual(len(queue), 1)
+
+    def test_background_worker_sends_mutations(self):
+        queue = WriteBehindQueue(self.tempo, self.path, flush_interval=0.01)
+        queue.update_worklog(7, accountId=AUTHOR, dateFrom="2019-11-10", timeSpentSeconds=3600)
+        queue.close()
+
+        self.assertEqual(len(self._sent("PUT")), 1)
+
+    def test_update_failing_holds_back_later_mutations_of_its_worklog(self):
+        puts = []
+
+        def put(method, url, headers, data):
+            puts.append(url)
+            if len(puts) == 1:
+                # queued while the update is being sent, so it does not drop it
+                queue.delete_worklog(7)
+                return 503, b"", {}
+            return 200, b'{"tempoWorklogId": 7}', {}
+
+        self.transport.add("PUT", BASE_URL + "/worklogs/7", callback=put)
+        self.transport.add("DELETE", BASE_URL + "/worklogs/7", status_code=204)
+        with self._queue() as queue:
+            queue.update_worklog(7, accountId=AUTHOR, dateFrom="2019-11-10", timeSpentSeconds=3600)
+
+            self.assertEqual(queue.flush(), 0)
+            self.assertEqual([m.op for m in queue.pending()], ["update", "delete"])
+            self.assertEqual(queue.flush(), 2)
+
+        self.assertEqual([m for m, url, _, _ in self.transport.requests], ["PUT", "PUT", "DELETE"])
+
+    def _create_sent_before_restart(self):
+        def unavailable(method, url, headers, data):
+            # the create is marked as sent before it is
+            with sqlite3.connect(self.path) as db:
+                self.assertIsNotNone(db.execute("SELECT sent_at FROM mutations").fetchone()[0])
+            return 503, b"", {}
+
+        self.transport.add("POST", BASE_URL + "/worklogs", callback=unavailable)
+        queue = self._queue()
+        queue.create_worklog(accountId=AUTHOR, issueId=10001, dateFrom="2019-11-10", timeSpentSeconds=60)
+        self.assertEqual(queue.flush(), 0)
+        queue.close(flush=False)
+        self.transport.add("POST", BASE_URL + "/worklogs", json={"tempoWorklogId": 2})
+
+    def _search_returns(self, *worklogs):
+        self.transport.add("POST", BASE_URL + "/worklogs/search",
+                           json={"results": list(worklogs), "metadata": {"count": len(worklogs)}})
+
+    def test_create_sent_before_restart_is_found_instead_of_repeated(self):
+        self._create_sent_before_restart()
+        self._search_returns({"tempoWorklogId": 3, "issue": {"id": 10001}, "author": {"accountId": AUTHOR},
+                              "startDate": "2019-11-10", "timeSpentSeconds": 60,
+                              "createdAt": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")})
+
+        with self._queue() as queue:
+            self.assertEqual(queue.flush(), 1)
+            self.assertEqual(len(queue), 0)
+
+        self.assertEqual([url.split("?")[0] for url, _ in self._sent("POST")],
+                         [BASE_URL + "/worklogs", BASE_URL + "/worklogs/search"])
+
+    def test_create_sent_before_restart_is_repeated_when_not_found(self):
+        self._create_sent_before_restart()
+        self._search_returns()
+
+        with self._queue() as queue:
+            self.assertEqual(queue.flush(), 1)
+
+        self.assertEqual([url.split("?")[0] for url, _ in self._sent("POST")],
+                         [BASE_URL + "/worklogs", BASE_URL + "/worklogs/search", BASE_URL + "/worklogs"])
+
+
+if __name__ == "__main__":
+    main()